@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Micro-benchmark parse_profile_page against its earlier regex implementation.
+
+The baseline is ``legacy_parse_profile_page`` from src/parser_reference.py,
+the parser as it was before the precompiled scanner: one regex search
+per field over the whole text. Every page is checked for identical
+output before anything is timed.
+
+Pages come from the synthetic simulator (plus state and edge-case
+variants) or from a fetch archive recorded with enrich.py --record.
+
+Usage:
+    python3 scripts/bench_parser.py [--pages 2000] [--repeat 5] [--seed 1]
+        [--archive output/run.jsonl.gz]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+# Allow imports from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.fetch_archive import read_archive
+from src.profile_parser import parse_profile_page
+from src.parser_reference import check_equivalent, legacy_parse_profile_page, synthetic_pages
+
+
+def archive_pages(path):
+    """Return the page texts recorded in a fetch archive."""
+    pages = []
+    for entry in read_archive(path):
+        raw = entry.get("raw")
+        if raw is None:
+            continue
+        if raw.lstrip().startswith("{"):
+            try:
+                raw = json.loads(raw).get("text") or ""
+            except ValueError:
+                pass
+        pages.append(raw)
+    return pages
+
+
+def benchmark(pages, repeat=5):
+    """Return {name: best microseconds per page} for both parsers."""
+    results = {}
+    for name, fn in (("legacy", legacy_parse_profile_page), ("scanner", parse_profile_page)):
+        best = min(timeit.repeat(lambda: [fn(p) for p in pages], number=1, repeat=repeat))
+        results[name] = best / len(pages) * 1e6
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark parse_profile_page against the previous implementation"
+    )
+    parser.add_argument("--pages", type=int, default=2000,
+                        help="Synthetic pages to generate (default: 2000)")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Timing repetitions; the best is reported (default: 5)")
+    parser.add_argument("--seed", type=int, default=1,
+                        help="Random seed for synthetic pages (default: 1)")
+    parser.add_argument("--archive", default=None, metavar="PATH",
+                        help="Use pages from a fetch archive instead of synthetic ones")
+    args = parser.parse_args()
+
+    pages = archive_pages(args.archive) if args.archive else synthetic_pages(args.pages, args.seed)
+    if not pages:
+        print("No pages to benchmark.")
+        sys.exit(1)
+
+    mismatches = check_equivalent(pages)
+    if mismatches:
+        print(f"{len(mismatches)} page(s) parse differently; first one:")
+        print(repr(mismatches[0][:500]))
+        sys.exit(1)
+
+    results = benchmark(pages, repeat=args.repeat)
+    print(f"{len(pages)} pages, identical output from both parsers")
+    for name, us in results.items():
+        print(f"  {name:<8} {us:8.1f} us/page")
+    print(f"  speedup  {results['legacy'] / results['scanner']:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
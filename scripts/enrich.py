@@ -9,34 +9,70 @@ Usage:
   2. Log into Instagram in that Chrome window
 
   3. Run:
-     python3 scripts/enrich.py [--db data/followers.db] [--delay-min 3] [--delay-max 5]
+     python3 scripts/enrich.py [--db data/followers.db] [--rate 0.25] [--burst 3]
+
+Request pacing uses a token bucket stored in the followers database, so
+several enrich.py processes pointed at the same DB share one budget. The
+bucket's rate adapts (AIMD): it creeps up while pages load normally, up to
+--max-rate, and halves on the first rate-limit page.
+
+Ctrl-C (or SIGTERM) drains: profiles already claimed are finished and
+written, the run's progress and pacing are saved to the database, and
+only this run's claimed rows go back to pending. A second Ctrl-C exits
+immediately. Pick a drained run back up with --resume [RUN_ID].
+
+To load-test without the real site, start scripts/mock_instagram_server.py
+and pass --base-url http://127.0.0.1:8765.
+
+Repeat --cdp-url to spread fetches over several logged-in browsers: each
+session spends its own --rate budget, and one that hits a login or
+rate-limit page cools down while the others carry on.
 
 Setup (one-time):
   pip install playwright
   playwright install chromium
 """
 import argparse
+import datetime
+import http.cookiejar
+import json
 import os
-import random
 import signal
 import sqlite3
 import sys
 import time
+from urllib.parse import urlsplit
 
 # Allow imports from project root
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 try:
     from playwright.sync_api import sync_playwright
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 except ImportError:
     print("Error: Playwright not installed. Run:")
     print("  pip install playwright")
     print("  playwright install chromium")
     sys.exit(1)
 
+from src import config
 from src.batch_orchestrator import run_all
-from src.database import get_status_counts
-from src.profile_parser import parse_profile_page
+from src.browser_health import DEFAULT_MAX_HEAP_MB, DEFAULT_MAX_RESPONSE_MS, HealthMonitor
+from src.circuit_breaker import TRIP_STATES, CircuitBreaker
+from src.staged_pipeline import run_staged, format_stage_report
+from src.fetch_archive import FetchRecorder
+from src.fetchers import FetcherRegistry, with_base_url
+from src.http_fetcher import HttpFetcher
+from src.database import get_status_counts, init_db, load_run, release_leases, save_run
+from src.metrics import RunMetrics, format_metrics_summary, timed
+from src.pacing import AimdPacer
+from src.page_cache import PageCache
+from src.page_pool import PagePool
+from src.profile_parser import (HEADER_COUNT_PATTERN, PAGE_STATE_MARKERS, parse_page,
+                                parse_profile_data)
+from src.rate_limiter import SqliteTokenBucket
+from src.request_filter import RequestFilter
+from src.session_pool import Session, SessionPool
 
 # ---------------------------------------------------------------------------
 # Graceful shutdown
@@ -46,8 +82,25 @@ shutdown_requested = False
 
 def _handle_signal(sig, frame):
     global shutdown_requested
+    if shutdown_requested:
+        raise KeyboardInterrupt
     shutdown_requested = True
-    print("\nShutdown requested. Finishing current profile...")
+    print("\nDraining: finishing in-flight profiles (Ctrl-C again to exit now)...")
+
+
+def stop_requested():
+    """True once Ctrl-C/SIGTERM asked the run to drain."""
+    return shutdown_requested
+
+
+def sleep_unless_stopped(seconds, step=1.0):
+    """Sleep *seconds*, returning early once a drain is requested."""
+    deadline = time.monotonic() + seconds
+    while not shutdown_requested:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        time.sleep(min(step, remaining))
 
 
 signal.signal(signal.SIGINT, _handle_signal)
@@ -58,107 +111,142 @@ signal.signal(signal.SIGTERM, _handle_signal)
 # ---------------------------------------------------------------------------
 
 
+# Pooled tabs share their browser context's storage, so replacing a tab
+# doesn't clear it: every N profile fetches the next tab checked out
+# clears localStorage/sessionStorage for the origin it is on, as does a
+# tab the HealthMonitor recycles, before it is closed.
+STORAGE_CLEAR_EVERY = 50
+CLEAR_STORAGE_JS = "() => { window.localStorage.clear(); window.sessionStorage.clear(); }"
+
+
+def clear_storage(page):
+    """Clear localStorage/sessionStorage for *page*'s origin; best effort."""
+    try:
+        page.evaluate(CLEAR_STORAGE_JS)
+    except Exception:
+        pass  # optional cleanup (e.g. a fresh about:blank tab has no storage)
+
+
 class BrowserConnectionManager:
     """Manages CDP browser connection lifecycle with automatic reconnection.
 
     Features:
+    - A pool of tabs (default: 1) checked out per fetch; each tab is closed
+      and replaced after N profiles or when it fails a health check
+      (closed, or over the heap/response limits of a HealthMonitor)
+    - localStorage/sessionStorage cleared every STORAGE_CLEAR_EVERY fetches
+      (and by the HealthMonitor's on_recycle hook when it fails a tab)
     - Auto-reconnect after time threshold (default: 30 minutes)
-    - Auto-reconnect after operation count threshold (default: 100 profiles)
     - Configurable timeouts on browser/context/page operations
+    - Optional request blocking (images, media, fonts, trackers) per tab
     - Auto-recovery from CDP connection errors
     """
 
-    def __init__(self, pw, cdp_url, max_age_seconds=1800, max_operations=100, page_timeout=30000):
+    def __init__(self, pw, cdp_url, max_age_seconds=1800, max_operations=100, page_timeout=30000,
+                 tabs=1, request_filter=None, health_monitor=None):
         """
         Args:
             pw: Playwright sync_api instance
             cdp_url: CDP endpoint (e.g., "http://localhost:9222")
             max_age_seconds: Reconnect after N seconds (default: 1800 = 30 min)
-            max_operations: Reconnect after N profile fetches (default: 100)
+            max_operations: Recycle a tab after N profile fetches (default: 100)
             page_timeout: Page operation timeout in ms (default: 30000 = 30s)
+            tabs: Number of pooled tabs (default: 1)
+            request_filter: src.request_filter.RequestFilter applied to every tab
+            health_monitor: src.browser_health.HealthMonitor sampling tabs on checkout
         """
         self.pw = pw
         self.cdp_url = cdp_url
         self.max_age_seconds = max_age_seconds
         self.max_operations = max_operations
         self.page_timeout = page_timeout
+        self.tabs = tabs
+        self.request_filter = request_filter
+        self.health_monitor = health_monitor
 
         self.browser = None
         self.context = None
-        self.page = None
+        self.pool = None
         self.connection_start_time = None
         self.operations_count = 0
+        self._storage_cleared_at = 0
 
     def connect(self):
         """Establish CDP connection and configure timeouts."""
         # Close existing connection if any
-        if self.browser is not None:
-            try:
-                self.browser.close()
-            except:
-                pass
+        self.close()
 
         # Connect via CDP
         self.browser = self.pw.chromium.connect_over_cdp(self.cdp_url)
 
-        # Get context and page
+        # Get context; tabs are opened lazily by the pool
         self.context = self.browser.contexts[0]
-        self.page = self.context.pages[0] if self.context.pages else self.context.new_page()
-
-        # Configure timeouts
         self.context.set_default_timeout(self.page_timeout)
-        self.page.set_default_navigation_timeout(self.page_timeout)
+        self.pool = PagePool(
+            self._new_page,
+            size=self.tabs,
+            max_uses=self.max_operations,
+            health_check=self._page_healthy,
+            dispose=self._dispose_page,
+        )
 
         # Reset operation counter and track connection age
         self.connection_start_time = time.time()
         self.operations_count = 0
+        self._storage_cleared_at = 0
 
-    def should_reconnect(self):
-        """Check if reconnection is needed based on time or count."""
-        if self.connection_start_time is None:
+    def _new_page(self):
+        page = self.context.new_page()
+        page.set_default_navigation_timeout(self.page_timeout)
+        if self.request_filter is not None:
+            page.route("**/*", self._route)
+        return page
+
+    def _page_healthy(self, page):
+        if page.is_closed():
             return False
+        return self.health_monitor is None or self.health_monitor.check(page)
 
-        # Check age
-        elapsed = time.time() - self.connection_start_time
-        if elapsed > self.max_age_seconds:
-            return True
+    def _dispose_page(self, page):
+        if self.health_monitor is not None:
+            self.health_monitor.forget(page)
+        page.close()
 
-        # Check operation count
-        if self.operations_count >= self.max_operations:
-            return True
+    def _route(self, route):
+        request = route.request
+        if self.request_filter.should_block(request.url, request.resource_type):
+            route.abort()
+        else:
+            route.continue_()
 
-        return False
+    def should_reconnect(self):
+        """Check if reconnection is needed based on connection age."""
+        if self.connection_start_time is None:
+            return False
+        return time.time() - self.connection_start_time > self.max_age_seconds
 
     def reconnect(self, reason="threshold"):
         """Force reconnection."""
         print(f"Reconnecting browser (reason: {reason})...")
         self.connect()
 
-    def get_page(self):
-        """Get current page, reconnecting if needed."""
-        # Every 50 operations, clear browser cache
-        if self.operations_count > 0 and self.operations_count % 50 == 0:
-            try:
-                self.page.evaluate(
-                    "() => { "
-                    "window.localStorage.clear(); "
-                    "window.sessionStorage.clear(); "
-                    "}"
-                )
-            except:
-                pass  # Ignore errors, this is optional cleanup
+    def checkout(self, timeout=None):
+        """Return (pool, page) for one fetch, reconnecting if needed.
 
-        # Check if reconnection is needed
+        Hand the page back with ``pool.checkin(page, healthy)``; after a
+        reconnect the old pool is closed and simply disposes of it.
+        Raises TimeoutError if no tab frees up within *timeout* seconds.
+        """
         if self.should_reconnect():
             elapsed = time.time() - self.connection_start_time
-            reason = (
-                f"age ({int(elapsed)}s > {self.max_age_seconds}s)"
-                if elapsed > self.max_age_seconds
-                else f"operations ({self.operations_count} >= {self.max_operations})"
-            )
-            self.reconnect(reason=reason)
-
-        return self.page
+            self.reconnect(reason=f"age ({int(elapsed)}s > {self.max_age_seconds}s)")
+        pool = self.pool
+        page = pool.checkout(timeout)
+        count = self.operations_count
+        if count and count % STORAGE_CLEAR_EVERY == 0 and count != self._storage_cleared_at:
+            self._storage_cleared_at = count
+            clear_storage(page)
+        return pool, page
 
     def increment_operations(self):
         """Increment operation counter after each profile fetch."""
@@ -166,6 +254,8 @@ class BrowserConnectionManager:
 
     def close(self):
         """Clean shutdown."""
+        if self.pool is not None:
+            self.pool.close()
         if self.browser is not None:
             try:
                 self.browser.close()
@@ -173,7 +263,154 @@ class BrowserConnectionManager:
                 pass
         self.browser = None
         self.context = None
-        self.page = None
+        self.pool = None
+
+
+def probe_page(page):
+    """Sample a tab for HealthMonitor: JS heap via CDP and round-trip time."""
+    started = time.monotonic()
+    page.evaluate("1")
+    response_ms = (time.monotonic() - started) * 1000
+    cdp = page.context.new_cdp_session(page)
+    try:
+        cdp.send("Performance.enable")
+        values = {m["name"]: m["value"] for m in cdp.send("Performance.getMetrics")["metrics"]}
+    finally:
+        cdp.detach()
+    return {"heap_bytes": values.get("JSHeapUsedSize"), "response_ms": response_ms}
+
+
+# ---------------------------------------------------------------------------
+# Page readiness
+# ---------------------------------------------------------------------------
+
+# Returns a compact payload for profile_parser.parse_profile_data: fields
+# from this username's own object in the page's embedded JSON where
+# present (as http_fetcher.extract_profile_payload reads them), exact
+# counts and the verified badge from the header DOM otherwise, and as
+# "text" only the header text plus any page-state marker phrases found in
+# the header's <main> (the whole body only when there is no header).
+PROFILE_EXTRACT_JS = r"""([handle, markers]) => {
+    const out = {};
+    const needle = `"username":"${handle}"`;
+    // The innermost object around offset `at` of `text`, skipping braces
+    // inside strings; the user's own object, not a neighbour's.
+    const enclosing = (text, at) => {
+        const opened = [];
+        let start = null;
+        for (const m of text.matchAll(/"(?:[^"\\]|\\.)*"|[{}]/g)) {
+            if (start === null && m.index >= at) {
+                if (!opened.length) return null;
+                start = opened[opened.length - 1];
+            }
+            if (m[0] === '{') opened.push(m.index);
+            else if (m[0] === '}' && opened.length && opened.pop() === start) return [start, m.index + 1];
+        }
+        return null;
+    };
+    const USER_KEYS = ['edge_followed_by', 'follower_count', 'edge_follow', 'following_count',
+        'edge_owner_to_timeline_media', 'media_count', 'biography', 'external_url',
+        'is_verified', 'is_private', 'is_business_account', 'is_professional_account'];
+    for (const script of document.querySelectorAll('script[type="application/json"]')) {
+        const all = script.textContent || '';
+        let at = all.indexOf(needle);
+        if (at < 0) continue;
+        const first = at;
+        let user = null, best = 0;
+        for (; at >= 0; at = all.indexOf(needle, at + needle.length)) {
+            const span = enclosing(all.slice(0, at + 20000), at);
+            if (!span) continue;
+            let obj = null;
+            try { obj = JSON.parse(all.slice(span[0], span[1])); } catch (e) { continue; }
+            const score = USER_KEYS.filter(k => k in obj).length;
+            if (score > best) { user = obj; best = score; }
+        }
+        if (user) {
+            const num = (v) => (typeof v === 'number' ? v : null);
+            const str = (v) => (typeof v === 'string' ? v : null);
+            const bool = (v) => (typeof v === 'boolean' ? v : null);
+            out.follower_count = num(user.edge_followed_by?.count) ?? num(user.follower_count);
+            out.following_count = num(user.edge_follow?.count) ?? num(user.following_count);
+            out.post_count = num(user.edge_owner_to_timeline_media?.count) ?? num(user.media_count);
+            out.bio = str(user.biography);
+            out.website = str(user.external_url);
+            out.is_verified = bool(user.is_verified);
+            out.is_private = bool(user.is_private);
+            out.is_business = bool(user.is_business_account) ?? bool(user.is_professional_account);
+        } else {
+            // Not decodable: match textually in the username's object, or
+            // around it, taking each field's match nearest the username.
+            const [lo, hi] = enclosing(all.slice(0, first + 20000), first)
+                ?? [Math.max(0, first - 20000), first + 20000];
+            const near = (re) => {
+                let hit = null;
+                for (const m of all.slice(lo, hi).matchAll(new RegExp(re.source, 'g'))) {
+                    if (!hit || Math.abs(lo + m.index - first) < Math.abs(lo + hit.index - first)) hit = m;
+                }
+                return hit;
+            };
+            const num = (re) => { const m = near(re); return m ? Number(m[1]) : null; };
+            const str = (re) => {
+                const m = near(re);
+                try { return m ? JSON.parse('"' + m[1] + '"') : null; } catch (e) { return null; }
+            };
+            const bool = (re) => { const m = near(re); return m ? m[1] === 'true' : null; };
+            out.follower_count = num(/"edge_followed_by":\{"count":(\d+)\}/) ?? num(/"follower_count":(\d+)/);
+            out.following_count = num(/"edge_follow":\{"count":(\d+)\}/) ?? num(/"following_count":(\d+)/);
+            out.post_count = num(/"edge_owner_to_timeline_media":\{"count":(\d+)/) ?? num(/"media_count":(\d+)/);
+            out.bio = str(/"biography":"((?:[^"\\]|\\.)*)"/);
+            out.website = str(/"external_url":"((?:[^"\\]|\\.)*)"/);
+            out.is_verified = bool(/"is_verified":(true|false)/);
+            out.is_private = bool(/"is_private":(true|false)/);
+            out.is_business = bool(/"is_business_account":(true|false)/)
+                ?? bool(/"is_professional_account":(true|false)/);
+        }
+        out.source = 'json';
+        break;
+    }
+    const header = document.querySelector('header');
+    const body = document.body?.innerText || '';
+    if (header) {
+        // Only the profile's own column: a logged-out page's "Log in ...
+        // to see" banner or footer must not read as a login wall.
+        const lower = (header.closest('main')?.innerText || header.innerText || '').toLowerCase();
+        const found = markers.filter(all => all.every(m => lower.includes(m))).map(all => all.join(' '));
+        const exact = (kind) => header.querySelector(`a[href$="/${kind}/"] span[title]`)?.getAttribute('title');
+        out.follower_count ??= exact('followers') ?? null;
+        out.is_verified ??= !!header.querySelector('svg[aria-label="Verified"]');
+        out.is_private ??= lower.includes('this account is private');
+        out.source ??= 'dom';
+        out.text = [header.innerText, ...found].join('\n');
+    } else {
+        out.text = body.slice(0, 4000);
+    }
+    return out;
+}"""
+
+# Mirrors profile_parser.is_page_ready in the browser, so polling needs no
+# round-trip per check.
+READY_JS = """([pattern, markers]) => {
+    const text = document.querySelector('header')?.closest('main')?.innerText
+        || document.body?.innerText || '';
+    if (new RegExp(pattern).test(text)) return true;
+    const lower = text.toLowerCase();
+    return markers.some(all => all.every(m => lower.includes(m)));
+}"""
+
+
+def wait_until_ready(page, timeout_ms):
+    """Wait until the profile header or a page-state marker has rendered.
+
+    Returns True when ready, False when *timeout_ms* passed first; the
+    caller then parses whatever text the page has.
+    """
+    markers = [list(substrings) for _, substrings in PAGE_STATE_MARKERS]
+    try:
+        page.wait_for_function(READY_JS, arg=[HEADER_COUNT_PATTERN, markers],
+                               timeout=timeout_ms, polling=100)
+        return True
+    except PlaywrightTimeoutError:
+        return False
 
 
 # ---------------------------------------------------------------------------
@@ -181,36 +418,114 @@ class BrowserConnectionManager:
 # ---------------------------------------------------------------------------
 
 
-def make_fetcher(connection_manager, delay_min, delay_max):
-    """Return a fetcher_fn(handle, profile_url) closure using Playwright."""
+def make_fetcher(connection_manager, rate_limiter, pacer=None, metrics=None,
+                 ready_timeout=10.0, page_cache=None, prefetch=True, recorder=None):
+    """Return a fetcher_fn(handle, profile_url) closure using Playwright.
+
+    Every navigation first takes a token from *rate_limiter*, so pacing
+    is shared with any other worker or process using the same bucket
+    (None when a SessionPool takes tokens per session instead).
+    When *pacer* is given, each page's state and load latency feed it.
+    Parsing happens here, so *metrics* gets a "parse" observation that
+    is also included in the orchestrator's "fetch" time. Instead of a
+    fixed pause after load, each page is read as soon as it is ready (at
+    most *ready_timeout* seconds); the wait goes to *metrics* as "ready".
+    With *page_cache*, each extraction payload is stored as JSON for
+    later re-parsing (except rate-limit/login walls). With *recorder*
+    (``src.fetch_archive.FetchRecorder``), every payload is archived with
+    its URL, page state and timings for replay.
+
+    Unless *prefetch* is False, the orchestrator's
+    ``prefetch(handle, profile_url)`` hint names the next profile. As
+    soon as the current page has been parsed, that profile's navigation
+    starts on a second pooled tab (after taking its own rate-limit
+    token), so it loads while the current one is classified and written.
+    A hint is dropped when the current page is a rate-limit or login
+    wall. Needs at least two tabs; with one, hints are ignored.
+    """
     processed = 0
     total = [0]  # mutable so closure can read updated value
+    hint = [None]  # (handle, profile_url) the orchestrator will ask for next
+    ahead = [None]  # in-flight prefetch: {handle, url, pool, page, before, started}
+
+    def start_ahead(current_handle):
+        """Begin navigating the hinted profile on a spare tab, if there is one."""
+        if hint[0] is None or ahead[0] is not None:
+            return
+        handle, profile_url = hint[0]
+        hint[0] = None
+        if handle == current_handle:
+            return
+        try:
+            pool, page = connection_manager.checkout(timeout=0)
+        except TimeoutError:
+            return
+        try:
+            before = page.url
+            if before == profile_url:
+                pool.checkin(page)
+                return
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+            started = time.monotonic()
+            # Assigning location returns at once; goto() would block until load.
+            page.evaluate("url => { window.location.href = url; }", profile_url)
+        except Exception:
+            pool.checkin(page, healthy=False)
+            return
+        ahead[0] = {"handle": handle, "url": profile_url, "pool": pool, "page": page,
+                    "before": before, "started": started}
+
+    def take_ahead(handle, profile_url):
+        """Return the prefetch for this profile, discarding any other."""
+        pending, ahead[0] = ahead[0], None
+        if pending is None:
+            return None
+        if pending["handle"] == handle and pending["url"] == profile_url:
+            return pending
+        pending["pool"].checkin(pending["page"])
+        return None
 
     def fetcher_fn(handle, profile_url):
         nonlocal processed
-        if shutdown_requested:
-            raise SystemExit("shutdown")
-
         # CDP error handling with reconnection
         max_attempts = 2
         last_error = None
 
         for attempt in range(max_attempts):
+            pending = take_ahead(handle, profile_url) if attempt == 0 else None
+            if pending is not None:
+                pool, page = pending["pool"], pending["page"]
+            else:
+                pool, page = connection_manager.checkout()
+            healthy = False
             try:
-                # Get page (auto-reconnects if threshold reached)
-                page = connection_manager.get_page()
-
-                # Existing fetch logic
-                page.goto(profile_url)
-                page.wait_for_load_state("domcontentloaded")
-                page.wait_for_timeout(2000)
-
-                raw_text = page.evaluate(
-                    "document.querySelector('header')?.closest('main')?.innerText"
-                    " || document.body.innerText"
-                )
-
-                enriched = parse_profile_page(raw_text)
+                if pending is not None:
+                    started = pending["started"]
+                    before = pending["before"]
+                    page.wait_for_url(lambda url: url != before,
+                                      wait_until="domcontentloaded")
+                else:
+                    if rate_limiter is not None:
+                        rate_limiter.acquire()
+                    started = time.monotonic()
+                    page.goto(profile_url)
+                    page.wait_for_load_state("domcontentloaded")
+                ready_started = time.monotonic()
+                ready = wait_until_ready(page, ready_timeout * 1000)
+                ready_wait = time.monotonic() - ready_started
+                if metrics is not None:
+                    metrics.observe("ready", ready_wait, handle=handle, ready=ready,
+                                    prefetched=pending is not None)
+
+                markers = [list(substrings) for _, substrings in PAGE_STATE_MARKERS]
+                payload = page.evaluate(PROFILE_EXTRACT_JS, [handle, markers])
+
+                latency = time.monotonic() - started
+                parse_started = time.monotonic()
+                with timed(metrics, "parse", handle=handle, source=payload.get("source")):
+                    enriched = parse_profile_data(payload)
+                parse_time = time.monotonic() - parse_started
 
                 # Increment operation counter
                 connection_manager.increment_operations()
@@ -218,6 +533,24 @@ def make_fetcher(connection_manager, delay_min, delay_max):
                 # Existing progress display logic
                 processed += 1
                 page_state = (enriched.get("page_state") or "normal").lower()
+                if page_state in TRIP_STATES:
+                    # The breaker and pacer are about to back off; don't
+                    # spend a token loading the next profile now.
+                    hint[0] = None
+                else:
+                    start_ahead(handle)
+                if page_cache is not None and page_state not in TRIP_STATES:
+                    page_cache.put(handle, json.dumps(payload))
+                if recorder is not None:
+                    recorder.record(handle, profile_url, raw=json.dumps(payload),
+                                    page_state=page_state,
+                                    timings={"fetch": round(latency, 4),
+                                             "ready": round(ready_wait, 4),
+                                             "parse": round(parse_time, 4)})
+                pace_info = ""
+                if pacer is not None:
+                    pacer.record(page_state, latency)
+                    pace_info = f" [{pacer.describe()}]"
                 status_label = page_state if page_state != "normal" else (
                     "private" if enriched.get("is_private") else "completed"
                 )
@@ -227,12 +560,9 @@ def make_fetcher(connection_manager, delay_min, delay_max):
                     # Just show the raw extraction summary.
                     fc = enriched.get("follower_count")
                     score_info = f" ({fc} followers)" if fc is not None else ""
-                print(f"  [{processed}/{total[0]}] @{handle} — {status_label}{score_info}")
-
-                # Human-cadence delay
-                delay = random.uniform(delay_min, delay_max)
-                time.sleep(delay)
+                print(f"  [{processed}/{total[0]}] @{handle} — {status_label}{score_info}{pace_info}")
 
+                healthy = True
                 return enriched
 
             except Exception as e:
@@ -250,6 +580,8 @@ def make_fetcher(connection_manager, delay_min, delay_max):
 
                 # Not a CDP error or out of retries, propagate
                 raise
+            finally:
+                pool.checkin(page, healthy=healthy)
 
         # Should not reach here, but just in case
         raise last_error
@@ -257,7 +589,12 @@ def make_fetcher(connection_manager, delay_min, delay_max):
     def set_total(n):
         total[0] = n
 
+    def set_hint(handle, profile_url):
+        hint[0] = (handle, profile_url)
+
     fetcher_fn.set_total = set_total
+    if prefetch:
+        fetcher_fn.prefetch = set_hint
     return fetcher_fn
 
 # ---------------------------------------------------------------------------
@@ -282,12 +619,13 @@ def reset_rate_limited(db_path):
 # ---------------------------------------------------------------------------
 
 
-def dry_run(connection_manager, db_path, delay_min, delay_max, count=1):
+def dry_run(connection_manager, db_path, rate_limiter, count=1, base_url=None):
     """Fetch N profiles, print parsed results, don't write to DB."""
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
     rows = conn.execute(
-        "SELECT handle, profile_url FROM followers WHERE status = 'pending' LIMIT ?",
+        "SELECT handle, profile_url FROM followers WHERE status = 'pending' "
+        "ORDER BY priority_estimate DESC, id LIMIT ?",
         (count,)
     ).fetchall()
     conn.close()
@@ -297,13 +635,14 @@ def dry_run(connection_manager, db_path, delay_min, delay_max, count=1):
         return
 
     print(f"Dry run: fetching {len(rows)} profile(s)\n")
-    fetcher = make_fetcher(connection_manager, delay_min, delay_max)
+    fetcher = make_fetcher(connection_manager, rate_limiter)
     fetcher.set_total(len(rows))
+    fetch = with_base_url(fetcher, base_url) if base_url else fetcher
 
     for row in rows:
         handle = row["handle"]
         profile_url = row["profile_url"]
-        result = fetcher(handle, profile_url)
+        result = fetch(handle, profile_url)
 
         print(f"\n  Parsed result for @{handle}:")
         for k, v in sorted(result.items()):
@@ -322,19 +661,89 @@ def main():
     )
     parser.add_argument("--db", default="data/followers.db",
                         help="Path to followers database")
-    parser.add_argument("--delay-min", type=float, default=3.0,
-                        help="Minimum delay between profiles in seconds")
-    parser.add_argument("--delay-max", type=float, default=5.0,
-                        help="Maximum delay between profiles in seconds")
+    parser.add_argument("--rate", type=float, default=config.RATE_LIMIT_RATE,
+                        help="Profile fetches per second, shared by all processes "
+                             f"using this DB (default: {config.RATE_LIMIT_RATE})")
+    parser.add_argument("--burst", type=int, default=config.RATE_LIMIT_BURST,
+                        help="Maximum back-to-back fetches after an idle period "
+                             f"(default: {config.RATE_LIMIT_BURST})")
+    parser.add_argument("--max-rate", type=float, default=1.0,
+                        help="Upper bound for adaptive pacing in fetches per second "
+                             "(default: 1.0)")
+    parser.add_argument("--breaker-threshold", type=int, default=3,
+                        help="Consecutive login/rate-limit pages that pause the whole run; "
+                             "it probes again after --pause-minutes (default: 3)")
     parser.add_argument("--pause-minutes", type=int, default=10,
-                        help="Minutes to pause on rate limit before retrying")
+                        help="Minutes to pause when a whole batch exhausts its retries "
+                             "on rate limits (adaptive pacing handles isolated ones)")
+    parser.add_argument("--staged", action="store_true",
+                        help="Run fetch, parse, enrich and DB writes as separate pipeline "
+                             "stages and print per-stage throughput")
+    parser.add_argument("--metrics-file", default=None, metavar="PATH",
+                        help="Append per-stage timings as JSON lines to PATH")
+    parser.add_argument("--resume", nargs="?", const="latest", default=None,
+                        metavar="RUN_ID",
+                        help="Resume a drained run (default: the most recent drained, "
+                             "interrupted or stopped one), "
+                             "restoring its pacing and counters")
+    parser.add_argument("--http", action="store_true",
+                        help="Try a plain HTTP fetch first and use the browser only for "
+                             "profiles that hit a login wall")
+    parser.add_argument("--cookies", default=None, metavar="FILE",
+                        help="Netscape-format cookies file for --http requests")
+    parser.add_argument("--cache-dir", default=None, metavar="DIR",
+                        help="Keep compressed raw page text in DIR so scripts/reparse.py "
+                             "can re-parse without re-crawling")
+    parser.add_argument("--cache-max-age", type=float, default=0, metavar="HOURS",
+                        help="With --cache-dir, use cached pages younger than HOURS "
+                             "instead of fetching (default: 0, always fetch)")
+    parser.add_argument("--cache-max-mb", type=int, default=200,
+                        help="Page cache size limit in MB of compressed text (default: 200)")
+    parser.add_argument("--record", default=None, metavar="PATH",
+                        help="Archive every fetched page (URL, content, timings, state) to "
+                             "PATH (.jsonl.gz) for scripts/replay_fetches.py")
+    parser.add_argument("--base-url", default=None, metavar="URL",
+                        help="Fetch profiles from this origin instead of instagram.com, "
+                             "e.g. a local scripts/mock_instagram_server.py")
     parser.add_argument("--dry-run", nargs="?", type=int, const=1, default=None,
                         metavar="N",
                         help="Fetch N profiles (default 1) and print results without writing to DB")
     parser.add_argument("--reconnect-minutes", type=int, default=30,
                         help="Reconnect browser every N minutes (default: 30)")
-    parser.add_argument("--reconnect-count", type=int, default=100,
-                        help="Reconnect browser every N profiles (default: 100)")
+    parser.add_argument("--reconnect-count", type=int, default=500,
+                        help="Replace each tab with a fresh one every N profiles, even if "
+                             "it passes health checks (default: 500)")
+    parser.add_argument("--max-heap-mb", type=float, default=DEFAULT_MAX_HEAP_MB,
+                        help="Replace a tab whose JS heap grows past this "
+                             f"(default: {DEFAULT_MAX_HEAP_MB})")
+    parser.add_argument("--max-response-ms", type=float, default=DEFAULT_MAX_RESPONSE_MS,
+                        help="Replace a tab this slow to answer on consecutive samples "
+                             f"(default: {DEFAULT_MAX_RESPONSE_MS})")
+    parser.add_argument("--health-every", type=int, default=10, metavar="N",
+                        help="Sample a tab's heap and response time every N uses (default: 10)")
+    parser.add_argument("--ready-timeout", type=float, default=10.0,
+                        help="Seconds to wait for a profile to render before reading "
+                             "it anyway (default: 10)")
+    parser.add_argument("--no-block-resources", action="store_true",
+                        help="Load images, media, fonts and third-party scripts "
+                             "(blocked by default)")
+    parser.add_argument("--allow-resource", action="append", default=[], metavar="TYPE",
+                        help="Resource type to load even when blocking (e.g. image); repeatable")
+    parser.add_argument("--allow-host", action="append", default=[], metavar="HOST",
+                        help="Host never blocked; repeatable")
+    parser.add_argument("--cdp-url", action="append", default=None, metavar="URL",
+                        help="Chrome DevTools endpoint of a logged-in browser; repeat for "
+                             "several sessions, each with its own --rate budget "
+                             "(default: http://localhost:9222)")
+    parser.add_argument("--session-budget", type=int, default=None, metavar="N",
+                        help="With several --cdp-url sessions, stop using a session "
+                             "after N fetches this run")
+    parser.add_argument("--tabs", type=int, default=2,
+                        help="Browser tabs kept open in the page pool (default: 2; "
+                             "the second loads the next profile ahead)")
+    parser.add_argument("--no-prefetch", action="store_true",
+                        help="Don't start loading the next profile while the current "
+                             "one is parsed and written")
     parser.add_argument("--page-timeout", type=int, default=30,
                         help="Page operation timeout in seconds (default: 30)")
     args = parser.parse_args()
@@ -343,27 +752,85 @@ def main():
         print(f"Database not found: {args.db}")
         sys.exit(1)
 
-    # Connect to existing Chrome via CDP
+    # Upgrade older databases (priority_estimate column + claim index).
+    init_db(args.db)
+
+    rate_limiter = SqliteTokenBucket(args.db, rate=args.rate, burst=args.burst)
+    breaker = CircuitBreaker(threshold=args.breaker_threshold,
+                             cooldown_seconds=args.pause_minutes * 60)
+    pacer = AimdPacer(rate_limiter, initial_rate=args.rate,
+                      max_rate=max(args.rate, args.max_rate), latency_target=15.0)
+
+    resumed = {}
+    if args.resume:
+        record = load_run(args.db, None if args.resume == "latest" else args.resume)
+        if record is None:
+            if args.resume == "latest":
+                print("No drained, interrupted or stopped run to resume. A run still "
+                      "marked running may be live in another process; pass its "
+                      "RUN_ID to resume it anyway.")
+            else:
+                print(f"No run to resume ({args.resume}).")
+            sys.exit(1)
+        run_id = record["run_id"]
+        resumed = record["counters"]
+        pacer.restore(record["pacing"])
+        released = release_leases(args.db, run_id)
+        print(f"Resuming run {run_id}: {resumed.get('total_completed', 0)} completed so far, "
+              f"{pacer.describe()}"
+              + (f", {released} claimed rows returned to pending" if released else ""))
+    else:
+        run_id = f"{datetime.datetime.now():%Y%m%dT%H%M%S}-{os.getpid()}"
+
+    request_filter = None
+    if not args.no_block_resources:
+        allow_hosts = list(args.allow_host)
+        if args.base_url:
+            allow_hosts.append(urlsplit(args.base_url).hostname)
+        request_filter = RequestFilter(allow_types=args.allow_resource,
+                                       allow_hosts=allow_hosts)
+
+    health_monitor = HealthMonitor(probe_page, max_heap_mb=args.max_heap_mb,
+                                   max_response_ms=args.max_response_ms,
+                                   sample_every=args.health_every,
+                                   on_recycle=clear_storage)
+
+    # Connect to existing Chrome via CDP, one connection per session
+    cdp_urls = args.cdp_url or ["http://localhost:9222"]
     pw = sync_playwright().start()
-    try:
-        connection_manager = BrowserConnectionManager(
-            pw=pw,
-            cdp_url="http://localhost:9222",
-            max_age_seconds=args.reconnect_minutes * 60,
-            max_operations=args.reconnect_count,
-            page_timeout=args.page_timeout * 1000  # convert to ms
-        )
-        connection_manager.connect()
-    except Exception as e:
-        pw.stop()
-        print(f"Could not connect to Chrome on port 9222: {e}")
-        print("Launch Chrome with: /Applications/Google\\ Chrome.app/Contents/MacOS/"
-              "Google\\ Chrome --remote-debugging-port=9222")
-        sys.exit(1)
+    connection_managers = []
+    for cdp_url in cdp_urls:
+        try:
+            manager = BrowserConnectionManager(
+                pw=pw,
+                cdp_url=cdp_url,
+                max_age_seconds=args.reconnect_minutes * 60,
+                max_operations=args.reconnect_count,
+                page_timeout=args.page_timeout * 1000,  # convert to ms
+                tabs=args.tabs,
+                request_filter=request_filter,
+                health_monitor=health_monitor,
+            )
+            manager.connect()
+            connection_managers.append(manager)
+        except Exception as e:
+            for manager in connection_managers:
+                manager.close()
+            pw.stop()
+            print(f"Could not connect to Chrome at {cdp_url}: {e}")
+            print("Launch Chrome with: /Applications/Google\\ Chrome.app/Contents/MacOS/"
+                  "Google\\ Chrome --remote-debugging-port=9222")
+            sys.exit(1)
+    connection_manager = connection_managers[0]
+
+    totals = {k: resumed.get(k, 0)
+              for k in ("batches_run", "total_completed", "total_errors")}
+    recorder = None
 
     try:
         if args.dry_run is not None:
-            dry_run(connection_manager, args.db, args.delay_min, args.delay_max, count=args.dry_run)
+            dry_run(connection_manager, args.db, rate_limiter, count=args.dry_run,
+                    base_url=args.base_url)
             return
 
         # Print starting status
@@ -374,39 +841,158 @@ def main():
             print(f"  {status}: {count}")
         print()
 
-        fetcher = make_fetcher(connection_manager, args.delay_min, args.delay_max)
+        metrics = RunMetrics(args.metrics_file)
+        health_monitor.metrics = metrics
+        page_cache = None
+        if args.cache_dir:
+            page_cache = PageCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 * 1024)
+        if args.record:
+            recorder = FetchRecorder(args.record)
         pending = counts.get("pending", 0) + counts.get(None, 0)
-        fetcher.set_total(pending)
+        session_pool = None
+        if len(connection_managers) == 1:
+            fetcher = make_fetcher(connection_manager, rate_limiter, pacer, metrics,
+                                   ready_timeout=args.ready_timeout, page_cache=page_cache,
+                                   prefetch=not args.no_prefetch, recorder=recorder)
+            fetcher.set_total(pending)
+            browser_fetcher = fetcher
+        else:
+            # Each session spends its own token bucket; the first keeps the
+            # default bucket and the pacer that run checkpoints save. The
+            # pool picks a session per fetch, so there's no loading ahead.
+            sessions = []
+            for i, manager in enumerate(connection_managers):
+                if i == 0:
+                    limiter, session_pacer = rate_limiter, pacer
+                else:
+                    limiter = SqliteTokenBucket(args.db, name=f"instagram:{manager.cdp_url}",
+                                                rate=args.rate, burst=args.burst)
+                    session_pacer = AimdPacer(limiter, initial_rate=args.rate,
+                                              max_rate=max(args.rate, args.max_rate),
+                                              latency_target=15.0)
+                session_fetcher = make_fetcher(manager, None, session_pacer, metrics,
+                                               ready_timeout=args.ready_timeout,
+                                               page_cache=page_cache, prefetch=False,
+                                               recorder=recorder)
+                session_fetcher.set_total(pending)
+                sessions.append(Session(manager.cdp_url, session_fetcher, limiter,
+                                        cooldown_seconds=args.pause_minutes * 60,
+                                        max_requests=args.session_budget))
+            session_pool = SessionPool(sessions)
+            fetcher = sessions[0].fetcher_fn
+            browser_fetcher = session_pool
+
+        registry = FetcherRegistry()
+        registry.register("browser", browser_fetcher, concurrency=1, cost=10)
+        if page_cache is not None and args.cache_max_age > 0:
+            cached = page_cache.fetcher(args.cache_max_age * 3600)
+
+            def cached_fetcher(handle, profile_url):
+                raw = cached(handle, profile_url)
+                return None if raw is None else parse_page(raw)
+
+            registry.register("cached", cached_fetcher, concurrency=4, cost=0)
+        http_fetcher = None
+        if args.http:
+            jar = http.cookiejar.MozillaCookieJar()
+            if args.cookies:
+                jar.load(args.cookies, ignore_discard=True, ignore_expires=True)
+            http_fetcher = HttpFetcher(cookie_jar=jar, rate_limiter=rate_limiter)
+            registry.register("http", recorder.wrap(http_fetcher) if recorder else http_fetcher,
+                              concurrency=4, cost=1)
+        fetch_chain = registry.chain()
+        fetch = with_base_url(fetch_chain, args.base_url) if args.base_url else fetch_chain
+
+        def checkpoint(progress):
+            save_run(args.db, run_id, "running",
+                     counters={k: totals[k] + progress[k] for k in totals},
+                     pacing=pacer.state())
+
+        def finish(result, status):
+            for k in totals:
+                totals[k] += result[k]
+            save_run(args.db, run_id, status, counters=dict(totals),
+                     pacing=pacer.state())
+
+        save_run(args.db, run_id, "running", counters=dict(totals), pacing=pacer.state())
+        print(f"Run {run_id}")
 
         # Outer retry loop for rate limits
         while True:
             if shutdown_requested:
-                print("Shutdown before starting batch. Exiting.")
+                save_run(args.db, run_id, "drained", counters=dict(totals),
+                         pacing=pacer.state())
+                print(f"Drained before starting batch. Resume with --resume {run_id}")
                 break
 
-            result = run_all(args.db, fetcher)
+            if args.staged:
+                result = run_staged(args.db, fetch, breaker=breaker, metrics=metrics,
+                                    run_id=run_id, should_stop=stop_requested)
+                print("\n" + format_stage_report(result["stages"]))
+            else:
+                result = run_all(args.db, fetch, breaker=breaker, metrics=metrics,
+                                 run_id=run_id, should_stop=stop_requested,
+                                 checkpoint=checkpoint)
+
+            if result["reason"] == "drained":
+                finish(result, "drained")
+                print(f"\nDrained after {totals['total_completed']} completed profiles. "
+                      f"Resume with --resume {run_id}")
+                break
 
             if result["reason"] == "all_complete":
+                finish(result, "completed")
                 print(f"\nAll done! Completed {result['total_completed']} profiles "
                       f"across {result['batches_run']} batches.")
                 break
 
+            if result["reason"] == "budget_exhausted":
+                finish(result, "stopped")
+                print(f"\nEvery session has used its request budget. "
+                      f"Resume with --resume {run_id}")
+                break
+
             if result["stopped"]:
                 reset_count = reset_rate_limited(args.db)
                 if reset_count > 0:
                     print(f"\nReset {reset_count} rate-limited records to pending.")
-                    print(f"Pausing {args.pause_minutes} minutes for rate limit cooldown...")
-                    time.sleep(args.pause_minutes * 60)
+                    finish(result, "paused")
+                    print(f"Pausing {args.pause_minutes} minutes for rate limit cooldown "
+                          f"({pacer.describe()})...")
+                    sleep_unless_stopped(args.pause_minutes * 60)
                     # Refresh total for progress display
                     counts = get_status_counts(args.db)
                     fetcher.set_total(sum(counts.values()))
                     continue
                 # Stopped but not from rate limits
+                finish(result, "stopped")
                 print("\nBatch exhausted (non-rate-limit errors). Stopping.")
                 break
 
+            finish(result, "completed")
             break
 
+        print(f"\nFetch backends ({fetch_chain.describe()}):")
+        for name, stats in registry.stats().items():
+            print(f"  {name}: {stats['served']} served, {stats['misses']} missed, "
+                  f"{stats['errors']} errors")
+
+        if request_filter is not None:
+            print(f"Request filter: {request_filter.describe()}")
+        print(f"Tab health: {health_monitor.describe()}")
+        if session_pool is not None:
+            print(f"Sessions ({session_pool.describe()}):")
+            for name, stats in session_pool.stats().items():
+                print(f"  {name}: {stats['requests']} fetches, {stats['trips']} cooldowns, "
+                      f"{stats['state']}")
+        if http_fetcher is not None:
+            print(f"HTTP backend: {http_fetcher.login_walls} login walls sent to the browser")
+            http_fetcher.close()
+
+        print("\nStage timings:")
+        print(format_metrics_summary(metrics.summary()))
+        metrics.close()
+
         # Final status
         counts = get_status_counts(args.db)
         print(f"\nFinal database status ({sum(counts.values())} total):")
@@ -426,18 +1012,25 @@ def main():
             for err in errors:
                 print(f"  @{err['handle']}: {err['error_message']}")
 
+    except KeyboardInterrupt:
+        if args.dry_run is not None:
+            raise
+        save_run(args.db, run_id, "interrupted", counters=dict(totals),
+                 pacing=pacer.state())
+        print(f"\nInterrupted. Resume with --resume {run_id}")
+
     finally:
-        # Reset any records stuck in "processing" from our interrupted batch
-        conn = sqlite3.connect(args.db)
-        reset = conn.execute(
-            "UPDATE followers SET status = 'pending' WHERE status = 'processing'"
-        )
-        if reset.rowcount > 0:
-            print(f"\nReset {reset.rowcount} processing records to pending.")
-        conn.commit()
-        conn.close()
+        # Return only this run's claimed rows; other processes keep theirs
+        reset = release_leases(args.db, run_id)
+        if reset > 0:
+            print(f"\nReset {reset} processing records to pending.")
+
+        if recorder is not None:
+            recorder.close()
+            print(f"Recorded {recorder.recorded} fetches to {args.record}")
 
-        connection_manager.close()
+        for manager in connection_managers:
+            manager.close()
         pw.stop()
 
 
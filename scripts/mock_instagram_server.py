@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Serve synthetic Instagram profile pages locally for end-to-end load tests.
+
+Profiles from a fixture file (tests/fixtures/mock_profiles.json format)
+are served as given; any other handle gets a generated profile. Latency
+and the mix of private, not-found, rate-limit and login-wall pages use
+the same knobs as scripts/simulate_enrichment.py. Point enrich.py at it:
+
+    python3 scripts/mock_instagram_server.py --port 8765 --latency-mean 1.5
+    python3 scripts/enrich.py --base-url http://127.0.0.1:8765 [--http]
+
+Usage:
+    python3 scripts/mock_instagram_server.py [--port 8765]
+        [--profiles tests/fixtures/mock_profiles.json] [--latency-mean 1.0]
+        [--rate-limited-rate 0.01] [--login-required-rate 0.01] [--seed 1]
+"""
+import argparse
+import json
+import os
+import sys
+
+# Allow imports from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.mock_server import MockInstagramServer, load_profiles
+from src.simulator import DEFAULT_RATES, LATENCY_DISTRIBUTIONS, SyntheticFetcher
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Local mock Instagram server serving synthetic profile pages"
+    )
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="Interface to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765,
+                        help="Port to listen on (default: 8765)")
+    parser.add_argument("--profiles", default=None, metavar="PATH",
+                        help="JSON fixture of {handle: profile fields} to serve as given")
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="lognormal",
+                        help="Response latency distribution (default: lognormal)")
+    parser.add_argument("--latency-mean", type=float, default=1.0,
+                        help="Mean (median for lognormal) response latency in seconds")
+    parser.add_argument("--latency-spread", type=float, default=0.5,
+                        help="Uniform half-width or lognormal sigma (default: 0.5)")
+    for outcome, rate in DEFAULT_RATES.items():
+        parser.add_argument(f"--{outcome.replace('_', '-')}-rate", type=float, default=rate,
+                            help=f"Probability of a {outcome} page (default: {rate})")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Random seed for a reproducible outcome sequence")
+    args = parser.parse_args()
+
+    fetcher = SyntheticFetcher(
+        latency=args.latency,
+        latency_mean=args.latency_mean,
+        latency_spread=args.latency_spread,
+        rates={outcome: getattr(args, f"{outcome}_rate") for outcome in DEFAULT_RATES},
+        seed=args.seed,
+    )
+    profiles = load_profiles(args.profiles) if args.profiles else None
+    server = MockInstagramServer(profiles, fetcher, host=args.host, port=args.port)
+    print(f"Serving mock profiles on {server.base_url} (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    stats = server.stats()
+    print(f"\nServed {stats['requests']} profile requests, "
+          f"peak {stats['peak_in_flight']} in flight")
+    print(f"Outcomes: {json.dumps(stats['outcomes'], sort_keys=True)}")
+
+
+if __name__ == "__main__":
+    main()
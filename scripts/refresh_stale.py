@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Re-queue stale enriched profiles for another enrichment pass.
+
+Profiles whose processed_at is older than their tier's TTL go back to
+'pending' (most overdue, highest tier first), up to a daily budget, so
+the next scripts/enrich.py run refreshes them through the normal claim
+path. Run it daily, e.g. from cron, before enrich.py.
+
+Usage:
+    python3 scripts/refresh_stale.py [--db data/followers.db] [--budget 100]
+        [--ttl-days "Tier 1 - High Priority=3"] [--dry-run]
+"""
+import argparse
+import os
+import sys
+
+# Allow imports from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import config
+from src.database import init_db
+from src.refresh_scheduler import DEFAULT_TTL_DAYS, enqueue_stale
+
+
+def _parse_ttl(values):
+    ttl = {}
+    for value in values:
+        tier, _, days = value.rpartition("=")
+        if tier not in DEFAULT_TTL_DAYS:
+            raise SystemExit(f"Unknown tier {tier!r}; expected one of {list(DEFAULT_TTL_DAYS)}")
+        ttl[tier] = float(days)
+    return ttl
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Re-queue profiles whose enrichment is older than their tier's TTL"
+    )
+    parser.add_argument("--db", default="data/followers.db",
+                        help="Path to followers database")
+    parser.add_argument("--budget", type=int, default=config.REFRESH_DAILY_BUDGET,
+                        help="Max profiles re-queued per rolling 24 hours "
+                             f"(default: {config.REFRESH_DAILY_BUDGET})")
+    parser.add_argument("--ttl-days", action="append", default=[], metavar="TIER=DAYS",
+                        help="Override a tier's TTL; repeatable")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Report what would be re-queued without changing the DB")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Database not found: {args.db}")
+        sys.exit(1)
+
+    init_db(args.db)
+    result = enqueue_stale(args.db, daily_budget=args.budget,
+                           ttl_days=_parse_ttl(args.ttl_days), dry_run=args.dry_run)
+
+    prefix = "[DRY RUN] Would re-queue" if args.dry_run else "Re-queued"
+    print(f"{prefix} {result['enqueued']} of {result['stale']} stale profiles "
+          f"({result['budget_left']} left in today's budget).")
+    for tier, count in result["by_tier"].items():
+        print(f"  {tier}: {count}")
+
+
+if __name__ == "__main__":
+    main()
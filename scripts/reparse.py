@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Re-parse cached profile pages with the current parser — no re-crawl.
+
+enrich.py --cache-dir keeps every fetched page's raw text, and
+enrich.py --record keeps it in a fetch archive. After a fix to
+src/profile_parser.py, this runs the parser, classifier and scorer over
+each handle's newest stored page and writes the results back in one
+transaction. Parsing is spread over --workers processes.
+
+Usage:
+    python3 scripts/reparse.py --cache-dir data/page_cache [--db data/followers.db]
+        [--handle someone ...] [--workers 4]
+    python3 scripts/reparse.py --archive output/archives [--db data/followers.db]
+"""
+import argparse
+import os
+import sys
+import time
+
+# Allow imports from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database import init_db
+from src.fetch_archive import latest_pages
+from src.page_cache import PageCache
+from src.pipeline import reparse_pages, run_reparse
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Re-parse cached profile pages and update the database"
+    )
+    parser.add_argument("--db", default="data/followers.db",
+                        help="Path to followers database")
+    parser.add_argument("--cache-dir", default="data/page_cache",
+                        help="Page cache directory written by enrich.py --cache-dir")
+    parser.add_argument("--archive", default=None, metavar="PATH",
+                        help="Re-parse a fetch archive (enrich.py --record), or a "
+                             "directory of them, instead of the page cache")
+    parser.add_argument("--handle", action="append", default=None,
+                        help="Only re-parse this handle; repeatable")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Parser processes (default: CPU count; 1 parses in-process)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Database not found: {args.db}")
+        sys.exit(1)
+    source = args.archive or args.cache_dir
+    if args.archive and not os.path.exists(args.archive):
+        print(f"Archive not found: {args.archive}")
+        sys.exit(1)
+    if not args.archive and not os.path.isdir(args.cache_dir):
+        print(f"Page cache not found: {args.cache_dir}")
+        sys.exit(1)
+
+    init_db(args.db)
+    started = time.monotonic()
+    if args.archive:
+        pages = latest_pages(args.archive, handles=args.handle)
+        result = reparse_pages(args.db, pages, workers=args.workers)
+    else:
+        cache = PageCache(args.cache_dir)
+        result = run_reparse(args.db, cache, handles=args.handle, workers=args.workers)
+    elapsed = time.monotonic() - started
+
+    print(f"Re-parsed {result['reparsed']} profiles from {source} in {elapsed:.2f}s "
+          f"({result['skipped']} wall or unparseable pages skipped, "
+          f"{result['missing']} stored handles not in the database).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Replay a recorded enrichment run through the orchestrator, offline.
+
+Takes an archive written by `scripts/enrich.py --record` and enriches
+its handles in a temporary database, answering every fetch from the
+archive: the same pages, page states and parse work as the live run,
+with no browser or network. Use it as a benchmark corpus for parser and
+orchestrator changes, or to reproduce what a run saw.
+
+Usage:
+    python3 scripts/replay_fetches.py ARCHIVE [--time-scale 0]
+        [--staged --fetch-workers 4] [--report output/replay.json]
+"""
+import argparse
+import json
+import os
+import sys
+
+# Allow imports from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.fetch_archive import ReplayFetcher
+from src.metrics import format_metrics_summary
+from src.simulator import simulate
+from src.staged_pipeline import format_stage_report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay a recorded fetch archive through the orchestrator"
+    )
+    parser.add_argument("archive", help="Archive written by enrich.py --record")
+    parser.add_argument("--time-scale", type=float, default=0.0,
+                        help="Sleep this fraction of each recorded fetch time "
+                             "(default: 0, full speed; 1 replays at the recorded pace)")
+    parser.add_argument("--staged", action="store_true",
+                        help="Use the staged pipeline instead of run_all")
+    parser.add_argument("--fetch-workers", type=int, default=1,
+                        help="Fetch workers for --staged (default: 1)")
+    parser.add_argument("--report", default=None, metavar="PATH",
+                        help="Write the full JSON report to PATH")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.archive):
+        print(f"Archive not found: {args.archive}")
+        sys.exit(1)
+
+    fetcher = ReplayFetcher(args.archive, time_scale=args.time_scale)
+    if not fetcher.handles:
+        print(f"No fetches recorded in {args.archive}")
+        sys.exit(1)
+    kwargs = {"fetch_workers": args.fetch_workers} if args.staged else {}
+    report = simulate(fetcher=fetcher, handles=fetcher.handles, staged=args.staged,
+                      report_path=args.report, **kwargs)
+
+    result = report["result"]
+    print(f"Runner: {report['runner']}  profiles: {report['profiles']}  "
+          f"fetches: {report['fetches']}")
+    print(f"Completed: {result['total_completed']}  errors: {result['total_errors']}  "
+          f"reason: {result['reason']}")
+    print(f"Outcomes: {json.dumps(report['outcomes'], sort_keys=True)}")
+    print(f"Elapsed: {report['elapsed_seconds']}s  "
+          f"throughput: {report['profiles_per_hour']} profiles/hour")
+    print("\nStage timings:")
+    print(format_metrics_summary(report["stages"]))
+    if "stages" in result:
+        print("\nPipeline stages:")
+        print(format_stage_report(result["stages"]))
+    if args.report:
+        print(f"\nReport written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
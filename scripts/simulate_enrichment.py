@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Benchmark the enrichment orchestrator offline with a synthetic fetcher.
+
+No browser or network: profiles are generated locally with a configurable
+latency distribution and outcome mix, then enriched through run_all (or the
+staged pipeline) against a temporary database.
+
+Usage:
+    python3 scripts/simulate_enrichment.py [--profiles 500] [--latency-mean 2.0]
+        [--time-scale 0.01] [--private-rate 0.3] [--staged --fetch-workers 4]
+        [--report output/simulation.json]
+"""
+import argparse
+import json
+import os
+import sys
+
+# Allow imports from project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.metrics import format_metrics_summary
+from src.simulator import DEFAULT_RATES, LATENCY_DISTRIBUTIONS, SyntheticFetcher, simulate
+from src.staged_pipeline import format_stage_report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Offline enrichment simulator (synthetic fetcher, no network)"
+    )
+    parser.add_argument("--profiles", type=int, default=200,
+                        help="Number of synthetic followers (default: 200)")
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="lognormal",
+                        help="Fetch latency distribution (default: lognormal)")
+    parser.add_argument("--latency-mean", type=float, default=2.0,
+                        help="Mean (median for lognormal) fetch latency in seconds")
+    parser.add_argument("--latency-spread", type=float, default=0.5,
+                        help="Uniform half-width or lognormal sigma (default: 0.5)")
+    parser.add_argument("--time-scale", type=float, default=0.01,
+                        help="Multiply simulated latency by this factor when sleeping "
+                             "(default: 0.01; 0 disables sleeping)")
+    for outcome, rate in DEFAULT_RATES.items():
+        parser.add_argument(f"--{outcome.replace('_', '-')}-rate", type=float, default=rate,
+                            help=f"Probability of a {outcome} page (default: {rate})")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Random seed for a reproducible run")
+    parser.add_argument("--staged", action="store_true",
+                        help="Use the staged pipeline instead of run_all")
+    parser.add_argument("--fetch-workers", type=int, default=1,
+                        help="Fetch workers for --staged (default: 1)")
+    parser.add_argument("--report", default=None, metavar="PATH",
+                        help="Write the full JSON report to PATH")
+    args = parser.parse_args()
+
+    fetcher = SyntheticFetcher(
+        latency=args.latency,
+        latency_mean=args.latency_mean,
+        latency_spread=args.latency_spread,
+        rates={outcome: getattr(args, f"{outcome}_rate") for outcome in DEFAULT_RATES},
+        time_scale=args.time_scale,
+        seed=args.seed,
+    )
+    kwargs = {"fetch_workers": args.fetch_workers} if args.staged else {}
+    report = simulate(args.profiles, fetcher=fetcher, staged=args.staged,
+                      report_path=args.report, **kwargs)
+
+    result = report["result"]
+    print(f"Runner: {report['runner']}  profiles: {report['profiles']}  "
+          f"fetches: {report['fetches']}")
+    print(f"Completed: {result['total_completed']}  errors: {result['total_errors']}  "
+          f"reason: {result['reason']}")
+    print(f"Outcomes: {json.dumps(report['outcomes'], sort_keys=True)}")
+    print(f"Elapsed: {report['elapsed_seconds']}s  "
+          f"throughput: {report['profiles_per_hour']} profiles/hour")
+    print("\nStage timings:")
+    print(format_metrics_summary(report["stages"]))
+    if "stages" in result:
+        print("\nPipeline stages:")
+        print(format_stage_report(result["stages"]))
+    if args.report:
+        print(f"\nReport written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
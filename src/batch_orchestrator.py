@@ -4,11 +4,23 @@ import sqlite3
 import sys
 
 from src import config
-from src.database import update_follower
+from src.circuit_breaker import CLOSED, TRIP_STATES
+from src.database import update_follower, update_followers
+from src.fetchers import FetchBudgetExhausted
+from src.metrics import timed
+from src.profile_parser import parse_profile_page
 from src.location_detector import is_hawaii
 from src.classifier import classify
 from src.scorer import score
 
+# Page states that end a profile's enrichment without classification.
+DEAD_STATES = {"not_found", "suspended"}
+# Row statuses process_batch defers to one bulk write per batch.
+TERMINAL_STATUSES = {"private", "error"}
+# Merged into every update that records a fetched outcome: a refreshed
+# row (see database.enqueue_refreshes) is then no longer one.
+_REFRESH_DONE = {"refresh_of": None, "refresh_processed_at": None}
+
 
 def _connect(db_path):
     """Open a connection with Row factory and WAL mode."""
@@ -18,11 +30,13 @@ def _connect(db_path):
     return conn
 
 
-def create_batch(db_path):
+def create_batch(db_path, run_id=None):
     """Claim up to BATCH_SIZE pending records after crash recovery.
 
     Resets any 'processing' records older than 5 minutes to 'pending',
-    then atomically claims pending records as 'processing'.
+    then atomically claims pending records as 'processing', highest
+    priority_estimate first. Claimed rows are leased to *run_id* so that
+    run can later release only its own rows.
     Returns list of dicts, or [] when no pending records remain.
     """
     conn = _connect(db_path)
@@ -35,7 +49,7 @@ def create_batch(db_path):
         # Crash recovery: reset stale processing records
         cutoff = (datetime.datetime.now() - datetime.timedelta(minutes=5)).isoformat()
         conn.execute(
-            "UPDATE followers SET status = 'pending' "
+            "UPDATE followers SET status = 'pending', lease_owner = NULL "
             "WHERE status = 'processing' AND processed_at < ?",
             (cutoff,)
         )
@@ -43,7 +57,8 @@ def create_batch(db_path):
         # Claim pending records atomically
         batch_size = config.BATCH_SIZE
         rows = conn.execute(
-            "SELECT * FROM followers WHERE status = 'pending' LIMIT ?",
+            "SELECT * FROM followers WHERE status = 'pending' "
+            "ORDER BY priority_estimate DESC, id LIMIT ?",
             (batch_size,)
         ).fetchall()
 
@@ -54,9 +69,9 @@ def create_batch(db_path):
             placeholders = ",".join("?" for _ in handles)
             now = datetime.datetime.now().isoformat()
             conn.execute(
-                f"UPDATE followers SET status = 'processing', processed_at = ? "
-                f"WHERE handle IN ({placeholders})",
-                [now] + handles,
+                f"UPDATE followers SET status = 'processing', processed_at = ?, "
+                f"lease_owner = ? WHERE handle IN ({placeholders})",
+                [now, run_id] + handles,
             )
 
         conn.commit()
@@ -69,105 +84,253 @@ def create_batch(db_path):
         conn.close()
 
 
-def process_batch(db_path, batch, fetcher_fn):
+def build_update(follower, enriched, metrics=None):
+    """Turn a fetcher result into the followers-row update for *follower*.
+
+    Runs location detection, classification and scoring (each timed into
+    *metrics* when given); touches no I/O.
+    Dead profiles (not_found/suspended) yield an error update, and private
+    profiles keep only their scraped fields — neither is classified or
+    scored, since reports only rank completed rows. Raises
+    RuntimeError for rate_limited/login_required and unknown page states
+    so callers route them through their retry path.
+    """
+    handle = follower["handle"]
+    display_name = follower.get("display_name", "")
+    page_state = (enriched.get("page_state") or "normal").lower()
+
+    if page_state in DEAD_STATES:
+        return {
+            "status": "error",
+            "error_message": page_state,
+            "processed_at": datetime.datetime.now().isoformat(),
+            **_REFRESH_DONE,
+        }
+
+    if page_state in {"rate_limited", "login_required"}:
+        # Propagate through the standard error path so retry/stop logic applies.
+        raise RuntimeError(page_state)
+
+    if page_state != "normal":
+        raise RuntimeError(f"unknown_page_state:{page_state}")
+
+    bio = enriched.get("bio") or ""
+    scraped = {
+        "follower_count": enriched.get("follower_count"),
+        "following_count": enriched.get("following_count"),
+        "post_count": enriched.get("post_count"),
+        "bio": bio,
+        "website": enriched.get("website"),
+        "is_verified": enriched.get("is_verified"),
+        "is_private": enriched.get("is_private"),
+        "is_business": enriched.get("is_business"),
+    }
+
+    if enriched.get("is_private"):
+        return {**scraped, "status": "private",
+                "processed_at": datetime.datetime.now().isoformat(), **_REFRESH_DONE}
+
+    combined_text = f"{handle} {display_name} {bio}"
+
+    with timed(metrics, "location"):
+        hi = is_hawaii(combined_text)
+
+    profile = {**enriched, "handle": handle, "display_name": display_name,
+               "is_hawaii": hi}
+    with timed(metrics, "classify"):
+        classification = classify(profile)
+    profile["category"] = classification["category"]
+    profile["subcategory"] = classification["subcategory"]
+
+    with timed(metrics, "score"):
+        scoring = score(profile)
+
+    return {
+        **scraped,
+        "category": classification["category"],
+        "subcategory": classification["subcategory"],
+        "confidence": classification["confidence"],
+        "is_hawaii": hi,
+        "location": "Hawaii" if hi else None,
+        "priority_score": scoring["priority_score"],
+        "priority_reason": scoring["priority_reason"],
+        "status": "completed",
+        "processed_at": datetime.datetime.now().isoformat(),
+        **_REFRESH_DONE,
+    }
+
+
+def error_update(exc):
+    """Return the followers-row update recording a failed fetch."""
+    return {
+        "status": "error",
+        "error_message": str(exc),
+        "processed_at": datetime.datetime.now().isoformat(),
+    }
+
+
+def refresh_failed_update(follower):
+    """Return the update putting a refreshed row back as it was.
+
+    For a row re-queued by the refresh scheduler whose fetch failed on
+    every attempt: its old status and processed_at come back, and its
+    enriched fields were never overwritten, so reports keep showing it
+    and the scheduler finds it stale again later.
+    """
+    return {
+        "status": follower["refresh_of"],
+        "processed_at": follower["refresh_processed_at"],
+        "error_message": None,
+        **_REFRESH_DONE,
+    }
+
+
+def _page_state(enriched):
+    return (enriched.get("page_state") or "normal").lower()
+
+
+def process_batch(db_path, batch, fetcher_fn, breaker=None, metrics=None):
     """Process a batch of followers through the enrichment pipeline.
 
-    Returns {completed: int, errors: int}.
+    Returns {completed: int, errors: int, released: int, budget_exhausted: bool}.
     Error on a single follower doesn't stop the batch.
+
+    *fetcher_fn* returns a parsed profile dict, or raw page text which is
+    then run through ``parse_profile_page``. With *metrics*
+    (``src.metrics.RunMetrics``), each stage's latency is recorded.
+
+    Completed rows are written as they finish; private, dead and failed
+    rows are collected and written together in one transaction at the end
+    of the batch.
+
+    With a *breaker* (``src.circuit_breaker.CircuitBreaker``), every page
+    state is reported to it. While it is open, remaining followers are not
+    fetched and go back to 'pending' without an error, as does the row
+    whose login_required/rate_limited page opened it.
+
+    If *fetcher_fn* raises ``FetchBudgetExhausted``, that follower and the
+    rest of the batch go back to 'pending' and ``budget_exhausted`` is set.
+
+    If *fetcher_fn* has a ``prefetch(handle, profile_url)`` method, it is
+    told which follower comes next before each fetch, so it can start
+    loading that page while the current one is parsed and written.
     """
     completed = 0
     errors = 0
+    released = []
+    deferred = []
+    budget_exhausted = False
+    prefetch = getattr(fetcher_fn, "prefetch", None)
 
-    for follower in batch:
+    for i, follower in enumerate(batch):
         handle = follower["handle"]
         profile_url = follower.get("profile_url", "")
-        display_name = follower.get("display_name", "")
 
+        if breaker is not None and not breaker.allow():
+            released.append(handle)
+            continue
+
+        enriched = None
         try:
-            enriched = fetcher_fn(handle, profile_url)
-            page_state = (enriched.get("page_state") or "normal").lower()
-
-            if page_state in {"not_found", "suspended"}:
-                update_follower(db_path, handle, {
-                    "status": "error",
-                    "error_message": page_state,
-                    "processed_at": datetime.datetime.now().isoformat(),
-                })
+            if prefetch is not None and i + 1 < len(batch):
+                upcoming = batch[i + 1]
+                prefetch(upcoming["handle"], upcoming.get("profile_url", ""))
+            with timed(metrics, "fetch", handle=handle):
+                enriched = fetcher_fn(handle, profile_url)
+            if isinstance(enriched, str):
+                with timed(metrics, "parse", handle=handle):
+                    enriched = parse_profile_page(enriched)
+            if breaker is not None:
+                page_state = _page_state(enriched)
+                breaker.record(page_state)
+                if page_state in TRIP_STATES and breaker.state != CLOSED:
+                    released.append(handle)
+                    continue
+            update_data = build_update(follower, enriched, metrics=metrics)
+            if update_data["status"] in TERMINAL_STATUSES:
+                deferred.append((handle, update_data))
+            else:
+                with timed(metrics, "write", handle=handle):
+                    update_follower(db_path, handle, update_data)
+            if update_data["status"] == "error":
                 errors += 1
-                continue
-
-            if page_state in {"rate_limited", "login_required"}:
-                # Propagate through the standard error path so retry/stop logic applies.
-                raise RuntimeError(page_state)
-
-            if page_state != "normal":
-                raise RuntimeError(f"unknown_page_state:{page_state}")
-
-            bio = enriched.get("bio") or ""
-            combined_text = f"{handle} {display_name} {bio}"
-
-            hi = is_hawaii(combined_text)
-
-            profile = {**enriched, "handle": handle, "display_name": display_name,
-                       "is_hawaii": hi}
-            classification = classify(profile)
-            profile["category"] = classification["category"]
-            profile["subcategory"] = classification["subcategory"]
-
-            scoring = score(profile)
-
-            update_data = {
-                "follower_count": enriched.get("follower_count"),
-                "following_count": enriched.get("following_count"),
-                "post_count": enriched.get("post_count"),
-                "bio": bio,
-                "website": enriched.get("website"),
-                "is_verified": enriched.get("is_verified"),
-                "is_private": enriched.get("is_private"),
-                "is_business": enriched.get("is_business"),
-                "category": classification["category"],
-                "subcategory": classification["subcategory"],
-                "confidence": classification["confidence"],
-                "is_hawaii": hi,
-                "location": "Hawaii" if hi else None,
-                "priority_score": scoring["priority_score"],
-                "priority_reason": scoring["priority_reason"],
-                "status": "private" if enriched.get("is_private") else "completed",
-                "processed_at": datetime.datetime.now().isoformat(),
-            }
-            update_follower(db_path, handle, update_data)
-            completed += 1
+            else:
+                completed += 1
 
+        except FetchBudgetExhausted as e:
+            print(f"[STOP] {handle}: {e}", file=sys.stderr)
+            released += [f["handle"] for f in batch[i:]]
+            budget_exhausted = True
+            break
         except Exception as e:
             print(f"[ERROR] {handle}: {type(e).__name__}: {e}", file=sys.stderr)
-            update_follower(db_path, handle, {
-                "status": "error",
-                "error_message": str(e),
-                "processed_at": datetime.datetime.now().isoformat(),
-            })
+            if breaker is not None and enriched is None:
+                breaker.record("error")
+            deferred.append((handle, error_update(e)))
             errors += 1
 
-    return {"completed": completed, "errors": errors}
+    deferred += [(h, {"status": "pending"}) for h in released]
+    if deferred:
+        with timed(metrics, "write", rows=len(deferred)):
+            update_followers(db_path, deferred)
+
+    return {"completed": completed, "errors": errors, "released": len(released),
+            "budget_exhausted": budget_exhausted}
+
+
+def _release_trip_errors(db_path, batch):
+    """Reset login_required/rate_limited error rows of *batch* to pending."""
+    handles = [f["handle"] for f in batch]
+    placeholders = ",".join("?" for _ in handles)
+    conn = _connect(db_path)
+    try:
+        conn.execute(
+            f"UPDATE followers SET status = 'pending', error_message = NULL "
+            f"WHERE status = 'error' AND error_message IN ('login_required', 'rate_limited') "
+            f"AND handle IN ({placeholders})",
+            handles,
+        )
+        conn.commit()
+    finally:
+        conn.close()
 
 
-def run_with_retries(db_path, batch, fetcher_fn):
+def run_with_retries(db_path, batch, fetcher_fn, breaker=None, metrics=None):
     """Process batch with up to MAX_RETRIES total attempts.
 
-    Returns {completed: int, errors: int, retries_used: int, exhausted: bool}.
+    Returns {completed: int, errors: int, retries_used: int, exhausted: bool,
+    budget_exhausted: bool}.
+    A refreshed row that still fails after the last attempt is counted as
+    an error but restored with ``refresh_failed_update``.
+    Retrying stops early if *breaker* opens or the fetcher's budget runs
+    out; released rows are 'pending', so they are neither errors nor
+    exhaustion.
     """
     max_retries = config.MAX_RETRIES
     total_completed = 0
     retries_used = 0
+    budget_exhausted = False
 
     current_batch = batch
 
     for attempt in range(max_retries):
-        result = process_batch(db_path, current_batch, fetcher_fn)
+        result = process_batch(db_path, current_batch, fetcher_fn, breaker=breaker,
+                               metrics=metrics)
         total_completed += result["completed"]
 
+        if result["budget_exhausted"]:
+            budget_exhausted = True
+            break
+
         if result["errors"] == 0:
             break
 
+        if breaker is not None and breaker.state != CLOSED:
+            # Rows that failed on the same session problem before the
+            # breaker opened go back to pending too.
+            _release_trip_errors(db_path, batch)
+            break
+
         if attempt < max_retries - 1:
             retries_used += 1
             # Reset error records to pending for retry
@@ -200,40 +363,83 @@ def run_with_retries(db_path, batch, fetcher_fn):
             finally:
                 conn.close()
 
-    # Count remaining errors
+    # Count remaining errors; failed refreshes still count, but their rows
+    # go back to their previous data rather than staying 'error'.
     final_errors = 0
+    restored = []
     conn = _connect(db_path)
     try:
         for follower in batch:
             row = conn.execute(
-                "SELECT status FROM followers WHERE handle = ?",
+                "SELECT * FROM followers WHERE handle = ?",
                 (follower["handle"],)
             ).fetchone()
             if row and row["status"] == "error":
                 final_errors += 1
+                if row["refresh_of"] is not None:
+                    restored.append((row["handle"], refresh_failed_update(row)))
     finally:
         conn.close()
+    if restored:
+        update_followers(db_path, restored)
 
     return {
         "completed": total_completed,
         "errors": final_errors,
         "retries_used": retries_used,
         "exhausted": final_errors > 0,
+        "budget_exhausted": budget_exhausted,
     }
 
 
-def run_all(db_path, fetcher_fn):
+def run_all(db_path, fetcher_fn, breaker=None, metrics=None, run_id=None,
+            should_stop=None, checkpoint=None):
     """Process all pending followers in batches.
 
     Returns {batches_run, total_completed, total_errors, stopped, reason}.
-    Stops on exhausted retries with {stopped: True, reason: "batch_exhausted"}.
+    Stops on exhausted retries with {stopped: True, reason: "batch_exhausted"},
+    and with reason "budget_exhausted" once the fetcher raises
+    ``FetchBudgetExhausted`` (unfetched rows stay pending).
+    Per-stage latencies go to *metrics*; read them with ``metrics.summary()``.
+
+    Drain support: *should_stop* is checked before each claim; once it
+    returns True the run stops with reason "drained" after finishing the
+    batch in flight. Rows are leased to *run_id*, and *checkpoint*, if
+    given, is called after every batch with the running counters.
+
+    With a *breaker*, no batch is claimed while it is open: the run sleeps
+    until a half-open probe is allowed and resumes. If the breaker has
+    opened ``max_trips`` times the run stops with reason "circuit_open".
     """
     batches_run = 0
     total_completed = 0
     total_errors = 0
 
     while True:
-        batch = create_batch(db_path)
+        if should_stop is not None and should_stop():
+            return {
+                "batches_run": batches_run,
+                "total_completed": total_completed,
+                "total_errors": total_errors,
+                "stopped": True,
+                "reason": "drained",
+            }
+
+        if breaker is not None and breaker.state != CLOSED:
+            if breaker.exhausted:
+                return {
+                    "batches_run": batches_run,
+                    "total_completed": total_completed,
+                    "total_errors": total_errors,
+                    "stopped": True,
+                    "reason": "circuit_open",
+                }
+            breaker.wait(should_stop=should_stop)
+            if should_stop is not None and should_stop():
+                continue
+
+        with timed(metrics, "claim"):
+            batch = create_batch(db_path, run_id=run_id)
         if not batch:
             return {
                 "batches_run": batches_run,
@@ -244,10 +450,27 @@ def run_all(db_path, fetcher_fn):
             }
 
         batches_run += 1
-        result = run_with_retries(db_path, batch, fetcher_fn)
+        result = run_with_retries(db_path, batch, fetcher_fn, breaker=breaker,
+                                  metrics=metrics)
         total_completed += result["completed"]
         total_errors += result["errors"]
 
+        if checkpoint is not None:
+            checkpoint({
+                "batches_run": batches_run,
+                "total_completed": total_completed,
+                "total_errors": total_errors,
+            })
+
+        if result["budget_exhausted"]:
+            return {
+                "batches_run": batches_run,
+                "total_completed": total_completed,
+                "total_errors": total_errors,
+                "stopped": True,
+                "reason": "budget_exhausted",
+            }
+
         if result["exhausted"]:
             return {
                 "batches_run": batches_run,
@@ -0,0 +1,111 @@
+"""Tab health sampling for long browser runs.
+
+A tab that has loaded hundreds of profiles holds on to heap and slows
+down; recycling on a fixed count either comes too late or throws away
+healthy tabs. ``HealthMonitor`` is a ``PagePool`` health check that
+samples a tab every few checkouts: its JS heap size and how long a
+trivial round-trip to it takes. A tab over the heap limit, or slow on
+consecutive samples, fails the check and the pool replaces just that
+tab; the browser connection is left alone.
+
+The sampling itself is a ``probe(page)`` callable, so this module has no
+browser dependency; scripts/enrich.py probes through CDP.
+"""
+import threading
+
+DEFAULT_MAX_HEAP_MB = 400
+DEFAULT_MAX_RESPONSE_MS = 2000
+
+
+class HealthMonitor:
+    """``health_check(page)`` judging tabs by heap size and responsiveness.
+
+    Args:
+        probe: ``probe(page)`` -> {"heap_bytes": int or None,
+            "response_ms": float}
+        max_heap_mb: recycle a tab whose JS heap is above this
+        max_response_ms: recycle a tab this slow on *slow_samples*
+            consecutive samples (one slow sample may just be a busy page)
+        sample_every: probe a tab on every Nth health check only
+        metrics: ``src.metrics.RunMetrics``; each sample is observed as a
+            "health" stage (the round-trip) with ``heap_mb`` in its fields
+        on_recycle: ``on_recycle(page)`` called on a tab that failed its
+            check, before the pool disposes of it (e.g. to clear the
+            storage its replacement would inherit); errors are ignored
+    """
+
+    def __init__(self, probe, max_heap_mb=DEFAULT_MAX_HEAP_MB,
+                 max_response_ms=DEFAULT_MAX_RESPONSE_MS, sample_every=10,
+                 slow_samples=2, metrics=None, on_recycle=None):
+        self.probe = probe
+        self.on_recycle = on_recycle
+        self.max_heap_mb = max_heap_mb
+        self.max_response_ms = max_response_ms
+        self.sample_every = max(1, sample_every)
+        self.slow_samples = max(1, slow_samples)
+        self.metrics = metrics
+        self._lock = threading.Lock()
+        self._checks = {}  # id(page) -> health checks since the tab opened
+        self._slow = {}    # id(page) -> consecutive slow samples
+        self.samples = 0
+        self.recycled = {}
+        self.peak_heap_mb = 0.0
+        self.last = None
+
+    def check(self, page):
+        """Return False if *page* should be recycled."""
+        key = id(page)
+        with self._lock:
+            count = self._checks[key] = self._checks.get(key, 0) + 1
+        if count % self.sample_every:
+            return True
+
+        sample = self.probe(page)
+        heap = sample.get("heap_bytes")
+        heap_mb = heap / 1_048_576 if heap is not None else None
+        response_ms = sample.get("response_ms") or 0.0
+        if self.metrics is not None:
+            self.metrics.observe("health", response_ms / 1000,
+                                 heap_mb=None if heap_mb is None else round(heap_mb, 1))
+
+        with self._lock:
+            self.samples += 1
+            self.last = {"heap_mb": heap_mb, "response_ms": response_ms}
+            if heap_mb is not None:
+                self.peak_heap_mb = max(self.peak_heap_mb, heap_mb)
+            if response_ms > self.max_response_ms:
+                self._slow[key] = self._slow.get(key, 0) + 1
+            else:
+                self._slow.pop(key, None)
+            reason = None
+            if heap_mb is not None and heap_mb > self.max_heap_mb:
+                reason = "heap"
+            elif self._slow.get(key, 0) >= self.slow_samples:
+                reason = "slow"
+            if reason is None:
+                return True
+            self.recycled[reason] = self.recycled.get(reason, 0) + 1
+        self.forget(page)
+        if self.on_recycle is not None:
+            try:
+                self.on_recycle(page)
+            except Exception:
+                pass
+        return False
+
+    def forget(self, page):
+        """Drop per-tab state; call when a tab is disposed of."""
+        with self._lock:
+            self._checks.pop(id(page), None)
+            self._slow.pop(id(page), None)
+
+    def stats(self):
+        with self._lock:
+            return {"samples": self.samples, "recycled": dict(self.recycled),
+                    "peak_heap_mb": round(self.peak_heap_mb, 1), "last": self.last}
+
+    def describe(self):
+        stats = self.stats()
+        recycled = sum(stats["recycled"].values())
+        return (f"{stats['samples']} samples, peak heap {stats['peak_heap_mb']} MB, "
+                f"{recycled} tabs recycled")
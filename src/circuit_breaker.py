@@ -0,0 +1,140 @@
+"""Run-wide circuit breaker for session-level fetch failures.
+
+A logged-out session or an Instagram rate-limit wall fails every profile
+the same way. Retrying each one only burns fetch attempts and turns good
+rows into errors. The breaker counts consecutive ``login_required`` /
+``rate_limited`` outcomes across all workers:
+
+- closed: fetches flow normally;
+- open: after ``threshold`` consecutive trips, no new work is claimed and
+  in-flight rows go back to 'pending' untouched;
+- half-open: once ``cooldown_seconds`` have passed, a single probe fetch
+  is let through. Success closes the breaker, another trip reopens it.
+"""
+import threading
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Page states that indicate the session, not the profile, is the problem.
+TRIP_STATES = {"login_required", "rate_limited"}
+
+
+class CircuitBreaker:
+    """Thread-safe breaker shared by every worker in a run.
+
+    Args:
+        threshold: consecutive trip outcomes that open the breaker
+        cooldown_seconds: time spent open before a half-open probe
+        max_trips: give up (``exhausted``) after this many openings;
+            None keeps probing forever
+        clock / sleep: injectable for tests
+    """
+
+    def __init__(self, threshold=3, cooldown_seconds=300, max_trips=None,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.threshold = threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.max_trips = max_trips
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+        self.trips = 0
+        self.last_reason = None
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == OPEN and self._clock() - self._opened_at >= self.cooldown_seconds:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow(self):
+        """Return True if a fetch may proceed now.
+
+        In half-open state only one probe is allowed until it reports back.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    @property
+    def exhausted(self):
+        """True once the breaker has opened ``max_trips`` times."""
+        return self.max_trips is not None and self.trips >= self.max_trips
+
+    def record(self, page_state):
+        """Report a fetch outcome: a page state, or 'error' for an exception.
+
+        Errors say nothing about the session: they neither reset nor add
+        to the failure streak, but they do free a half-open probe slot.
+        """
+        state = (page_state or "normal").lower()
+        with self._lock:
+            if state == "error":
+                self._probe_in_flight = False
+            elif state in TRIP_STATES:
+                self._failures += 1
+                self.last_reason = state
+                if self._state == HALF_OPEN or self._failures >= self.threshold:
+                    if self._state != OPEN:
+                        self.trips += 1
+                    self._state = OPEN
+                    self._opened_at = self._clock()
+                    self._probe_in_flight = False
+            else:
+                self._failures = 0
+                if self._state == HALF_OPEN:
+                    self._state = CLOSED
+                    self._probe_in_flight = False
+
+    def seconds_until_probe(self):
+        """Seconds until the breaker goes half-open (0 unless open)."""
+        with self._lock:
+            if self._current_state() != OPEN:
+                return 0.0
+            return max(0.0, self.cooldown_seconds - (self._clock() - self._opened_at))
+
+    def wait(self, should_stop=None, poll_seconds=1.0):
+        """Sleep until a half-open probe is possible. Returns seconds slept.
+
+        With *should_stop*, sleeps in steps of at most *poll_seconds* and
+        returns early once it returns True, so a drain request isn't held
+        up for the rest of the cooldown.
+        """
+        if should_stop is None:
+            wait = self.seconds_until_probe()
+            if wait > 0:
+                self._sleep(wait)
+            return wait
+        slept = 0.0
+        while not should_stop():
+            wait = min(self.seconds_until_probe(), poll_seconds)
+            if wait <= 0:
+                break
+            self._sleep(wait)
+            slept += wait
+        return slept
+
+    def describe(self):
+        """Short status label for progress output."""
+        with self._lock:
+            state = self._current_state()
+        if state == CLOSED:
+            return "circuit closed"
+        return f"circuit {state} ({self.last_reason})"
@@ -4,3 +4,6 @@ import os
 BATCH_SIZE = int(os.environ.get("BATCH_SIZE", 5))
 MAX_SUBAGENTS = int(os.environ.get("MAX_SUBAGENTS", 2))
 MAX_RETRIES = int(os.environ.get("MAX_RETRIES", 3))
+RATE_LIMIT_RATE = float(os.environ.get("RATE_LIMIT_RATE", 0.25))
+RATE_LIMIT_BURST = int(os.environ.get("RATE_LIMIT_BURST", 3))
+REFRESH_DAILY_BUDGET = int(os.environ.get("REFRESH_DAILY_BUDGET", 100))
@@ -1,6 +1,10 @@
 """SQLite storage for Instagram follower data."""
+import datetime
+import json
 import sqlite3
 
+from src.scorer import estimate_priority
+
 _SCHEMA = """
 CREATE TABLE IF NOT EXISTS followers (
     id              INTEGER PRIMARY KEY,
@@ -22,19 +26,60 @@ CREATE TABLE IF NOT EXISTS followers (
     confidence      REAL,
     priority_score  INTEGER,
     priority_reason TEXT,
+    priority_estimate INTEGER,
     status          TEXT,
     error_message   TEXT,
+    lease_owner     TEXT,
+    refresh_of      TEXT,
+    refresh_processed_at DATETIME,
     processed_at    DATETIME,
     created_at      DATETIME DEFAULT CURRENT_TIMESTAMP
 )
 """
 
+# One row per enrichment run, so a drained run can be resumed.
+_RUNS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      TEXT PRIMARY KEY,
+    status      TEXT,
+    started_at  DATETIME,
+    updated_at  DATETIME,
+    counters    TEXT,
+    pacing      TEXT
+)
+"""
+# Run statuses that no live process is behind: resuming these is safe.
+RESUMABLE_RUN_STATUSES = ("drained", "interrupted", "stopped")
+
+# One row per profile re-queued by the refresh scheduler (daily budget).
+_REFRESHES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS refreshes (
+    handle      TEXT,
+    enqueued_at DATETIME
+)
+"""
+
+# Claims take pending rows in priority_estimate order.
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_followers_claim
+    ON followers (status, priority_estimate DESC)
+"""
+
+# Columns added after the first release: (name, type) for ALTER TABLE.
+_MIGRATIONS = [
+    ("priority_estimate", "INTEGER"),
+    ("lease_owner", "TEXT"),
+    ("refresh_of", "TEXT"),
+    ("refresh_processed_at", "DATETIME"),
+]
+
 _VALID_COLUMNS = {
     "handle", "display_name", "profile_url", "follower_count",
     "following_count", "post_count", "bio", "website", "is_verified",
     "is_private", "is_business", "category", "subcategory", "location",
     "is_hawaii", "confidence", "priority_score", "priority_reason",
-    "status", "error_message", "processed_at",
+    "priority_estimate", "status", "error_message", "lease_owner",
+    "refresh_of", "refresh_processed_at", "processed_at",
 }
 
 
@@ -47,20 +92,50 @@ def _connect(db_path: str) -> sqlite3.Connection:
 
 
 def init_db(db_path: str) -> None:
-    """Create SQLite file and followers table. Idempotent."""
+    """Create SQLite file and followers table. Idempotent.
+
+    Also upgrades databases created before later columns existed and
+    fills in missing priority estimates.
+    """
     conn = _connect(db_path)
     try:
         conn.execute(_SCHEMA)
+        existing = {row["name"] for row in conn.execute("PRAGMA table_info(followers)")}
+        for column, col_type in _MIGRATIONS:
+            if column not in existing:
+                conn.execute(f"ALTER TABLE followers ADD COLUMN {column} {col_type}")
+        conn.execute(_INDEXES)
+        conn.execute(_RUNS_SCHEMA)
+        conn.execute(_REFRESHES_SCHEMA)
         conn.commit()
     finally:
         conn.close()
+    backfill_priority_estimates(db_path)
+
+
+def backfill_priority_estimates(db_path: str) -> int:
+    """Compute priority_estimate for rows that lack one. Returns count updated."""
+    conn = _connect(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT handle, display_name FROM followers WHERE priority_estimate IS NULL"
+        ).fetchall()
+        conn.executemany(
+            "UPDATE followers SET priority_estimate = ? WHERE handle = ?",
+            [(estimate_priority(r["handle"], r["display_name"]), r["handle"]) for r in rows],
+        )
+        conn.commit()
+        return len(rows)
+    finally:
+        conn.close()
 
 
 def insert_followers(db_path: str, followers: list) -> int:
     """Insert followers, skipping duplicates by handle. Returns count inserted.
 
     Each follower dict must have: handle, display_name, profile_url.
-    Sets status='pending'. created_at is filled by DEFAULT CURRENT_TIMESTAMP.
+    Sets status='pending' and a pre-enrichment priority_estimate.
+    created_at is filled by DEFAULT CURRENT_TIMESTAMP.
     """
     if not followers:
         return 0
@@ -70,9 +145,11 @@ def insert_followers(db_path: str, followers: list) -> int:
         inserted = 0
         for f in followers:
             cursor = conn.execute(
-                "INSERT OR IGNORE INTO followers (handle, display_name, profile_url, status) "
-                "VALUES (?, ?, ?, 'pending')",
-                (f["handle"], f["display_name"], f["profile_url"]),
+                "INSERT OR IGNORE INTO followers "
+                "(handle, display_name, profile_url, priority_estimate, status) "
+                "VALUES (?, ?, ?, ?, 'pending')",
+                (f["handle"], f["display_name"], f["profile_url"],
+                 estimate_priority(f["handle"], f["display_name"])),
             )
             inserted += cursor.rowcount
         conn.commit()
@@ -82,17 +159,27 @@ def insert_followers(db_path: str, followers: list) -> int:
 
 
 def get_pending(db_path: str, limit: int) -> list:
-    """Return up to `limit` followers with status='pending' as list of dicts."""
+    """Return up to `limit` pending followers, highest priority_estimate first."""
     conn = _connect(db_path)
     try:
         rows = conn.execute(
-            "SELECT * FROM followers WHERE status = 'pending' LIMIT ?", (limit,)
+            "SELECT * FROM followers WHERE status = 'pending' "
+            "ORDER BY priority_estimate DESC, id LIMIT ?", (limit,)
         ).fetchall()
         return [dict(row) for row in rows]
     finally:
         conn.close()
 
 
+def get_all_followers(db_path: str) -> list:
+    """Return every follower row as a dict, in insertion order."""
+    conn = _connect(db_path)
+    try:
+        return [dict(row) for row in conn.execute("SELECT * FROM followers ORDER BY id")]
+    finally:
+        conn.close()
+
+
 def update_follower(db_path: str, handle: str, data: dict) -> None:
     """Update arbitrary fields on the row matching handle."""
     if not data:
@@ -113,6 +200,32 @@ def update_follower(db_path: str, handle: str, data: dict) -> None:
         conn.close()
 
 
+def update_followers(db_path: str, updates: list) -> None:
+    """Apply many (handle, data) updates in a single transaction.
+
+    Same column validation as update_follower; an invalid column in any
+    update rejects the whole call before anything is written.
+    """
+    updates = [(handle, data) for handle, data in updates if data]
+    if not updates:
+        return
+    for _, data in updates:
+        invalid = set(data) - _VALID_COLUMNS
+        if invalid:
+            raise ValueError(f"Invalid column(s): {invalid}")
+    conn = _connect(db_path)
+    try:
+        for handle, data in updates:
+            columns = ", ".join(f"{key} = ?" for key in data)
+            conn.execute(
+                f"UPDATE followers SET {columns} WHERE handle = ?",
+                list(data.values()) + [handle],
+            )
+        conn.commit()
+    finally:
+        conn.close()
+
+
 def get_status_counts(db_path: str) -> dict:
     """Return {'pending': N, 'completed': N, 'error': N, ...} for all statuses present."""
     conn = _connect(db_path)
@@ -123,3 +236,131 @@ def get_status_counts(db_path: str) -> dict:
         return {row["status"]: row["cnt"] for row in rows}
     finally:
         conn.close()
+
+
+def get_enriched_followers(db_path: str) -> list:
+    """Return completed/private rows that have a processed_at, as dicts."""
+    conn = _connect(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT handle, status, priority_score, processed_at FROM followers "
+            "WHERE status IN ('completed', 'private') AND processed_at IS NOT NULL"
+        ).fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        conn.close()
+
+
+def count_refreshes_since(db_path: str, since: str) -> int:
+    """Return how many rows were enqueued for refresh at or after *since*."""
+    conn = _connect(db_path)
+    try:
+        return conn.execute(
+            "SELECT COUNT(*) FROM refreshes WHERE enqueued_at >= ?", (since,)
+        ).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def enqueue_refreshes(db_path: str, handles: list, enqueued_at: str) -> list:
+    """Reset completed/private *handles* to 'pending' and log the refreshes.
+
+    Each row's status and processed_at are kept in refresh_of and
+    refresh_processed_at, so a refresh whose fetch fails can put the row
+    back as it was. A handle whose row is no longer completed or private
+    is skipped and not logged. Both happen in one transaction, so the daily budget
+    always counts exactly the rows that were re-queued. Returns the
+    handles re-queued.
+    """
+    enqueued = []
+    conn = _connect(db_path)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        for handle in handles:
+            cursor = conn.execute(
+                "UPDATE followers SET refresh_of = status, refresh_processed_at = processed_at, "
+                "status = 'pending', error_message = NULL, lease_owner = NULL "
+                "WHERE handle = ? AND status IN ('completed', 'private')",
+                (handle,),
+            )
+            if cursor.rowcount == 1:
+                enqueued.append(handle)
+        conn.executemany(
+            "INSERT INTO refreshes (handle, enqueued_at) VALUES (?, ?)",
+            [(h, enqueued_at) for h in enqueued],
+        )
+        conn.commit()
+        return enqueued
+    finally:
+        conn.close()
+
+
+def save_run(db_path: str, run_id: str, status: str, counters: dict = None,
+             pacing: dict = None) -> None:
+    """Insert or update the run record for *run_id*.
+
+    counters and pacing are stored as JSON; started_at is kept
+    from the first save.
+    """
+    now = datetime.datetime.now().isoformat()
+    conn = _connect(db_path)
+    try:
+        conn.execute(
+            "INSERT INTO runs (run_id, status, started_at, updated_at, counters, pacing) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(run_id) DO UPDATE SET status = excluded.status, "
+            "updated_at = excluded.updated_at, counters = excluded.counters, "
+            "pacing = excluded.pacing",
+            (run_id, status, now, now, json.dumps(counters or {}),
+             json.dumps(pacing or {})),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def load_run(db_path: str, run_id: str = None):
+    """Return the run record for *run_id* as a dict, or None.
+
+    Without *run_id*, returns the most recently updated run that was
+    drained, interrupted or stopped (the one to resume). Runs still
+    'running' or 'paused' may belong to a live process and are only
+    returned when asked for by id.
+    """
+    conn = _connect(db_path)
+    try:
+        if run_id is None:
+            placeholders = ",".join("?" for _ in RESUMABLE_RUN_STATUSES)
+            row = conn.execute(
+                f"SELECT * FROM runs WHERE status IN ({placeholders}) "
+                "ORDER BY updated_at DESC LIMIT 1",
+                RESUMABLE_RUN_STATUSES,
+            ).fetchone()
+        else:
+            row = conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        if row is None:
+            return None
+        record = dict(row)
+        for key in ("counters", "pacing"):
+            record[key] = json.loads(record[key] or "{}")
+        return record
+    finally:
+        conn.close()
+
+
+def release_leases(db_path: str, run_id: str) -> int:
+    """Return rows that *run_id* holds in 'processing' to 'pending'.
+
+    Rows claimed by other runs are left alone. Returns count released.
+    """
+    conn = _connect(db_path)
+    try:
+        cursor = conn.execute(
+            "UPDATE followers SET status = 'pending', lease_owner = NULL "
+            "WHERE status = 'processing' AND lease_owner = ?",
+            (run_id,),
+        )
+        conn.commit()
+        return cursor.rowcount
+    finally:
+        conn.close()
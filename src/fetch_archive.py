@@ -0,0 +1,201 @@
+"""Record what the fetcher saw during a run, and replay it offline.
+
+A fetch archive is a gzip-compressed JSON-lines file. Its first line is
+a header; each following line is one fetch: handle, URL, page state,
+timings, and either ``raw`` (the page text or extraction payload, to be
+parsed again on replay) or ``data`` (an already-parsed profile dict, for
+backends that parse as they fetch). A run killed mid-write leaves a
+truncated archive; reading stops at the last complete line.
+
+``FetchRecorder`` writes archives: scripts/enrich.py --record passes
+one to the browser fetcher. ``ReplayFetcher`` is a ``fetcher_fn`` that
+answers from an archive with no network, at full speed by default or
+at the recorded pace, so a real run can be reproduced through
+``run_all`` as a benchmark corpus for parser and orchestrator work.
+``latest_pages`` feeds archived pages to ``pipeline.reparse_pages``.
+"""
+import datetime
+import glob
+import gzip
+import json
+import os
+import threading
+import time
+import zlib
+
+from src.metrics import timed
+from src.profile_parser import parse_page
+
+FORMAT = "fetch-archive"
+VERSION = 1
+
+
+class FetchRecorder:
+    """Append fetches to a gzip JSON-lines archive at *path*.
+
+    Thread-safe. Lines are compressed as they are written; call
+    ``close()`` (or use as a context manager) to finish the stream.
+    """
+
+    def __init__(self, path, level=6):
+        self.path = path
+        self._file = gzip.open(path, "wt", encoding="utf-8", compresslevel=level)
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self._write({"format": FORMAT, "version": VERSION, "created": time.time()})
+
+    def _write(self, entry):
+        self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def record(self, handle, profile_url, raw=None, data=None, page_state=None,
+               timings=None):
+        """Store one fetch: *raw* page content or parsed *data*, not both."""
+        if (raw is None) == (data is None):
+            raise ValueError("record() needs exactly one of raw or data")
+        entry = {"handle": handle, "url": profile_url, "ts": round(time.time(), 3),
+                 "state": page_state, "timings": timings or {}}
+        if raw is not None:
+            entry["raw"] = raw
+        else:
+            entry["data"] = data
+        with self._lock:
+            self._write(entry)
+            self.recorded += 1
+
+    def wrap(self, fetcher_fn):
+        """Return *fetcher_fn* recording each non-None result it returns."""
+        def recording(handle, profile_url):
+            started = time.monotonic()
+            result = fetcher_fn(handle, profile_url)
+            if result is None:
+                return None
+            timings = {"fetch": round(time.monotonic() - started, 4)}
+            if isinstance(result, str):
+                self.record(handle, profile_url, raw=result, timings=timings)
+            else:
+                self.record(handle, profile_url, data=result, timings=timings,
+                            page_state=result.get("page_state"))
+            return result
+        return recording
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_archive(path):
+    """Yield the fetch entries of an archive, in recorded order."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            header = json.loads(f.readline() or "{}")
+            if header.get("format") != FORMAT:
+                raise ValueError(f"{path} is not a fetch archive")
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # partial last line of an interrupted run
+                yield json.loads(line)
+        except (EOFError, zlib.error):
+            return  # truncated stream: keep what was complete
+
+
+def latest_pages(paths, handles=None):
+    """Yield (handle, fetched_at, raw) for each handle's newest raw fetch.
+
+    *paths* is an archive, a directory of ``*.gz`` archives, or a list
+    of either. Entries stored as parsed ``data`` are skipped: there is
+    nothing to re-parse. *fetched_at* is the recording time as an ISO
+    string, the format ``PageCache.latest()`` yields.
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.gz"))))
+        else:
+            files.append(path)
+
+    wanted = set(handles) if handles is not None else None
+    newest = {}
+    for path in files:
+        for entry in read_archive(path):
+            handle = entry["handle"]
+            if "raw" not in entry or (wanted is not None and handle not in wanted):
+                continue
+            ts = entry.get("ts") or 0
+            if handle not in newest or ts >= newest[handle][0]:
+                newest[handle] = (ts, entry["raw"])
+    for handle in sorted(newest):
+        ts, raw = newest[handle]
+        yield handle, datetime.datetime.fromtimestamp(ts).isoformat(), raw
+
+
+class ReplayFetcher:
+    """``fetcher_fn`` answering from a fetch archive.
+
+    A handle recorded several times is replayed in recorded order, the
+    last entry repeating once they run out. Handles not in the archive
+    return None, so the fetcher works as a registry backend too.
+
+    Args:
+        path: archive written by ``FetchRecorder``
+        time_scale: sleep this fraction of each recorded fetch time;
+            0 replays at full speed
+        metrics: ``RunMetrics`` getting a "parse" observation for raw
+            entries, as the live browser fetcher does
+    """
+
+    def __init__(self, path, time_scale=0.0, metrics=None, sleep=time.sleep):
+        self.time_scale = time_scale
+        self.metrics = metrics
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._entries = {}
+        for entry in read_archive(path):
+            self._entries.setdefault(entry["handle"], []).append(entry)
+        self._served = {}
+        self.fetches = 0
+        self.outcomes = {}
+
+    @property
+    def handles(self):
+        """Recorded handles, in order of first appearance."""
+        return list(self._entries)
+
+    def _next_entry(self, handle):
+        entries = self._entries.get(handle)
+        if not entries:
+            return None
+        with self._lock:
+            i = self._served.get(handle, 0)
+            self._served[handle] = i + 1
+            self.fetches += 1
+        return entries[min(i, len(entries) - 1)]
+
+    def __call__(self, handle, profile_url):
+        entry = self._next_entry(handle)
+        if entry is None:
+            return None
+        if self.time_scale:
+            timings = entry.get("timings") or {}
+            recorded = timings.get("fetch", sum(timings.values()))
+            self._sleep(recorded * self.time_scale)
+        if "data" in entry:
+            result = dict(entry["data"])
+        else:
+            with timed(self.metrics, "parse", handle=handle, source="replay"):
+                result = parse_page(entry["raw"])
+        state = result.get("page_state") or "normal"
+        if state == "normal" and result.get("is_private"):
+            state = "private"
+        with self._lock:
+            self.outcomes[state] = self.outcomes.get(state, 0) + 1
+        return result
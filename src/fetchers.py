@@ -0,0 +1,162 @@
+"""Named fetcher backends and cheapest-first fallback chains.
+
+Every backend is a ``fetcher_fn(handle, profile_url)`` callable, the same
+contract ``run_all`` and ``run_staged`` accept: it returns a parsed
+profile dict or raw page text. A backend that has nothing for a profile
+(a cache miss, a replay archive without that handle) returns None.
+
+``FetcherRegistry`` holds the backends with a concurrency limit and a
+relative cost each. ``registry.chain()`` builds a ``FallbackFetcher``
+that tries them cheapest first, so the browser is used only when no
+local source can answer::
+
+    registry = FetcherRegistry()
+    registry.register("cached", cache_fetcher, concurrency=8, cost=0)
+    registry.register("browser", browser_fetcher, concurrency=1, cost=10)
+    run_all(db_path, registry.chain())
+
+A backend that can fetch nothing more this run (every session has spent
+its request budget) raises ``FetchBudgetExhausted``; the orchestrator
+then returns the profile and all unfetched rows to pending and stops.
+"""
+import threading
+from urllib.parse import urlsplit, urlunsplit
+
+
+class FetchBudgetExhausted(Exception):
+    """Raised by a ``fetcher_fn`` that has no request budget left this run.
+
+    ``run_all`` and ``run_staged`` stop with reason "budget_exhausted",
+    leaving unfetched rows pending rather than marking them as errors.
+    """
+
+
+class Backend:
+    """One registered fetcher with its concurrency limit and cost."""
+
+    def __init__(self, name, fetcher_fn, concurrency=1, cost=1.0):
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        self.name = name
+        self.fetcher_fn = fetcher_fn
+        self.concurrency = concurrency
+        self.cost = cost
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._lock = threading.Lock()
+        self.served = 0
+        self.misses = 0
+        self.errors = 0
+
+    def fetch(self, handle, profile_url):
+        """Call the backend, holding one of its concurrency slots."""
+        with self._slots:
+            try:
+                result = self.fetcher_fn(handle, profile_url)
+            except Exception:
+                with self._lock:
+                    self.errors += 1
+                raise
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.served += 1
+        return result
+
+    def stats(self):
+        return {"served": self.served, "misses": self.misses, "errors": self.errors,
+                "concurrency": self.concurrency, "cost": self.cost}
+
+
+class FetcherRegistry:
+    """Named fetcher backends, e.g. browser, cached, replay, synthetic."""
+
+    def __init__(self):
+        self._backends = {}
+
+    def register(self, name, fetcher_fn, concurrency=1, cost=1.0):
+        """Add or replace backend *name*. Returns the ``Backend``."""
+        backend = Backend(name, fetcher_fn, concurrency=concurrency, cost=cost)
+        self._backends[name] = backend
+        return backend
+
+    def get(self, name):
+        try:
+            return self._backends[name]
+        except KeyError:
+            raise KeyError(f"Unknown fetcher backend: {name!r} "
+                           f"(registered: {', '.join(self._backends) or 'none'})") from None
+
+    def names(self):
+        """Registered backend names, cheapest first."""
+        return [b.name for b in sorted(self._backends.values(), key=lambda b: b.cost)]
+
+    def chain(self, *names):
+        """Return a ``FallbackFetcher`` over *names* (default: all), cheapest first."""
+        backends = [self.get(n) for n in (names or self.names())]
+        if not backends:
+            raise ValueError("No fetcher backends registered")
+        return FallbackFetcher(backends)
+
+    def stats(self):
+        """Return {name: {served, misses, errors, concurrency, cost}}."""
+        return {name: self._backends[name].stats() for name in self.names()}
+
+
+class FallbackFetcher:
+    """``fetcher_fn`` that tries each backend in cost order until one answers.
+
+    A None result moves on to the next backend. An exception from any but
+    the last backend is counted against that backend and also falls
+    through, so a broken cache never costs a profile; the last backend's
+    exception propagates to the orchestrator's retry path. Raises
+    LookupError when every backend misses.
+
+    ``prefetch`` hints go to the cheapest backend only, and only if it
+    accepts them: any other backend is asked only after a miss, so a
+    page it loaded ahead would usually be wasted.
+    """
+
+    def __init__(self, backends):
+        self.backends = sorted(backends, key=lambda b: b.cost)
+        first = self.backends[0].fetcher_fn if self.backends else None
+        if hasattr(first, "prefetch"):
+            self.prefetch = first.prefetch
+
+    def __call__(self, handle, profile_url):
+        last = len(self.backends) - 1
+        for i, backend in enumerate(self.backends):
+            try:
+                result = backend.fetch(handle, profile_url)
+            except Exception:
+                if i == last:
+                    raise
+                continue
+            if result is not None:
+                return result
+        raise LookupError(f"No fetcher backend had @{handle}")
+
+    def describe(self):
+        return " -> ".join(b.name for b in self.backends)
+
+
+def rebase_url(url, base_url):
+    """Return *url* with its scheme and host swapped for *base_url*'s.
+
+    ``rebase_url("https://www.instagram.com/a/", "http://127.0.0.1:8765")``
+    is ``"http://127.0.0.1:8765/a/"``.
+    """
+    parts, base = urlsplit(url), urlsplit(base_url)
+    path = base.path.rstrip("/") + (parts.path or "/")
+    return urlunsplit((base.scheme, base.netloc, path, parts.query, parts.fragment))
+
+
+def with_base_url(fetcher_fn, base_url):
+    """Wrap *fetcher_fn* so every profile URL points at *base_url* instead."""
+    def fetcher(handle, profile_url):
+        return fetcher_fn(handle, rebase_url(profile_url, base_url))
+
+    if hasattr(fetcher_fn, "prefetch"):
+        fetcher.prefetch = lambda handle, profile_url: fetcher_fn.prefetch(
+            handle, rebase_url(profile_url, base_url))
+    return fetcher
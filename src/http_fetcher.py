@@ -0,0 +1,382 @@
+"""Plain-HTTP profile fetcher with pooled keep-alive connections.
+
+A public profile's counts, bio and flags are in the HTML Instagram serves
+before any JavaScript runs: in the embedded JSON for the username and in
+the ``og:description`` meta tag. ``HttpFetcher`` gets that HTML over a
+reused ``http.client`` connection, with a cookie jar carried across
+requests, and parses it with ``profile_parser.parse_profile_data``.
+
+It follows the ``fetcher_fn(handle, profile_url)`` contract. When
+Instagram answers with a login wall (a redirect to /accounts/login/ or a
+login-required page), it returns None, so a ``FallbackFetcher`` moves on
+to the browser backend for that profile.
+"""
+import gzip
+import http.client
+import http.cookiejar
+import json
+import re
+import threading
+import urllib.request
+import zlib
+from html import unescape
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit
+
+from src.profile_parser import detect_page_state, parse_profile_data
+
+DEFAULT_HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+                   "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"),
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+MAX_REDIRECTS = 3
+
+_OG_DESCRIPTION = re.compile(
+    r'<meta[^>]+property="og:description"[^>]+content="([^"]*)"', re.IGNORECASE)
+_OG_COUNTS = re.compile(
+    r"([\d,.]+[KMBkmb]?)\s+Followers,\s*([\d,.]+[KMBkmb]?)\s+Following,\s*"
+    r"([\d,.]+[KMBkmb]?)\s+Posts", re.IGNORECASE)
+_JSON_FIELDS = {
+    "follower_count": (r'"edge_followed_by":\{"count":(\d+)\}', r'"follower_count":(\d+)'),
+    "following_count": (r'"edge_follow":\{"count":(\d+)\}', r'"following_count":(\d+)'),
+    "post_count": (r'"edge_owner_to_timeline_media":\{"count":(\d+)', r'"media_count":(\d+)'),
+    "bio": (r'"biography":"((?:[^"\\]|\\.)*)"',),
+    "website": (r'"external_url":"((?:[^"\\]|\\.)*)"',),
+    "is_verified": (r'"is_verified":(true|false)',),
+    "is_private": (r'"is_private":(true|false)',),
+    "is_business": (r'"is_business_account":(true|false)',
+                    r'"is_professional_account":(true|false)'),
+}
+# Where each field lives in a decoded user object, in order of preference,
+# and the type its value must have.
+_USER_FIELDS = {
+    "follower_count": ((("edge_followed_by", "count"), ("follower_count",)), int),
+    "following_count": ((("edge_follow", "count"), ("following_count",)), int),
+    "post_count": ((("edge_owner_to_timeline_media", "count"), ("media_count",)), int),
+    "bio": ((("biography",),), str),
+    "website": ((("external_url",),), str),
+    "is_verified": ((("is_verified",),), bool),
+    "is_private": ((("is_private",),), bool),
+    "is_business": ((("is_business_account",), ("is_professional_account",)), bool),
+}
+_USER_KEYS = frozenset(path[0] for paths, _ in _USER_FIELDS.values() for path in paths)
+# String literals and braces: enough to find the object around an offset.
+_JSON_TOKEN = re.compile(r'"(?:[^"\\]|\\.)*"|[{}]')
+# How far past the "username" entry its object may extend, and how far
+# around it the textual fallback looks.
+_JSON_WINDOW = 20000
+
+
+class _TextExtractor(HTMLParser):
+    """Visible text of an HTML document, one line per block."""
+
+    _SKIP = {"script", "style", "noscript", "template"}
+    _BLOCK = {"p", "div", "br", "li", "h1", "h2", "h3", "header", "section", "span", "a"}
+
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self._SKIP:
+            self._skipping += 1
+        elif tag in self._BLOCK:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self._SKIP and self._skipping:
+            self._skipping -= 1
+
+    def handle_data(self, data):
+        if not self._skipping:
+            self.parts.append(data)
+
+
+def html_to_text(html):
+    """Return the visible text of *html* with blank lines collapsed."""
+    extractor = _TextExtractor()
+    extractor.feed(html)
+    lines = (line.strip() for line in "".join(extractor.parts).splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def _enclosing_object(text, at):
+    """Return ``(start, end)`` of the innermost JSON object around *at*.
+
+    *text* must begin outside any string literal; braces inside strings
+    are skipped. Returns None when *at* isn't inside a closed object.
+    """
+    opened = []
+    start = None
+    for token in _JSON_TOKEN.finditer(text):
+        if start is None and token.start() >= at:
+            if not opened:
+                return None
+            start = opened[-1]
+        char = token.group()
+        if char == "{":
+            opened.append(token.start())
+        elif char == "}" and opened:
+            if opened.pop() == start:
+                return start, token.end()
+    return None
+
+
+def _user_object_span(html, at):
+    """Return the absolute ``(start, end)`` of the object holding offset *at*."""
+    script = html.rfind("<script", 0, at)
+    begin = html.find(">", script) + 1 if script >= 0 else 0
+    span = _enclosing_object(html[begin:at + _JSON_WINDOW], at - begin)
+    return None if span is None else (begin + span[0], begin + span[1])
+
+
+def _user_object_fields(html, handle):
+    """Fields of *handle*'s own object in the page's embedded JSON.
+
+    Each ``"username":"<handle>"`` is resolved to the object that holds
+    it, so neighbouring users' fields are never read; when the handle
+    appears more than once, the object carrying the most profile fields
+    wins. Returns None when no such object decodes.
+    """
+    needle = f'"username":"{handle}"'
+    best, best_score = None, 0
+    at = html.find(needle)
+    while at >= 0:
+        span = _user_object_span(html, at)
+        if span is not None:
+            try:
+                user = json.loads(html[span[0]:span[1]])
+            except ValueError:
+                user = None
+            score = len(_USER_KEYS.intersection(user)) if isinstance(user, dict) else 0
+            if score > best_score:
+                best, best_score = user, score
+        at = html.find(needle, at + len(needle))
+    if best is None:
+        return None
+    fields = {}
+    for field, (paths, kind) in _USER_FIELDS.items():
+        for path in paths:
+            value = best
+            for key in path:
+                value = value.get(key) if isinstance(value, dict) else None
+            # bool is an int subclass; keep flags out of the counts.
+            if isinstance(value, kind) and (kind is bool or not isinstance(value, bool)):
+                fields[field] = value
+                break
+    return fields
+
+
+def _nearest_json_fields(html, handle):
+    """Fields matched textually around ``"username":"<handle>"``.
+
+    The fallback for JSON that doesn't decode: the search is limited to
+    the object holding the username where one is found, and each field
+    takes the match nearest the username rather than the first.
+    """
+    fields = {}
+    at = html.find(f'"username":"{handle}"')
+    if at < 0:
+        return fields
+    start, end = _user_object_span(html, at) or (max(0, at - _JSON_WINDOW), at + _JSON_WINDOW)
+    window = html[start:end]
+    for field, patterns in _JSON_FIELDS.items():
+        for pattern in patterns:
+            matches = list(re.finditer(pattern, window))
+            if not matches:
+                continue
+            value = min(matches, key=lambda m: abs(start + m.start() - at)).group(1)
+            if field.endswith("_count"):
+                fields[field] = int(value)
+            elif field.startswith("is_"):
+                fields[field] = value == "true"
+            else:
+                try:
+                    fields[field] = json.loads(f'"{value}"')
+                except ValueError:
+                    continue
+            break
+    return fields
+
+
+def extract_profile_payload(html, handle):
+    """Build a ``parse_profile_data`` payload from a profile page's HTML.
+
+    Fields come from *handle*'s object in the embedded JSON, counts
+    from ``og:description`` when the JSON lacks them. ``text`` is a
+    header-like summary of those fields when counts were found, the
+    page's visible text otherwise.
+    """
+    payload = _user_object_fields(html, handle)
+    if payload is None:
+        payload = _nearest_json_fields(html, handle)
+    og = _OG_DESCRIPTION.search(html)
+    if og:
+        counts = _OG_COUNTS.search(unescape(og.group(1)))
+        if counts:
+            payload.setdefault("follower_count", counts.group(1))
+            payload.setdefault("following_count", counts.group(2))
+            payload.setdefault("post_count", counts.group(3))
+    if "follower_count" in payload:
+        # The profile rendered; keep "text" to the header so chrome such as
+        # a "Log in to see photos" banner isn't read as a login wall.
+        lines = [handle]
+        for field, label in (("post_count", "posts"), ("follower_count", "followers"),
+                             ("following_count", "following")):
+            if field in payload:
+                lines.append(f"{payload[field]} {label}")
+        if payload.get("bio"):
+            lines.append(payload["bio"])
+        if payload.get("is_private"):
+            lines.append("This account is private")
+        payload["text"] = "\n".join(lines)
+    else:
+        payload["text"] = html_to_text(html)
+    return payload
+
+
+class _Response:
+    """What the cookie jar needs from a response: ``info()`` headers."""
+
+    def __init__(self, headers):
+        self._headers = headers
+
+    def info(self):
+        return self._headers
+
+
+class ConnectionPool:
+    """Keep-alive ``http.client`` connections, up to *max_per_host* idle each."""
+
+    def __init__(self, max_per_host=4, timeout=30):
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self._idle = {}
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    def get(self, scheme, netloc):
+        key = (scheme, netloc)
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop()
+            self.opened += 1
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return cls(netloc, timeout=self.timeout)
+
+    def put(self, scheme, netloc, conn):
+        with self._lock:
+            idle = self._idle.setdefault((scheme, netloc), [])
+            if len(idle) < self.max_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            conns = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+        for conn in conns:
+            conn.close()
+
+
+class HttpFetcher:
+    """``fetcher_fn`` doing one plain HTTP GET per profile.
+
+    Args:
+        cookie_jar: ``http.cookiejar.CookieJar`` shared across requests;
+            a fresh one by default (load a browser export into a
+            ``MozillaCookieJar`` to fetch as a logged-in session)
+        rate_limiter: object with ``acquire()`` called before each request
+        pool: ``ConnectionPool`` to reuse connections from
+        headers: request headers (default: a desktop browser's)
+    """
+
+    def __init__(self, cookie_jar=None, rate_limiter=None, pool=None, headers=None,
+                 timeout=30):
+        self.cookie_jar = cookie_jar if cookie_jar is not None else http.cookiejar.CookieJar()
+        self.rate_limiter = rate_limiter
+        self.pool = pool or ConnectionPool(timeout=timeout)
+        self.headers = dict(headers or DEFAULT_HEADERS)
+        self.login_walls = 0
+
+    def _request(self, url):
+        """GET *url* on a pooled connection. Returns (status, headers, body text)."""
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        request = urllib.request.Request(url, headers=self.headers)
+        self.cookie_jar.add_cookie_header(request)
+        headers = dict(request.header_items())
+
+        for attempt in range(2):
+            conn = self.pool.get(parts.scheme, parts.netloc)
+            try:
+                conn.request("GET", path, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+            except (http.client.RemoteDisconnected, ConnectionError,
+                    http.client.CannotSendRequest, http.client.BadStatusLine):
+                # Stale keep-alive connection; retry once on a fresh one.
+                conn.close()
+                if attempt:
+                    raise
+                continue
+            except Exception:
+                # A timeout or a half-read response leaves the connection
+                # in an unknown state; never hand it out again.
+                conn.close()
+                raise
+            if response.will_close:
+                conn.close()
+            else:
+                self.pool.put(parts.scheme, parts.netloc, conn)
+            break
+
+        self.cookie_jar.extract_cookies(_Response(response.msg), request)
+        encoding = (response.getheader("Content-Encoding") or "").lower()
+        if encoding == "gzip":
+            body = gzip.decompress(body)
+        elif encoding == "deflate":
+            body = zlib.decompress(body)
+        charset = response.msg.get_content_charset() or "utf-8"
+        return response.status, response.msg, body.decode(charset, errors="replace")
+
+    def __call__(self, handle, profile_url):
+        url = profile_url
+        for _ in range(MAX_REDIRECTS + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            status, headers, html = self._request(url)
+            if status in (301, 302, 303, 307, 308):
+                url = urljoin(url, headers.get("Location", ""))
+                if "/accounts/login" in url:
+                    self.login_walls += 1
+                    return None
+                continue
+            break
+        else:
+            raise RuntimeError(f"Too many redirects fetching @{handle}")
+
+        if status == 404:
+            return parse_profile_data({"text": "Sorry, this page isn't available."})
+        if status == 429:
+            return parse_profile_data({"text": "Please wait a few minutes before you try again."})
+        if status >= 400:
+            raise RuntimeError(f"HTTP {status} fetching @{handle}")
+
+        payload = extract_profile_payload(html, handle)
+        if detect_page_state(payload["text"]) == "login_required":
+            self.login_walls += 1
+            return None
+        return parse_profile_data(payload)
+
+    def close(self):
+        self.pool.close()
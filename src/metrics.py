@@ -0,0 +1,150 @@
+"""Per-stage timing for enrichment runs.
+
+``RunMetrics`` records how long each pipeline stage takes — claim, fetch
+(with "ready", the wait for a page to render), parse, location, classify,
+score, write — into fixed-bucket histograms.
+``summary()`` returns counts, totals and approximate percentiles per
+stage; with a ``path``, every observation is also appended to a
+JSON-lines file so slow runs can be inspected afterwards.
+"""
+import contextlib
+import json
+import threading
+import time
+
+STAGES = ("claim", "fetch", "ready", "parse", "location", "classify", "score", "write")
+
+# Upper bounds in seconds; observations above the last go to an overflow bucket.
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram of durations in seconds. Not thread-safe."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the *p*-th percentile (0-100).
+
+        Returns the observed max for the overflow bucket, None when empty.
+        """
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "total": round(self.total, 6),
+            "mean": round(self.total / self.count, 6) if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "buckets": {
+                (f"<={b}" if i < len(self.buckets) else f">{self.buckets[-1]}"): n
+                for i, (b, n) in enumerate(zip(self.buckets + (None,), self.counts))
+            },
+        }
+
+
+class RunMetrics:
+    """Thread-safe collection of per-stage histograms for one run.
+
+    Args:
+        path: optional JSON-lines file; each observation is one line and
+            ``close()`` appends a final summary line
+        buckets: histogram bucket bounds in seconds
+    """
+
+    def __init__(self, path=None, buckets=DEFAULT_BUCKETS, clock=time.perf_counter):
+        self.path = path
+        self.buckets = buckets
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._file = open(path, "a", encoding="utf-8") if path else None
+
+    def observe(self, stage, seconds, **fields):
+        """Record one *stage* duration; extra *fields* go to the metrics file."""
+        with self._lock:
+            hist = self._histograms.get(stage)
+            if hist is None:
+                hist = self._histograms[stage] = Histogram(self.buckets)
+            hist.observe(seconds)
+            if self._file is not None:
+                line = {"ts": time.time(), "stage": stage, "seconds": round(seconds, 6)}
+                line.update(fields)
+                self._file.write(json.dumps(line) + "\n")
+
+    @contextlib.contextmanager
+    def time(self, stage, **fields):
+        """Context manager timing its body as one *stage* observation."""
+        started = self._clock()
+        try:
+            yield
+        finally:
+            self.observe(stage, self._clock() - started, **fields)
+
+    def summary(self):
+        """Return {stage: histogram summary}, pipeline stages first."""
+        with self._lock:
+            names = [s for s in STAGES if s in self._histograms]
+            names += sorted(set(self._histograms) - set(STAGES))
+            return {name: self._histograms[name].summary() for name in names}
+
+    def close(self):
+        """Write the summary line and close the metrics file, if any."""
+        if self._file is not None:
+            with self._lock:
+                self._file.write(json.dumps({"ts": time.time(), "summary": {
+                    name: {k: v for k, v in h.summary().items() if k != "buckets"}
+                    for name, h in self._histograms.items()
+                }}) + "\n")
+                self._file.close()
+                self._file = None
+
+
+def timed(metrics, stage, **fields):
+    """``metrics.time(stage)`` or a no-op context when *metrics* is None."""
+    if metrics is None:
+        return contextlib.nullcontext()
+    return metrics.time(stage, **fields)
+
+
+def format_metrics_summary(summary):
+    """Render ``RunMetrics.summary()`` as aligned text lines (ms)."""
+    lines = [f"{'stage':<10}{'count':>7}{'total s':>10}{'mean ms':>10}{'p50 ms':>9}{'p95 ms':>9}"]
+    for name, s in summary.items():
+        def ms(v):
+            return f"{v * 1000:.1f}" if v is not None else "-"
+        lines.append(
+            f"{name:<10}{s['count']:>7}{s['total']:>10.2f}{ms(s['mean']):>10}"
+            f"{ms(s['p50']):>9}{ms(s['p95']):>9}"
+        )
+    return "\n".join(lines)
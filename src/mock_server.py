@@ -0,0 +1,231 @@
+"""Local HTTP server serving synthetic Instagram profile pages.
+
+Stands in for instagram.com so scripts/enrich.py, its browser and HTTP
+backends and the orchestrator can run end to end with no network
+(``enrich.py --base-url http://127.0.0.1:8765``). ``GET /<handle>/``
+returns a page shaped like the real one: the header text the browser
+reads, the ``og:description`` counts and embedded user JSON the HTTP
+backend reads.
+
+Profiles come from a fixture dict in tests/fixtures/mock_profiles.json
+format, or are generated by ``simulator.render_profile_page`` for any
+other handle. Latency and the outcome mix come from a
+``SyntheticFetcher``, so the same knobs as the offline simulator apply.
+Variants are served the way Instagram serves them:
+
+- not_found: 404 "Sorry, this page isn't available."
+- rate_limited: 429 "Please wait a few minutes..."
+- login_required: 302 to /accounts/login/, which shows the login wall
+- suspended: 200 with the suspension notice
+- private: 200 profile header with "This account is private"
+
+A fixture entry may pin its variant with ``"page_state": "<state>"``.
+"""
+import json
+import threading
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote
+
+from src.profile_parser import detect_page_state, parse_profile_page
+from src.simulator import SyntheticFetcher, _STATE_TEXT, _format_count
+
+LOGIN_PATH = "/accounts/login/"
+
+_STATUS = {"not_found": 404, "rate_limited": 429}
+
+
+def load_profiles(path):
+    """Load a {handle: profile fields} fixture file."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def profile_text(handle, profile):
+    """Return Instagram-like header text for a fixture *profile* dict."""
+    lines = [handle]
+    if profile.get("is_verified"):
+        lines.append("Verified badge")
+    lines += ["Follow", "Message"]
+    for field, label in (("post_count", "posts"), ("follower_count", "followers"),
+                         ("following_count", "following")):
+        if profile.get(field) is not None:
+            lines.append(f"{_format_count(profile[field])} {label}")
+    lines.append(handle.replace("_", " ").title())
+    if profile.get("bio"):
+        lines.append(profile["bio"])
+    if profile.get("website"):
+        lines.append(profile["website"].split("://", 1)[-1])
+    if profile.get("is_private"):
+        lines += ["This account is private", "Follow to see their photos and videos."]
+    return "\n".join(lines) + "\n"
+
+
+def _user_json(handle, fields):
+    user = {"username": handle,
+            "biography": fields.get("bio") or "",
+            "external_url": fields.get("website") or None,
+            "is_verified": bool(fields.get("is_verified")),
+            "is_private": bool(fields.get("is_private")),
+            "is_business_account": bool(fields.get("is_business"))}
+    for field, key in (("follower_count", "edge_followed_by"), ("following_count", "edge_follow"),
+                       ("post_count", "edge_owner_to_timeline_media")):
+        if fields.get(field) is not None:
+            user[key] = {"count": fields[field]}
+    # Compact separators: the fetchers match on '"key":value' with no spaces.
+    return json.dumps({"user": user}, separators=(",", ":"))
+
+
+def render_profile_html(handle, text, fields=None):
+    """Return a profile page for *handle* whose header reads *text*.
+
+    *fields* are the profile's structured values for the og:description
+    and embedded JSON; parsed from *text* when not given.
+    """
+    fields = fields or parse_profile_page(text)
+    head = [f"<title>@{escape(handle)}</title>"]
+    if fields.get("follower_count") is not None:
+        description = (f"{fields['follower_count']:,} Followers, "
+                       f"{fields.get('following_count') or 0:,} Following, "
+                       f"{fields.get('post_count') or 0:,} Posts - "
+                       f"See Instagram photos and videos from @{handle}")
+        head.append(f'<meta property="og:description" content="{escape(description)}">')
+    user_json = _user_json(handle, fields).replace("</", "<\\/")
+    head.append(f'<script type="application/json">{user_json}</script>')
+    header = "".join(f"<div>{escape(line)}</div>" for line in text.splitlines() if line)
+    return ("<!DOCTYPE html><html><head>" + "".join(head) + "</head><body><main>"
+            f"<header>{header}</header><div>Posts</div><div>Reels</div><div>Tagged</div>"
+            "</main></body></html>")
+
+
+def _message_html(text):
+    body = "".join(f"<div>{escape(line)}</div>" for line in text.splitlines() if line)
+    return f"<!DOCTYPE html><html><body><main>{body}</main></body></html>"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, html="", headers=None):
+        body = html.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        mock = self.server.mock
+        path = self.path.split("?", 1)[0]
+        if path == LOGIN_PATH:
+            self._send(200, _message_html(_STATE_TEXT["login_required"]))
+            return
+        handle = path.strip("/")
+        if not handle or "/" in handle:
+            self._send(404, _message_html(_STATE_TEXT["not_found"]))
+            return
+        mock._enter()
+        state = "error"
+        try:
+            state, status, html = mock.render(handle)
+        finally:
+            mock._leave(state)
+        if state == "login_required":
+            self._send(302, headers={"Location": f"{LOGIN_PATH}?next={quote(path)}"})
+        else:
+            self._send(status, html)
+
+
+class MockInstagramServer:
+    """Threaded local server for synthetic profile pages.
+
+    Args:
+        profiles: {handle: fields} fixtures; other handles are generated
+        fetcher: ``SyntheticFetcher`` drawing each request's latency and
+            outcome (default: no latency, 25% private, 3% not found)
+        host, port: where to listen; port 0 picks a free one
+
+    Use as a context manager, or ``start()``/``stop()`` for a background
+    thread; ``serve_forever()`` blocks the calling thread instead.
+    """
+
+    def __init__(self, profiles=None, fetcher=None, host="127.0.0.1", port=0):
+        self.profiles = dict(profiles or {})
+        self.fetcher = fetcher or SyntheticFetcher(time_scale=0)
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self._thread = None
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.outcomes = {}
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def render(self, handle):
+        """Return (page state, HTTP status, html) for one profile request.
+
+        Sleeps for the fetcher's drawn latency.
+        """
+        text = self.fetcher(handle, f"{self.base_url}/{handle}/")
+        state = detect_page_state(text)
+        profile = self.profiles.get(handle)
+        if profile is not None:
+            state = profile.get("page_state") or (
+                state if state not in ("normal", "private") else
+                "private" if profile.get("is_private") else "normal")
+            if state in ("normal", "private"):
+                return state, 200, render_profile_html(handle, profile_text(handle, profile),
+                                                       profile)
+        if state in _STATE_TEXT:
+            return state, _STATUS.get(state, 200), _message_html(_STATE_TEXT[state])
+        return state, 200, render_profile_html(handle, text)
+
+    def _enter(self):
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _leave(self, state):
+        with self._lock:
+            self.in_flight -= 1
+            self.outcomes[state] = self.outcomes.get(state, 0) + 1
+
+    def stats(self):
+        """Return {requests, peak_in_flight, outcomes} served so far."""
+        with self._lock:
+            return {"requests": self.requests, "peak_in_flight": self.peak_in_flight,
+                    "outcomes": dict(self.outcomes)}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever,
+                                        kwargs={"poll_interval": 0.05}, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def stop(self):
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
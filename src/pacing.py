@@ -0,0 +1,98 @@
+"""Adaptive request pacing (additive increase, multiplicative decrease).
+
+The pacer owns the fetch rate of a token bucket from ``src.rate_limiter``.
+Every fetched page reports its ``detect_page_state`` outcome and latency:
+
+- a served page nudges the rate up by a fixed step (additive increase);
+- a ``rate_limited`` page cuts the rate by a factor (multiplicative
+  decrease), so the first warning from Instagram slows us down sharply;
+- a served page slower than ``latency_target`` trims the rate slightly,
+  treating a sluggish site as an early congestion signal.
+
+This converges on the highest sustainable rate instead of alternating
+between full speed and long cooldown pauses.
+"""
+import threading
+
+# Outcomes that mean the site answered normally for pacing purposes.
+_SERVED_STATES = {"normal", "not_found", "suspended"}
+
+
+class AimdPacer:
+    """AIMD controller for a rate limiter's refill rate.
+
+    Args:
+        limiter: object with ``set_rate(rate)`` (e.g. a TokenBucket), or None
+        initial_rate: starting fetches per second
+        min_rate / max_rate: bounds for the rate
+        increase: fetches/sec added after each served page
+        decrease_factor: multiplier applied on ``rate_limited`` (0 < f < 1)
+        latency_target: seconds; slower served pages trim the rate
+        latency_factor: multiplier applied to the rate for slow pages
+    """
+
+    def __init__(self, limiter=None, initial_rate=0.25, min_rate=0.02,
+                 max_rate=1.0, increase=0.01, decrease_factor=0.5,
+                 latency_target=None, latency_factor=0.95):
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be between 0 and 1")
+        if not 0 < min_rate <= max_rate:
+            raise ValueError("require 0 < min_rate <= max_rate")
+        self.limiter = limiter
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_target = latency_target
+        self.latency_factor = latency_factor
+        self.rate = min(max(initial_rate, min_rate), max_rate)
+        self.last_action = "start"
+        self.backoffs = 0
+        self._lock = threading.Lock()
+        self._apply()
+
+    def _apply(self):
+        if self.limiter is not None:
+            self.limiter.set_rate(self.rate)
+
+    def record(self, page_state, latency=None):
+        """Adjust the rate from one fetch outcome. Returns the new rate."""
+        state = (page_state or "normal").lower()
+        with self._lock:
+            if state == "rate_limited":
+                self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                self.backoffs += 1
+                self.last_action = "backoff"
+            elif state in _SERVED_STATES:
+                if (self.latency_target is not None and latency is not None
+                        and latency > self.latency_target):
+                    self.rate = max(self.min_rate, self.rate * self.latency_factor)
+                    self.last_action = "slow"
+                else:
+                    self.rate = min(self.max_rate, self.rate + self.increase)
+                    self.last_action = "increase"
+            else:
+                # login_required and unknown states say nothing about load.
+                self.last_action = "hold"
+            self._apply()
+            return self.rate
+
+    def state(self):
+        """Return a JSON-serializable snapshot of the controller."""
+        return {
+            "rate": self.rate,
+            "backoffs": self.backoffs,
+            "last_action": self.last_action,
+        }
+
+    def restore(self, state):
+        """Resume from a snapshot produced by ``state()``."""
+        with self._lock:
+            self.rate = min(max(state.get("rate", self.rate), self.min_rate), self.max_rate)
+            self.backoffs = state.get("backoffs", 0)
+            self.last_action = "restored"
+            self._apply()
+
+    def describe(self):
+        """Short progress-line label, e.g. ``pace 0.27/s (increase)``."""
+        return f"pace {self.rate:.2f}/s ({self.last_action})"
@@ -0,0 +1,200 @@
+"""Compressed on-disk cache of raw profile page text.
+
+Every fetched page's innerText is stored zlib-compressed under its SHA-256
+digest (``objects/ab/abcdef….z``), so identical pages are kept once. A
+small SQLite index in the cache directory maps (handle, fetched_at) to
+digests. With the raw text kept, a parser fix can be applied by
+re-parsing cached pages (``src.pipeline.run_reparse``) instead of
+re-crawling.
+
+The cache is bounded by ``max_bytes`` of compressed data: once over, the
+oldest fetches are dropped and objects nothing references are deleted.
+"""
+import datetime
+import hashlib
+import os
+import sqlite3
+import zlib
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    handle      TEXT,
+    fetched_at  DATETIME,
+    digest      TEXT,
+    PRIMARY KEY (handle, fetched_at)
+);
+CREATE TABLE IF NOT EXISTS objects (
+    digest      TEXT PRIMARY KEY,
+    size        INTEGER
+);
+"""
+
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+class PageCache:
+    """Content-addressed, size-bounded cache of raw page text.
+
+    Args:
+        directory: cache root; created if missing
+        max_bytes: compressed bytes kept before the oldest fetches are evicted
+        level: zlib compression level
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES, level=6):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.level = level
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+        self.index_path = os.path.join(directory, "index.db")
+        conn = self._connect()
+        try:
+            conn.executescript(_SCHEMA)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _object_path(self, digest):
+        return os.path.join(self.directory, "objects", digest[:2], digest + ".z")
+
+    def put(self, handle, text, fetched_at=None):
+        """Store *text* as *handle*'s page fetched at *fetched_at* (default now).
+
+        Returns the content digest. Evicts old fetches when over max_bytes.
+        """
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        fetched_at = fetched_at or datetime.datetime.now().isoformat()
+        path = self._object_path(digest)
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("SELECT 1 FROM objects WHERE digest = ?",
+                            (digest,)).fetchone() is None:
+                blob = zlib.compress(data, self.level)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(blob)
+                os.replace(tmp, path)
+                conn.execute("INSERT INTO objects (digest, size) VALUES (?, ?)",
+                             (digest, len(blob)))
+            conn.execute(
+                "INSERT OR REPLACE INTO pages (handle, fetched_at, digest) VALUES (?, ?, ?)",
+                (handle, fetched_at, digest),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        self.evict()
+        return digest
+
+    def _read(self, digest):
+        try:
+            with open(self._object_path(digest), "rb") as f:
+                return zlib.decompress(f.read()).decode("utf-8")
+        except (OSError, zlib.error):
+            return None
+
+    def get(self, handle, max_age_seconds=None):
+        """Return (fetched_at, text) of *handle*'s latest cached page, or None.
+
+        With *max_age_seconds*, older pages count as missing.
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT fetched_at, digest FROM pages WHERE handle = ? "
+                "ORDER BY fetched_at DESC LIMIT 1",
+                (handle,),
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        if max_age_seconds is not None:
+            cutoff = datetime.datetime.now() - datetime.timedelta(seconds=max_age_seconds)
+            if row["fetched_at"] < cutoff.isoformat():
+                return None
+        text = self._read(row["digest"])
+        return None if text is None else (row["fetched_at"], text)
+
+    def latest(self, handles=None):
+        """Yield (handle, fetched_at, text) for each handle's newest page."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT handle, MAX(fetched_at) AS fetched_at, digest FROM pages "
+                "GROUP BY handle ORDER BY handle"
+            ).fetchall()
+        finally:
+            conn.close()
+        wanted = set(handles) if handles is not None else None
+        for row in rows:
+            if wanted is not None and row["handle"] not in wanted:
+                continue
+            text = self._read(row["digest"])
+            if text is not None:
+                yield row["handle"], row["fetched_at"], text
+
+    def fetcher(self, max_age_seconds=None):
+        """Return a ``fetcher_fn`` serving cached page text, None on a miss."""
+        def cached_fetcher(handle, profile_url):
+            hit = self.get(handle, max_age_seconds=max_age_seconds)
+            return None if hit is None else hit[1]
+        return cached_fetcher
+
+    def evict(self):
+        """Drop oldest fetches until under max_bytes. Returns bytes freed."""
+        conn = self._connect()
+        freed = 0
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+            if total <= self.max_bytes:
+                conn.rollback()
+                return 0
+            oldest = conn.execute(
+                "SELECT rowid, digest FROM pages ORDER BY fetched_at"
+            ).fetchall()
+            doomed = []
+            for row in oldest:
+                if total - freed <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM pages WHERE rowid = ?", (row["rowid"],))
+                still_used = conn.execute("SELECT 1 FROM pages WHERE digest = ? LIMIT 1",
+                                          (row["digest"],)).fetchone()
+                if still_used is None:
+                    size = conn.execute("SELECT size FROM objects WHERE digest = ?",
+                                        (row["digest"],)).fetchone()
+                    if size is not None:
+                        conn.execute("DELETE FROM objects WHERE digest = ?", (row["digest"],))
+                        freed += size[0]
+                        doomed.append(row["digest"])
+            conn.commit()
+        finally:
+            conn.close()
+        for digest in doomed:
+            try:
+                os.remove(self._object_path(digest))
+            except OSError:
+                pass
+        return freed
+
+    def stats(self):
+        """Return {pages, handles, objects, bytes}."""
+        conn = self._connect()
+        try:
+            pages, handles = conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT handle) FROM pages").fetchone()
+            objects, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM objects").fetchone()
+        finally:
+            conn.close()
+        return {"pages": pages, "handles": handles, "objects": objects, "bytes": size}
@@ -0,0 +1,142 @@
+"""Bounded pool of reusable pages (browser tabs, HTTP sessions, ...).
+
+``PagePool`` keeps up to ``size`` pages made by ``factory()``. Workers
+``checkout()`` a page, use it, and ``checkin()`` it. Pages are recycled
+one at a time: a page that fails its health check, was checked in as
+unhealthy, or has served ``max_uses`` fetches is disposed of and replaced
+on the next checkout, without touching the other pages or the underlying
+connection. Pages are created lazily, so a pool sized for four workers
+only opens as many as are used concurrently.
+
+The pool itself is thread-safe; whether a page may be used from another
+thread than the one that created it is up to the page type.
+"""
+import contextlib
+import threading
+import time
+
+
+class PagePool:
+    """Checkout/checkin pool of up to *size* pages.
+
+    Args:
+        factory: zero-argument callable returning a new page
+        size: maximum pages open at once
+        max_uses: recycle a page after this many checkouts; None never does
+        health_check: ``health_check(page)`` -> bool, run on checkout;
+            an unhealthy page is disposed of and replaced
+        dispose: ``dispose(page)`` closes a page; errors are ignored
+    """
+
+    def __init__(self, factory, size=1, max_uses=None, health_check=None,
+                 dispose=None):
+        if size < 1:
+            raise ValueError("size must be >= 1")
+        self.factory = factory
+        self.size = size
+        self.max_uses = max_uses
+        self.health_check = health_check
+        self.dispose = dispose
+        self._cond = threading.Condition()
+        self._idle = []          # pages ready for checkout
+        self._uses = {}          # id(page) -> checkouts served
+        self._open = 0           # pages created and not yet disposed
+        self.created = 0
+        self.recycled = 0
+        self.closed = False
+
+    def checkout(self, timeout=None):
+        """Return a healthy page, waiting up to *timeout* seconds for one.
+
+        Raises TimeoutError when none frees up in time.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                while not self._idle and self._open >= self.size:
+                    if self.closed:
+                        raise RuntimeError("PagePool is closed")
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"No page free within {timeout}s")
+                    self._cond.wait(remaining)
+                if self.closed:
+                    raise RuntimeError("PagePool is closed")
+                page = self._idle.pop() if self._idle else None
+                if page is None:
+                    self._open += 1
+            if page is None:
+                try:
+                    page = self.factory()
+                except Exception:
+                    with self._cond:
+                        self._open -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self.created += 1
+                    self._uses[id(page)] = 0
+            elif self.health_check is not None and not self._healthy(page):
+                self._discard(page)
+                continue
+            with self._cond:
+                self._uses[id(page)] += 1
+            return page
+
+    def checkin(self, page, healthy=True):
+        """Return *page* to the pool; unhealthy or worn-out pages are recycled."""
+        with self._cond:
+            worn = self.max_uses is not None and self._uses.get(id(page), 0) >= self.max_uses
+        if self.closed or not healthy or worn:
+            self._discard(page)
+            return
+        with self._cond:
+            self._idle.append(page)
+            self._cond.notify()
+
+    @contextlib.contextmanager
+    def page(self, timeout=None):
+        """Context manager around checkout/checkin.
+
+        An exception inside the block checks the page in as unhealthy.
+        """
+        page = self.checkout(timeout)
+        try:
+            yield page
+        except BaseException:
+            self.checkin(page, healthy=False)
+            raise
+        self.checkin(page)
+
+    def close(self):
+        """Dispose of idle pages; pages still checked out go on checkin."""
+        with self._cond:
+            self.closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for page in idle:
+            self._discard(page, count=False)
+
+    def stats(self):
+        with self._cond:
+            return {"size": self.size, "open": self._open, "idle": len(self._idle),
+                    "created": self.created, "recycled": self.recycled}
+
+    def _healthy(self, page):
+        try:
+            return bool(self.health_check(page))
+        except Exception:
+            return False
+
+    def _discard(self, page, count=True):
+        if self.dispose is not None:
+            try:
+                self.dispose(page)
+            except Exception:
+                pass
+        with self._cond:
+            self._uses.pop(id(page), None)
+            self._open -= 1
+            if count:
+                self.recycled += 1
+            self._cond.notify()
@@ -0,0 +1,123 @@
+"""Reference parser the precompiled profile_parser scanner must agree with.
+
+``legacy_parse_profile_page`` is the parser as it was before the
+precompiled scanner: one regex search per field over the whole text.
+Nothing in the enrichment path uses it: tests/unit/test_profile_parser.py
+checks the current parser against it, and scripts/bench_parser.py times
+both on ``synthetic_pages``.
+"""
+import random
+import re
+
+from src.profile_parser import PAGE_STATE_MARKERS, parse_count, parse_profile_page
+from src.simulator import render_profile_page
+
+# One page per non-normal state, worded as Instagram shows them.
+STATE_PAGES = [
+    "Sorry, this page isn't available.\nThe link you followed may be broken.",
+    "This account has been suspended for violating our terms.",
+    "Please wait a few minutes before you try again.",
+    "Log in to see photos and videos from friends.",
+]
+
+EDGE_CASES = [
+    "",
+    "someone\n1 post\n1 follower\n0 following\n",
+    "Get verified\n12 posts\n3,456 followers\n7 following\nCall us\n",
+    "12 posts. followers\n5 following\nEmail: a@b.co\n",
+    "brand\n2.5M followers 12 following 1,024 posts\nShop now at brand.shop/x\n",
+    "x\n10 posts\n20 followers\n30 following\nhttps://www.instagram.com/x/\n",
+    "PRIVATE ACCOUNT\nVERIFIED\n1K followers\n",
+    "contactverified\nbusinesshopping 9 followers\n",
+    "İstanbul\n5 posts\n10 followers\n3 following\nBuſineſs emaıl\n",
+    "K-9 ſhop now\n1 follower\n",
+]
+
+
+def legacy_detect_page_state(text):
+    """detect_page_state before the precompiled scanner (reference only)."""
+    if not text:
+        return "not_found"
+    lower = text.lower()
+    for state, markers in PAGE_STATE_MARKERS:
+        if all(marker in lower for marker in markers):
+            return state
+    return "normal"
+
+
+def legacy_parse_profile_page(text):
+    """parse_profile_page before the precompiled scanner (reference only)."""
+    page_state = legacy_detect_page_state(text)
+    result = {
+        "follower_count": None,
+        "following_count": None,
+        "post_count": None,
+        "bio": "",
+        "website": "",
+        "is_verified": False,
+        "is_private": False,
+        "is_business": False,
+        "page_state": page_state,
+    }
+
+    if page_state != "normal":
+        return result
+
+    match = re.search(r"([\d,.]+[KMBkmb]?)\s+posts?", text)
+    if match:
+        result["post_count"] = parse_count(match.group(1))
+    match = re.search(r"([\d,.]+[KMBkmb]?)\s+followers?", text)
+    if match:
+        result["follower_count"] = parse_count(match.group(1))
+    match = re.search(r"([\d,.]+[KMBkmb]?)\s+following", text)
+    if match:
+        result["following_count"] = parse_count(match.group(1))
+
+    result["is_verified"] = bool(
+        re.search(r"verified badge|verified", text, re.IGNORECASE)
+        and "get verified" not in text.lower()
+    )
+    result["is_private"] = bool(
+        re.search(r"this account is private|private account", text, re.IGNORECASE)
+    )
+    result["is_business"] = bool(
+        re.search(
+            r"contact|email|call|directions|category:|"
+            r"business|shopping|shop now|view shop",
+            text, re.IGNORECASE,
+        )
+    )
+
+    url_match = re.search(
+        r"(https?://[^\s<>\"']+|[\w.-]+\.(?:com|org|net|io|co|shop|store|biz|me|ee|us|info|xyz|gg|link)[/\w.-]*)",
+        text,
+    )
+    if url_match:
+        website = url_match.group(1)
+        if "instagram.com" not in website:
+            result["website"] = website
+
+    bio_match = re.search(
+        r"following\s*\n(.*?)(?:\n.*?posts?\s|$)", text, re.DOTALL | re.IGNORECASE
+    )
+    if bio_match:
+        bio = bio_match.group(1).strip()
+        bio = re.sub(r"Followed by .*", "", bio).strip()
+        if bio and len(bio) < 500:
+            result["bio"] = bio
+
+    return result
+
+
+def synthetic_pages(count, seed=None):
+    """Return *count* simulator profile pages plus state and edge-case pages."""
+    rng = random.Random(seed)
+    pages = [render_profile_page(rng, f"user_{i}", private=rng.random() < 0.25)
+             for i in range(count)]
+    return pages + STATE_PAGES + EDGE_CASES
+
+
+def check_equivalent(pages):
+    """Return the pages where the two parsers disagree."""
+    return [page for page in pages
+            if parse_profile_page(page) != legacy_parse_profile_page(page)]
@@ -1,7 +1,10 @@
-"""Pipeline runners for Phase 1 (CSV import) and Phase 2 (enrichment)."""
+"""Pipeline runners for Phase 1 (CSV import), Phase 2 (enrichment) and re-parsing."""
+import collections
+
 from src.csv_parser import parse_followers
-from src.database import init_db, insert_followers
-from src.batch_orchestrator import run_all
+from src.database import get_all_followers, init_db, insert_followers, update_followers
+from src.batch_orchestrator import build_update, run_all
+from src.profile_parser import parse_profile_pages
 
 
 def run_phase1(csv_path, db_path):
@@ -15,12 +18,13 @@ def run_phase1(csv_path, db_path):
     return {"inserted": count}
 
 
-def run_phase2(db_path, fetcher_fn):
+def run_phase2(db_path, fetcher_fn, metrics=None):
     """Run enrichment on all pending followers.
 
     Returns {batches_run, total_completed, total_errors, stopped, reason}.
+    Pass a ``src.metrics.RunMetrics`` as *metrics* to collect stage timings.
     """
-    result = run_all(db_path, fetcher_fn)
+    result = run_all(db_path, fetcher_fn, metrics=metrics)
     return {
         "batches_run": result["batches_run"],
         "total_completed": result["total_completed"],
@@ -28,3 +32,59 @@ def run_phase2(db_path, fetcher_fn):
         "stopped": result["stopped"],
         "reason": result["reason"],
     }
+
+
+def run_reparse(db_path, cache, handles=None, workers=1):
+    """Re-run the current parser over cached pages and update the DB in bulk.
+
+    *cache* is a ``src.page_cache.PageCache``; see ``reparse_pages``.
+    """
+    return reparse_pages(db_path, cache.latest(handles), workers=workers)
+
+
+def reparse_pages(db_path, pages, workers=1):
+    """Parse stored pages and write the results to the DB in bulk.
+
+    *pages* yields (handle, fetched_at, raw) with raw text or a JSON
+    extraction payload (see ``parse_page``), e.g. ``PageCache.latest()``
+    or ``fetch_archive.latest_pages()``. Parsing runs on *workers*
+    processes (``parse_profile_pages``); enrichment and the single write
+    transaction happen here. Pages that show a rate-limit or login wall,
+    or fail to parse, are skipped, as are handles no longer in the
+    database.
+
+    Returns {reparsed: int, skipped: int, missing: int}.
+    """
+    followers = {row["handle"]: row for row in get_all_followers(db_path)}
+
+    known = collections.deque()
+    missing = 0
+
+    def raw_pages():
+        nonlocal missing
+        for handle, fetched_at, raw in pages:
+            if handle not in followers:
+                missing += 1
+                continue
+            known.append((handle, fetched_at))
+            yield raw
+
+    updates = []
+    skipped = 0
+    for parsed, error in parse_profile_pages(raw_pages(), workers=workers):
+        handle, fetched_at = known.popleft()
+        if error is not None:
+            skipped += 1
+            continue
+        try:
+            update = build_update(followers[handle], parsed)
+        except RuntimeError:
+            skipped += 1
+            continue
+        update["processed_at"] = fetched_at
+        update.setdefault("error_message", None)
+        updates.append((handle, update))
+
+    if updates:
+        update_followers(db_path, updates)
+    return {"reparsed": len(updates), "skipped": skipped, "missing": missing}
@@ -6,7 +6,16 @@ reason about parsing. Saves ~500-1000 tokens per profile in LLM context.
 """
 from __future__ import annotations
 
+import collections
+import json
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+
+
+_MULTIPLIERS = {"K": 1_000, "M": 1_000_000, "B": 1_000_000_000}
+_SUFFIXED_COUNT = re.compile(r"^([\d.]+)\s*([KMBkmb])$")
+_PLAIN_COUNT = re.compile(r"^(\d+)$")
 
 
 def parse_count(text: str) -> int | None:
@@ -34,20 +43,45 @@ def parse_count(text: str) -> int | None:
 
     text = text.strip().replace(",", "")
 
-    multipliers = {"K": 1_000, "M": 1_000_000, "B": 1_000_000_000}
-    match = re.match(r"^([\d.]+)\s*([KMBkmb])$", text)
+    match = _SUFFIXED_COUNT.match(text)
     if match:
-        number = float(match.group(1))
+        try:
+            number = float(match.group(1))
+        except ValueError:  # stray dots, e.g. "1.2.5K"
+            return None
         suffix = match.group(2).upper()
-        return round(number * multipliers[suffix])
+        return round(number * _MULTIPLIERS[suffix])
 
-    match = re.match(r"^(\d+)$", text)
+    match = _PLAIN_COUNT.match(text)
     if match:
         return int(match.group(1))
 
     return None
 
 
+# (page_state, substrings that must all appear), checked in order.
+PAGE_STATE_MARKERS = (
+    ("not_found", ("sorry, this page isn't available",)),
+    ("not_found", ("user not found",)),
+    ("suspended", ("account has been suspended",)),
+    ("suspended", ("suspended", "violat")),
+    ("rate_limited", ("try again later",)),
+    ("rate_limited", ("rate limit",)),
+    ("rate_limited", ("wait a few minutes",)),
+    ("login_required", ("log in", "to see")),
+)
+
+# Profile header follower count, e.g. "1.2K followers".
+HEADER_COUNT_PATTERN = r"[\d,.]+[KMBkmb]?\s+followers?"
+# Number-run patterns only start where a run of number characters does.
+# A match starting inside a run needs the same characters after it as
+# one starting at the run's beginning, so the leftmost match is
+# unchanged; without the lookbehind every position of a long digit run
+# rescans the rest of it.
+_NUMBER_START = r"(?<![\d,.])"
+_HEADER_COUNT = re.compile(_NUMBER_START + HEADER_COUNT_PATTERN)
+
+
 def detect_page_state(text: str) -> str:
     """Detect Instagram page state from raw page text.
 
@@ -55,23 +89,97 @@ def detect_page_state(text: str) -> str:
     """
     if not text:
         return "not_found"
+    return _page_state(text.lower())
 
-    lower = text.lower()
-
-    if "sorry, this page isn't available" in lower:
-        return "not_found"
-    if "user not found" in lower:
-        return "not_found"
-    if ("account has been suspended" in lower) or ("suspended" in lower and "violat" in lower):
-        return "suspended"
-    if "try again later" in lower or "rate limit" in lower or "wait a few minutes" in lower:
-        return "rate_limited"
-    if "log in" in lower and "to see" in lower:
-        return "login_required"
 
+def _page_state(lower: str) -> str:
+    for state, markers in PAGE_STATE_MARKERS:
+        for marker in markers:
+            if marker not in lower:
+                break
+        else:
+            return state
     return "normal"
 
 
+def is_page_ready(text: str) -> bool:
+    """True once *text* holds enough to parse: header counts or a page-state marker.
+
+    Used to stop waiting for a profile page as soon as it has rendered.
+    """
+    if not text:
+        return False
+    return detect_page_state(text) != "normal" or bool(_HEADER_COUNT.search(text))
+
+
+# One pass over the text for all three header counts: "123 posts",
+# "1.2K followers", "456 following". Each kind's first match is the same
+# one a separate search for it would find: two matches can only overlap
+# if they end in the same word.
+_COUNT_SCANNER = re.compile(
+    _NUMBER_START + r"([\d,.]+[KMBkmb]?)\s+(?:(?P<post_count>posts?)|(?P<follower_count>followers?)"
+    r"|(?P<following_count>following))"
+)
+_COUNT_FIELDS = ("post_count", "follower_count", "following_count")
+
+# Keyword flags are substring tests on the lowercased text, which match
+# exactly what a case-insensitive regex would unless the text has one of
+# the few characters that regex case folding maps onto ASCII letters
+# ("ı", "İ", "ſ", Kelvin "K"); such texts use the regexes.
+_FLAG_KEYWORDS = (
+    ("is_verified", ("verified",)),
+    ("is_private", ("this account is private", "private account")),
+    ("is_business", ("contact", "email", "call", "directions", "category:",
+                     "business", "shopping", "shop now", "view shop")),
+)
+_FLAG_PATTERNS = tuple(
+    (field, re.compile("|".join(map(re.escape, keywords)), re.IGNORECASE))
+    for field, keywords in _FLAG_KEYWORDS
+)
+_CASE_FOLD_TRAPS = ("\u0130", "\u0131", "\u017f", "\u212a")
+
+# The bare-domain branch starts only at the beginning of a [\w.-] run,
+# for the same reason as _NUMBER_START.
+_WEBSITE = re.compile(
+    r"(https?://[^\s<>\"']+|(?<![\w.-])[\w.-]+\.(?:com|org|net|io|co|shop|store|biz|me|ee|us|info|xyz|gg|link)[/\w.-]*)"
+)
+# Bio: text between the counts line and the posts grid. Only the first
+# _BIO_SCAN_CHARS of a page are searched, and a candidate longer than
+# _BIO_WINDOW is not a bio (the limit for one is 500 characters).
+_BIO_HEADER = re.compile(r"following\s*\n", re.IGNORECASE)
+_POSTS_WORD = re.compile(r"posts?\s", re.IGNORECASE)
+_FOLLOWED_BY = re.compile(r"Followed by .*")
+_BIO_SCAN_CHARS = 50_000
+_BIO_WINDOW = 2_000
+
+
+def _extract_bio(text: str) -> str:
+    """Return the bio from page *text*, or "" if there is none.
+
+    The bio starts on the line after the "following" count. It is that
+    one line when a "posts" word follows it anywhere later in the text
+    (the grid), otherwise everything to the end of the text. This is
+    what the regex ``following\\s*\\n(.*?)(?:\\n.*?posts?\\s|$)`` matched,
+    found with one forward search for each part instead of a rescan of
+    the rest of the text at every line break, so the cost is linear in
+    the (capped) text length.
+    """
+    text = text[:_BIO_SCAN_CHARS]
+    header = _BIO_HEADER.search(text)
+    if header is None:
+        return ""
+    start = header.end()
+    newline = text.find("\n", start)
+    if newline != -1 and _POSTS_WORD.search(text, newline + 1):
+        end = newline
+    else:
+        end = len(text) - 1 if text.endswith("\n") else len(text)
+    if end - start > _BIO_WINDOW:
+        return ""
+    bio = _FOLLOWED_BY.sub("", text[start:end].strip()).strip()
+    return bio if len(bio) < 500 else ""
+
+
 def parse_profile_page(text: str) -> dict:
     """Extract structured profile data from raw Instagram page text.
 
@@ -81,8 +189,14 @@ def parse_profile_page(text: str) -> dict:
     The subagent should call this instead of doing its own parsing.
     Missing fields are returned as None (counts) or empty string (text)
     or False (booleans).
+
+    The text is lowercased once; the three counts come from a single
+    precompiled scan that stops once all are found, and the keyword
+    flags from substring tests. Every step is linear in the text
+    length, so a huge or adversarial page cannot stall the caller.
     """
-    page_state = detect_page_state(text)
+    lower = text.lower() if text else ""
+    page_state = _page_state(lower) if text else "not_found"
     result = {
         "follower_count": None,
         "following_count": None,
@@ -98,63 +212,154 @@ def parse_profile_page(text: str) -> dict:
     if page_state != "normal":
         return result
 
-    # Posts / Followers / Following pattern: "123 posts 1.2K followers 456 following"
-    count_pattern = r"([\d,.]+[KMBkmb]?)\s+posts?"
-    match = re.search(count_pattern, text)
-    if match:
-        result["post_count"] = parse_count(match.group(1))
-
-    count_pattern = r"([\d,.]+[KMBkmb]?)\s+followers?"
-    match = re.search(count_pattern, text)
-    if match:
-        result["follower_count"] = parse_count(match.group(1))
-
-    count_pattern = r"([\d,.]+[KMBkmb]?)\s+following"
-    match = re.search(count_pattern, text)
-    if match:
-        result["following_count"] = parse_count(match.group(1))
-
-    # Verified badge
-    result["is_verified"] = bool(
-        re.search(r"verified badge|verified", text, re.IGNORECASE)
-        and "get verified" not in text.lower()
-    )
-
-    # Private account
-    result["is_private"] = bool(
-        re.search(r"this account is private|private account", text, re.IGNORECASE)
-    )
-
-    # Business/creator indicators
-    result["is_business"] = bool(
-        re.search(
-            r"contact|email|call|directions|category:|"
-            r"business|shopping|shop now|view shop",
-            text, re.IGNORECASE,
-        )
-    )
-
-    # Website: look for URLs in profile area
-    url_match = re.search(
-        r"(https?://[^\s<>\"']+|[\w.-]+\.(?:com|org|net|io|co|shop|store|biz|me|ee|us|info|xyz|gg|link)[/\w.-]*)",
-        text,
-    )
+    found = set()
+    for match in _COUNT_SCANNER.finditer(text):
+        field = match.lastgroup
+        if field not in found:
+            found.add(field)
+            result[field] = parse_count(match.group(1))
+            if len(found) == len(_COUNT_FIELDS):
+                break
+
+    if any(trap in text for trap in _CASE_FOLD_TRAPS):
+        for field, pattern in _FLAG_PATTERNS:
+            result[field] = pattern.search(text) is not None
+    else:
+        for field, keywords in _FLAG_KEYWORDS:
+            for keyword in keywords:
+                if keyword in lower:
+                    result[field] = True
+                    break
+    if "get verified" in lower:
+        result["is_verified"] = False
+
+    url_match = _WEBSITE.search(text)
     if url_match:
         website = url_match.group(1)
         # Filter out instagram.com links
         if "instagram.com" not in website:
             result["website"] = website
 
-    # Bio: text between the counts line and the posts grid is typically the bio.
-    # This is a best-effort extraction — the subagent can override if needed.
-    bio_match = re.search(
-        r"following\s*\n(.*?)(?:\n.*?posts?\s|$)", text, re.DOTALL | re.IGNORECASE
-    )
-    if bio_match:
-        bio = bio_match.group(1).strip()
-        # Clean up: remove "Followed by..." lines
-        bio = re.sub(r"Followed by .*", "", bio).strip()
-        if bio and len(bio) < 500:
-            result["bio"] = bio
+    # Best-effort: the subagent can override if needed.
+    result["bio"] = _extract_bio(text)
 
     return result
+
+
+# Structured fields parse_profile_data takes from an extraction payload;
+# any that are missing (None) are recovered from the payload's text.
+_STRUCTURED_FIELDS = ("follower_count", "following_count", "post_count", "bio",
+                      "website", "is_verified", "is_private", "is_business")
+
+
+def parse_profile_data(data: dict) -> dict:
+    """Build a profile dict from an in-page extraction payload.
+
+    *data* holds whichever structured fields the browser could read from
+    embedded page JSON or the DOM (keys as in ``parse_profile_page``;
+    counts may be ints or display strings like "1.2K") plus ``text``, a
+    short excerpt of the header or page text. The page state always
+    comes from ``text``; fields the payload lacks are filled in by
+    running ``parse_profile_page`` over it, so regexes only run when the
+    structured extraction came up short.
+    """
+    text = data.get("text") or ""
+    page_state = detect_page_state(text)
+    result = {
+        "follower_count": None,
+        "following_count": None,
+        "post_count": None,
+        "bio": "",
+        "website": "",
+        "is_verified": False,
+        "is_private": False,
+        "is_business": False,
+        "page_state": page_state,
+    }
+    if page_state != "normal":
+        return result
+
+    missing = False
+    for field in _STRUCTURED_FIELDS:
+        value = data.get(field)
+        if value is None:
+            missing = True
+            continue
+        if field.endswith("_count"):
+            value = value if isinstance(value, int) else parse_count(str(value))
+            if value is None:
+                missing = True
+                continue
+        elif field.startswith("is_"):
+            value = bool(value)
+        elif field == "website" and "instagram.com" in value:
+            value = ""
+        result[field] = value
+
+    if missing:
+        fallback = parse_profile_page(text)
+        for field in _STRUCTURED_FIELDS:
+            if data.get(field) is None or (field.endswith("_count") and result[field] is None):
+                result[field] = fallback[field]
+    return result
+
+
+def parse_page(raw: str) -> dict:
+    """Parse stored page content: raw innerText or a JSON extraction payload."""
+    if raw and raw.lstrip().startswith("{"):
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            data = None
+        if isinstance(data, dict):
+            return parse_profile_data(data)
+    return parse_profile_page(raw)
+
+
+def _parse_chunk(pages: list) -> list:
+    """Parse a chunk of pages; each item is (result, None) or (None, error)."""
+    out = []
+    for raw in pages:
+        try:
+            out.append((parse_page(raw), None))
+        except Exception as e:
+            out.append((None, f"{type(e).__name__}: {e}"))
+    return out
+
+
+def _chunks(pages, size):
+    chunk = []
+    for raw in pages:
+        chunk.append(raw)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def parse_profile_pages(pages, workers: int | None = None, chunk_size: int = 200):
+    """Parse many stored pages (see ``parse_page``) across processes.
+
+    Yields ``(result, error)`` per page in input order: the parsed dict
+    and None, or None and an "ExceptionType: message" string when that
+    page failed to parse. *pages* is consumed lazily, *chunk_size* pages
+    per task with at most two tasks per worker in flight, so memory
+    stays bounded however long the input is. *workers* defaults to the
+    CPU count; 1 parses in this process.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(pages, chunk_size)
+    if workers <= 1:
+        for chunk in chunks:
+            yield from _parse_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = collections.deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_parse_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
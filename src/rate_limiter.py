@@ -0,0 +1,187 @@
+"""Token-bucket rate limiting for profile fetches.
+
+A bucket holds up to ``burst`` tokens and refills at ``rate`` tokens per
+second. Each fetch takes one token; when the bucket is empty the caller
+sleeps only as long as it takes for the next token to arrive, so idle
+capacity is spent instead of wasted on fixed delays.
+
+Two implementations share the same interface:
+
+- ``TokenBucket`` — in-process, shared by threads of one process.
+- ``SqliteTokenBucket`` — state lives in a ``rate_limits`` table of the
+  followers database, so every process pointed at the same DB draws
+  from one request budget.
+"""
+import abc
+import sqlite3
+import threading
+import time
+
+
+class _BaseBucket(abc.ABC):
+    """Shared acquire loop; subclasses implement ``_take``."""
+
+    def __init__(self, rate, burst, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be >= 1")
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._sleep = sleep
+
+    @abc.abstractmethod
+    def _take(self, tokens):
+        """Try to take *tokens*. Return 0.0 on success, else seconds to wait."""
+
+    def try_acquire(self, tokens=1):
+        """Take *tokens* without blocking. Returns True if they were taken."""
+        return self._take(tokens) == 0.0
+
+    def take(self, tokens=1):
+        """Take *tokens* if available without blocking.
+
+        Returns 0.0 when they were taken, else the seconds until they
+        would be (nothing is taken then).
+        """
+        return self._take(tokens)
+
+    def acquire(self, tokens=1, timeout=None):
+        """Block until *tokens* are available, then take them.
+
+        Returns the number of seconds spent waiting. Raises TimeoutError
+        if *timeout* seconds pass without enough tokens, and ValueError
+        if *tokens* exceeds the burst, which the bucket can never hold.
+        """
+        if tokens > self.burst:
+            raise ValueError(f"cannot acquire {tokens} tokens from a bucket of burst {self.burst:g}")
+        waited = 0.0
+        while True:
+            wait = self._take(tokens)
+            if wait == 0.0:
+                return waited
+            if timeout is not None and waited + wait > timeout:
+                raise TimeoutError(f"rate limiter: no token within {timeout}s")
+            self._sleep(wait)
+            waited += wait
+
+    def _refill(self, tokens, updated_at, now):
+        """Return the token count after refilling from *updated_at* to *now*."""
+        elapsed = max(0.0, now - updated_at)
+        return min(self.burst, tokens + elapsed * self.rate)
+
+    def _wait_for(self, available, tokens):
+        """Seconds until *tokens* are available given *available* now."""
+        return (tokens - available) / self.rate
+
+
+class TokenBucket(_BaseBucket):
+    """Thread-safe in-process token bucket. Starts full."""
+
+    def __init__(self, rate, burst, clock=time.monotonic, sleep=time.sleep):
+        super().__init__(rate, burst, sleep=sleep)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated_at = clock()
+
+    def _take(self, tokens):
+        with self._lock:
+            now = self._clock()
+            self._tokens = self._refill(self._tokens, self._updated_at, now)
+            self._updated_at = now
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return self._wait_for(self._tokens, tokens)
+
+    def set_rate(self, rate):
+        """Change the refill rate, keeping tokens accrued so far."""
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        with self._lock:
+            now = self._clock()
+            self._tokens = self._refill(self._tokens, self._updated_at, now)
+            self._updated_at = now
+            self.rate = float(rate)
+
+
+_RATE_LIMITS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_limits (
+    name        TEXT PRIMARY KEY,
+    tokens      REAL NOT NULL,
+    updated_at  REAL NOT NULL,
+    rate        REAL NOT NULL,
+    burst       REAL NOT NULL
+)
+"""
+
+
+class SqliteTokenBucket(_BaseBucket):
+    """Token bucket persisted in SQLite, shared by every process using *db_path*.
+
+    Each take runs in a ``BEGIN IMMEDIATE`` transaction so concurrent
+    processes serialize on the bucket row. The clock must be wall time
+    (comparable across processes), hence ``time.time`` by default.
+
+    The stored rate and burst are overwritten by each process on every
+    take, so the most recently started process's settings win.
+    """
+
+    def __init__(self, db_path, name="instagram", rate=0.25, burst=3,
+                 clock=time.time, sleep=time.sleep):
+        super().__init__(rate, burst, sleep=sleep)
+        self.db_path = db_path
+        self.name = name
+        self._clock = clock
+        conn = self._connect()
+        try:
+            conn.execute(_RATE_LIMITS_SCHEMA)
+            conn.execute(
+                "INSERT OR IGNORE INTO rate_limits (name, tokens, updated_at, rate, burst) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (name, self.burst, clock(), self.rate, self.burst),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _take(self, tokens):
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM rate_limits WHERE name = ?",
+                (self.name,),
+            ).fetchone()
+            now = self._clock()
+            available = self._refill(row[0], row[1], now) if row else self.burst
+            if available >= tokens:
+                available -= tokens
+                wait = 0.0
+            else:
+                wait = self._wait_for(available, tokens)
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limits (name, tokens, updated_at, rate, burst) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self.name, available, now, self.rate, self.burst),
+            )
+            conn.commit()
+            return wait
+        finally:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            conn.close()
+
+    def set_rate(self, rate):
+        """Change the refill rate used by this process from now on."""
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
@@ -0,0 +1,93 @@
+"""TTL-based re-enrichment of completed profiles.
+
+A profile's data goes stale once ``processed_at`` is older than the TTL
+for its tier (``scorer.get_tier``); high-priority tiers expire sooner so
+their scores stay current. ``enqueue_stale`` puts the most overdue stale
+rows back to 'pending', where the normal claim path picks them up,
+spending at most a daily budget of fetches over any rolling 24 hours.
+"""
+import datetime
+
+from src import config
+from src.database import count_refreshes_since, enqueue_refreshes, get_enriched_followers
+from src.scorer import get_tier
+
+PRIVATE_TIER = "Private"
+
+# Days before a profile in each tier is re-enriched.
+DEFAULT_TTL_DAYS = {
+    "Tier 1 - High Priority": 7,
+    "Tier 2 - Medium Priority": 14,
+    "Tier 3 - Low Priority": 30,
+    "Tier 4 - Skip": 90,
+    PRIVATE_TIER: 60,
+}
+
+# Refresh order when more rows are stale than the budget allows.
+_TIER_RANK = {tier: i for i, tier in enumerate(DEFAULT_TTL_DAYS)}
+
+
+def _tier(row):
+    if row["status"] == "private":
+        return PRIVATE_TIER
+    return get_tier(row["priority_score"] or 0)
+
+
+def find_stale(db_path, now=None, ttl_days=None):
+    """Return completed/private rows past their tier's TTL, most urgent first.
+
+    Each item is {handle, tier, processed_at, overdue_days}; ordering is
+    by tier (Tier 1 first), then oldest processed_at.
+    """
+    now = now or datetime.datetime.now()
+    ttl_days = {**DEFAULT_TTL_DAYS, **(ttl_days or {})}
+    stale = []
+    for row in get_enriched_followers(db_path):
+        tier = _tier(row)
+        expires = (datetime.datetime.fromisoformat(row["processed_at"])
+                   + datetime.timedelta(days=ttl_days[tier]))
+        if expires <= now:
+            stale.append({
+                "handle": row["handle"],
+                "tier": tier,
+                "processed_at": row["processed_at"],
+                "overdue_days": round((now - expires).total_seconds() / 86400, 1),
+            })
+    stale.sort(key=lambda r: (_TIER_RANK.get(r["tier"], len(_TIER_RANK)), r["processed_at"]))
+    return stale
+
+
+def refreshes_used(db_path, now=None):
+    """Return how many rows were enqueued for refresh in the last 24 hours."""
+    now = now or datetime.datetime.now()
+    return count_refreshes_since(db_path, (now - datetime.timedelta(days=1)).isoformat())
+
+
+def enqueue_stale(db_path, daily_budget=None, now=None, ttl_days=None, dry_run=False):
+    """Reset the most urgent stale rows to 'pending' within the daily budget.
+
+    Returns {stale, enqueued, budget_left, by_tier: {tier: enqueued}}.
+    With *dry_run*, nothing is written.
+    """
+    now = now or datetime.datetime.now()
+    if daily_budget is None:
+        daily_budget = config.REFRESH_DAILY_BUDGET
+    stale = find_stale(db_path, now=now, ttl_days=ttl_days)
+    remaining = max(0, daily_budget - refreshes_used(db_path, now=now))
+    chosen = stale[:remaining]
+
+    if chosen and not dry_run:
+        # A row claimed or changed since find_stale is skipped, unlogged.
+        enqueued = set(enqueue_refreshes(db_path, [r["handle"] for r in chosen],
+                                         now.isoformat()))
+        chosen = [r for r in chosen if r["handle"] in enqueued]
+
+    by_tier = {}
+    for r in chosen:
+        by_tier[r["tier"]] = by_tier.get(r["tier"], 0) + 1
+    return {
+        "stale": len(stale),
+        "enqueued": len(chosen),
+        "budget_left": remaining - len(chosen),
+        "by_tier": by_tier,
+    }
@@ -1,6 +1,9 @@
 """Priority scoring algorithm for Instagram follower profiles."""
 import re
 
+from src.classifier import classify
+from src.location_detector import is_hawaii
+
 
 def score(profile):
     """Score a profile and return {priority_score, priority_reason}.
@@ -157,3 +160,21 @@ def get_tier(priority_score):
         return "Tier 3 - Low Priority"
     else:
         return "Tier 4 - Skip"
+
+
+def estimate_priority(handle, display_name):
+    """Estimate a follower's priority score before enrichment.
+
+    Runs the location detector, classifier and scorer over the only
+    fields known at import time (handle and display_name), so likely
+    Hawaii businesses and organizations can be enriched first.
+    Returns an int 0-100.
+    """
+    # Split handle separators so keywords like "vet clinic" match "maui_vet_clinic".
+    profile = {"handle": re.sub(r"[_.]+", " ", handle or ""),
+               "display_name": display_name or ""}
+    profile["is_hawaii"] = is_hawaii(f"{profile['handle']} {profile['display_name']}")
+    classification = classify(profile)
+    profile["category"] = classification["category"]
+    profile["subcategory"] = classification["subcategory"]
+    return score(profile)["priority_score"]
@@ -0,0 +1,165 @@
+"""Route fetches across several logged-in sessions, each with its own budget.
+
+One Instagram session is capped by its own rate limits; several sessions
+(separate Chrome profiles / CDP endpoints) can each spend their own
+budget. A ``SessionPool`` is a ``fetcher_fn`` that sends each profile to
+a session with capacity right now:
+
+- every ``Session`` has its own token bucket and, optionally, a cap on
+  total requests;
+- a login wall or rate-limit page puts that session in cooldown (doubling
+  on consecutive trips) and the profile is retried on another session at
+  once, so one tired session doesn't trip the run-wide breaker;
+- only when every session has tripped on the profile is the trip result
+  returned, for the orchestrator's breaker and retry logic to handle;
+- once every session has used its budget, ``FetchBudgetExhausted`` stops
+  the run with the remaining rows still pending.
+"""
+import threading
+import time
+
+from src.circuit_breaker import TRIP_STATES
+from src.fetchers import FetchBudgetExhausted
+from src.profile_parser import detect_page_state
+
+HEALTHY = "healthy"
+COOLING = "cooling"
+EXHAUSTED = "exhausted"
+
+# Cooldowns double per consecutive trip, up to this multiple.
+MAX_COOLDOWN_FACTOR = 8
+
+
+def _page_state(result):
+    if isinstance(result, str):
+        return detect_page_state(result)
+    return (result.get("page_state") or "normal").lower()
+
+
+class Session:
+    """One fetch session: a ``fetcher_fn`` plus its budget and health.
+
+    Args:
+        name: label for reports
+        fetcher_fn: fetches through this session; it should not take
+            rate-limit tokens itself, the pool does
+        limiter: token bucket (``src.rate_limiter``) for this session
+        cooldown_seconds: pause after a login/rate-limit page
+        max_requests: stop using the session after this many fetches
+    """
+
+    def __init__(self, name, fetcher_fn, limiter, cooldown_seconds=600, max_requests=None):
+        self.name = name
+        self.fetcher_fn = fetcher_fn
+        self.limiter = limiter
+        self.cooldown_seconds = cooldown_seconds
+        self.max_requests = max_requests
+        self.cooling_until = 0.0
+        self.consecutive_trips = 0
+        self.requests = 0
+        self.trips = 0
+        self.errors = 0
+        self.last_reason = None
+
+    def state(self, now):
+        if self.max_requests is not None and self.requests >= self.max_requests:
+            return EXHAUSTED
+        if now < self.cooling_until:
+            return COOLING
+        return HEALTHY
+
+    def cool_down(self, reason, now):
+        self.trips += 1
+        self.consecutive_trips += 1
+        self.last_reason = reason
+        factor = min(2 ** (self.consecutive_trips - 1), MAX_COOLDOWN_FACTOR)
+        self.cooling_until = now + self.cooldown_seconds * factor
+
+    def stats(self, now):
+        return {"state": self.state(now), "requests": self.requests, "trips": self.trips,
+                "errors": self.errors, "last_reason": self.last_reason,
+                "cooling_for": round(max(0.0, self.cooling_until - now), 1)}
+
+
+class SessionPool:
+    """``fetcher_fn`` routing each fetch to a session with capacity.
+
+    Sessions are tried least recently used first. When none has a token,
+    the pool sleeps until the soonest one will; when all are cooling, it
+    sleeps until the first cooldown ends (unless the profile has already
+    tripped a session, whose result is then returned). Raises
+    ``FetchBudgetExhausted`` once every session is exhausted.
+    """
+
+    def __init__(self, sessions, clock=time.monotonic, sleep=time.sleep):
+        if not sessions:
+            raise ValueError("SessionPool needs at least one session")
+        self.sessions = list(sessions)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._last_used = {s.name: 0.0 for s in self.sessions}
+
+    def _acquire(self, exclude):
+        """Return a session holding a token, sleeping as needed; None if none left."""
+        while True:
+            with self._lock:
+                now = self._clock()
+                candidates = [s for s in self.sessions
+                              if s not in exclude and s.state(now) != EXHAUSTED]
+                if not candidates:
+                    return None
+                healthy = [s for s in candidates if s.state(now) == HEALTHY]
+                if not healthy and exclude:
+                    # This profile already tripped a session; don't sit out
+                    # a cooldown for it.
+                    return None
+                healthy.sort(key=lambda s: self._last_used[s.name])
+                wait = None
+                for session in healthy:
+                    needed = session.limiter.take()
+                    if needed == 0.0:
+                        session.requests += 1
+                        self._last_used[session.name] = now
+                        return session
+                    wait = needed if wait is None else min(wait, needed)
+                if wait is None:
+                    wait = min(s.cooling_until for s in candidates) - now
+            self._sleep(max(wait, 0.001))
+
+    def __call__(self, handle, profile_url):
+        tried = []
+        last_trip = None
+        while True:
+            session = self._acquire(tried)
+            if session is None:
+                if last_trip is not None:
+                    return last_trip
+                raise FetchBudgetExhausted("All fetch sessions have used their request budget")
+            try:
+                result = session.fetcher_fn(handle, profile_url)
+            except Exception:
+                with self._lock:
+                    session.errors += 1
+                raise
+            state = _page_state(result)
+            with self._lock:
+                if state in TRIP_STATES:
+                    session.cool_down(state, self._clock())
+                else:
+                    session.consecutive_trips = 0
+            if state not in TRIP_STATES:
+                return result
+            tried.append(session)
+            last_trip = result
+
+    def stats(self):
+        """Return {session name: {state, requests, trips, errors, ...}}."""
+        with self._lock:
+            now = self._clock()
+            return {s.name: s.stats(now) for s in self.sessions}
+
+    def describe(self):
+        now = self._clock()
+        healthy = sum(1 for s in self.sessions if s.state(now) == HEALTHY)
+        return f"{healthy}/{len(self.sessions)} sessions healthy"
@@ -0,0 +1,210 @@
+"""Offline enrichment simulator.
+
+``SyntheticFetcher`` stands in for the browser fetcher: it sleeps for a
+latency drawn from a configurable distribution, injects not_found,
+suspended, private, rate_limited and login_required outcomes at set
+rates, and returns Instagram-like page text that goes through
+``profile_parser`` exactly like a real fetch. ``simulate`` runs it through ``run_all`` (or
+the staged pipeline) against a throwaway database and reports
+throughput, so orchestration changes can be benchmarked with no network.
+"""
+import json
+import math
+import os
+import random
+import tempfile
+import threading
+import time
+
+from src.batch_orchestrator import run_all
+from src.database import init_db, insert_followers, get_status_counts
+from src.metrics import RunMetrics
+from src.staged_pipeline import run_staged
+
+DEFAULT_RATES = {
+    "not_found": 0.03,
+    "suspended": 0.0,
+    "private": 0.25,
+    "rate_limited": 0.0,
+    "login_required": 0.0,
+}
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+_BIO_PARTS = [
+    "Honolulu dog trainer", "Kailua family bakery", "Maui real estate",
+    "Rescue mama", "Coffee roasters in Kona", "Proud dog mom",
+    "Nonprofit serving Oahu keiki", "Travel blogger", "Veterinary clinic",
+    "Credit union for Hawaii families", "Photographer", "Aloha from the 808",
+    "Service dog handler", "Brewery & taproom", "Just vibes",
+]
+_DOMAINS = ["linktr.ee/{h}", "{h}.com", "www.{h}.org", "{h}.shop"]
+
+_STATE_TEXT = {
+    "not_found": "Sorry, this page isn't available.\nThe link you followed may be broken.",
+    "suspended": "This account has been suspended for violating our terms.",
+    "rate_limited": "Please wait a few minutes before you try again.",
+    "login_required": "Log in to see photos and videos from friends.",
+}
+
+
+def _format_count(n):
+    """Render a count the way Instagram shows it: 1,234 / 12.3K / 2.5M."""
+    if n >= 1_000_000:
+        return f"{n / 1_000_000:.1f}M"
+    if n >= 10_000:
+        return f"{n / 1_000:.1f}K"
+    return f"{n:,}"
+
+
+def render_profile_page(rng, handle, private=False):
+    """Return Instagram-like innerText for a synthetic profile."""
+    followers = int(rng.lognormvariate(6.5, 1.5))
+    following = int(rng.lognormvariate(6.0, 0.8))
+    posts = int(rng.lognormvariate(4.0, 1.2))
+    lines = [handle]
+    if rng.random() < 0.02:
+        lines.append("Verified badge")
+    lines += [
+        "Follow", "Message",
+        f"{_format_count(posts)} posts",
+        f"{_format_count(followers)} followers",
+        f"{_format_count(following)} following",
+        handle.replace("_", " ").title(),
+        " | ".join(rng.sample(_BIO_PARTS, rng.randint(1, 3))),
+    ]
+    if rng.random() < 0.4:
+        lines.append(rng.choice(_DOMAINS).format(h=handle.replace("_", "")))
+    if rng.random() < 0.2:
+        lines.append("Contact Email Category: Local business")
+    if rng.random() < 0.3:
+        lines.append(f"Followed by {rng.choice(['hawaiifido', 'alohadogs'])} + 3 more")
+    if private:
+        lines += ["This account is private", "Follow to see their photos and videos."]
+    else:
+        lines += ["Posts", "Reels", "Tagged"]
+    return "\n".join(lines) + "\n"
+
+
+class SyntheticFetcher:
+    """Callable ``fetcher_fn(handle, profile_url)`` returning synthetic page text.
+
+    Args:
+        latency: one of LATENCY_DISTRIBUTIONS
+        latency_mean: mean (median for lognormal) seconds per fetch
+        latency_spread: half-width for uniform, sigma for lognormal
+        rates: outcome probabilities, keys from DEFAULT_RATES
+        time_scale: multiplies every sleep; 0 skips sleeping entirely
+        seed: RNG seed for reproducible runs
+    """
+
+    def __init__(self, latency="lognormal", latency_mean=2.0, latency_spread=0.5,
+                 rates=None, time_scale=1.0, seed=None, sleep=time.sleep):
+        if latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"latency must be one of {LATENCY_DISTRIBUTIONS}")
+        self.latency = latency
+        self.latency_mean = latency_mean
+        self.latency_spread = latency_spread
+        self.rates = {**DEFAULT_RATES, **(rates or {})}
+        unknown = set(self.rates) - set(DEFAULT_RATES)
+        if unknown:
+            raise ValueError(f"Unknown outcome rate(s): {unknown}")
+        if sum(self.rates.values()) > 1:
+            raise ValueError("outcome rates must sum to at most 1")
+        self.time_scale = time_scale
+        self._sleep = sleep
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.outcomes = {}
+        self.fetches = 0
+        self.simulated_seconds = 0.0
+
+    def _draw_latency(self):
+        if self.latency == "fixed":
+            return self.latency_mean
+        if self.latency == "uniform":
+            return max(0.0, self._rng.uniform(self.latency_mean - self.latency_spread,
+                                              self.latency_mean + self.latency_spread))
+        if self.latency == "exponential":
+            return self._rng.expovariate(1 / self.latency_mean)
+        return self._rng.lognormvariate(math.log(self.latency_mean), self.latency_spread)
+
+    def _draw_outcome(self):
+        roll = self._rng.random()
+        for outcome, rate in self.rates.items():
+            if roll < rate:
+                return outcome
+            roll -= rate
+        return "normal"
+
+    def __call__(self, handle, profile_url):
+        with self._lock:
+            latency = self._draw_latency()
+            outcome = self._draw_outcome()
+            if outcome in _STATE_TEXT:
+                text = _STATE_TEXT[outcome]
+            else:
+                text = render_profile_page(self._rng, handle, private=outcome == "private")
+            self.fetches += 1
+            self.simulated_seconds += latency
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        if self.time_scale:
+            self._sleep(latency * self.time_scale)
+        return text
+
+
+def simulate(profiles=200, fetcher=None, db_path=None, staged=False,
+             report_path=None, handles=None, **staged_kwargs):
+    """Enrich *profiles* synthetic followers offline and report throughput.
+
+    *handles* replaces the synthetic followers with these (e.g. the
+    handles of a ``fetch_archive.ReplayFetcher``); *fetcher* may be any
+    object with ``fetches`` and ``outcomes`` counters like
+    ``SyntheticFetcher``'s. Creates a temporary database unless *db_path*
+    is given. Returns a
+    report dict (also written as JSON to *report_path*) with the run
+    result, final status counts, injected outcomes, wall-clock
+    throughput and per-stage timings.
+    """
+    fetcher = fetcher or SyntheticFetcher()
+    if handles is None:
+        handles = [f"sim_user_{i}" for i in range(profiles)]
+    profiles = len(handles)
+    tmp_dir = None
+    if db_path is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(tmp_dir.name, "simulation.db")
+    try:
+        init_db(db_path)
+        insert_followers(db_path, [
+            {"handle": handle, "display_name": handle.replace("_", " ").title(),
+             "profile_url": f"https://www.instagram.com/{handle}/"}
+            for handle in handles
+        ])
+        metrics = RunMetrics()
+        started = time.monotonic()
+        if staged:
+            result = run_staged(db_path, fetcher, metrics=metrics, **staged_kwargs)
+        else:
+            result = run_all(db_path, fetcher, metrics=metrics)
+        elapsed = time.monotonic() - started
+        processed = result["total_completed"] + result["total_errors"]
+        report = {
+            "runner": "staged" if staged else "run_all",
+            "profiles": profiles,
+            "result": result,
+            "status_counts": get_status_counts(db_path),
+            "fetches": fetcher.fetches,
+            "outcomes": fetcher.outcomes,
+            "elapsed_seconds": round(elapsed, 3),
+            "profiles_per_hour": round(processed / elapsed * 3600, 1) if elapsed > 0 else None,
+            "stages": metrics.summary(),
+        }
+    finally:
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
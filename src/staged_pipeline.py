@@ -0,0 +1,372 @@
+"""Staged enrichment: claim → fetch → parse → enrich → write.
+
+Each stage runs on its own thread pool and hands work to the next stage
+through a bounded queue, so a slow stage applies backpressure upstream
+instead of letting work pile up in memory. Fetch workers only fetch:
+they never wait on SQLite commits or on regex-heavy classification.
+
+The fetcher contract is the same as for ``run_all``: ``fetcher_fn(handle,
+profile_url)`` returns a parsed profile dict. It may instead return the
+raw page text (a ``str``), in which case the parse stage runs
+``parse_profile_page`` off the fetch workers.
+
+Failed profiles are written back as 'pending' until they have used
+``MAX_RETRIES`` attempts, after which they stay 'error' (a refreshed row
+gets its previous data back instead) and no more rows are claimed: like
+``run_all``, the run ends with "batch_exhausted".
+
+An optional circuit breaker is shared by all fetch workers: while it is
+open, claiming pauses and fetch workers hand their rows straight back as
+'pending' without spending an attempt. Once the fetcher raises
+``FetchBudgetExhausted`` the same happens for every row still to be
+fetched, and the run ends with "budget_exhausted".
+
+If writing to the database fails, claiming stops, the rows still in the
+pipeline pass through unprocessed so every worker can finish, and
+``run_staged`` re-raises the error.
+"""
+import queue
+import sys
+import threading
+import time
+
+from src import config
+from src.batch_orchestrator import (create_batch, build_update, error_update,
+                                    refresh_failed_update)
+from src.circuit_breaker import CLOSED, HALF_OPEN, TRIP_STATES
+from src.database import update_followers
+from src.fetchers import FetchBudgetExhausted
+from src.metrics import timed
+from src.profile_parser import parse_profile_page
+
+_DONE = object()
+
+
+class _StageStats:
+    """Counters for one stage; updated by its workers under a lock."""
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.max_queue_depth = 0
+        self._lock = threading.Lock()
+
+    def record(self, items, busy, depth):
+        with self._lock:
+            self.items += items
+            self.busy_seconds += busy
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def summary(self, elapsed):
+        return {
+            "workers": self.workers,
+            "items": self.items,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "items_per_second": round(self.items / elapsed, 3) if elapsed > 0 else 0.0,
+            "utilization": (
+                round(self.busy_seconds / (elapsed * self.workers), 3)
+                if elapsed > 0 else 0.0
+            ),
+            "max_queue_depth": self.max_queue_depth,
+        }
+
+
+def _run_stage(stats, inbox, outbox, downstream_workers, fn, inline=False):
+    """Start threads applying *fn* to items from *inbox*.
+
+    *fn* returns the item to pass downstream. When the last worker sees
+    the end marker it forwards one marker per downstream worker. With
+    *inline*, one fewer thread is started and the returned ``worker``
+    must be run by the caller.
+    """
+    remaining = [stats.workers]
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            depth = inbox.qsize()
+            item = inbox.get()
+            if item is _DONE:
+                break
+            started = time.monotonic()
+            out = fn(item)
+            stats.record(1, time.monotonic() - started, depth)
+            outbox.put(out)
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            for _ in range(downstream_workers):
+                outbox.put(_DONE)
+
+    spawn = stats.workers - 1 if inline else stats.workers
+    threads = [threading.Thread(target=worker, name=f"{stats.name}-{i}", daemon=True)
+               for i in range(spawn)]
+    for t in threads:
+        t.start()
+    return threads, worker
+
+
+def run_staged(db_path, fetcher_fn, fetch_workers=1, parse_workers=1,
+               enrich_workers=1, queue_size=None, write_batch_size=20,
+               poll_interval=0.05, breaker=None, metrics=None, run_id=None,
+               should_stop=None):
+    """Enrich all pending followers through the staged pipeline.
+
+    Returns {batches_run, total_completed, total_errors, stopped, reason,
+    elapsed_seconds, stages}; ``stages`` maps each stage name to its
+    throughput, utilization and maximum inbox queue depth.
+    *run_id* and *should_stop* work as in ``run_all``: once *should_stop*
+    returns True no more rows are claimed, rows already in the pipeline
+    are finished, and the reason is "drained". Once a row has used all
+    its attempts claiming stops the same way, with reason
+    "batch_exhausted", and once the fetcher raises ``FetchBudgetExhausted``
+    with reason "budget_exhausted". Errors from claiming or writing are re-raised.
+    The calling thread is always one of the fetch workers, so a fetcher
+    bound to its creating thread (such as Playwright's sync API) works
+    with the default ``fetch_workers=1``; it must be thread-safe above that.
+    """
+    queue_size = queue_size or max(config.BATCH_SIZE, fetch_workers * 2)
+    fetch_q = queue.Queue(maxsize=queue_size)
+    parse_q = queue.Queue(maxsize=queue_size)
+    enrich_q = queue.Queue(maxsize=queue_size)
+    write_q = queue.Queue(maxsize=queue_size)
+
+    stats = {
+        "fetch": _StageStats("fetch", fetch_workers),
+        "parse": _StageStats("parse", parse_workers),
+        "enrich": _StageStats("enrich", enrich_workers),
+        "write": _StageStats("write", 1),
+    }
+    counters = {"batches_run": 0, "completed": 0, "errors": 0, "in_flight": 0,
+                "stopped": None}
+    attempts = {}
+    lock = threading.Lock()
+
+    def report(item):
+        # Feed the breaker as soon as the page state is known.
+        page_state = (item["result"].get("page_state") or "normal").lower()
+        breaker.record(page_state)
+        if page_state in TRIP_STATES and breaker.state != CLOSED:
+            item["released"] = True
+
+    write_error = []
+
+    def unless_failed(fn):
+        # After a write failure, pass items through so the stages drain.
+        def stage(item):
+            return item if write_error else fn(item)
+        return stage
+
+    budget_spent = []
+
+    def fetch(item):
+        follower = item["follower"]
+        if budget_spent or (breaker is not None and not breaker.allow()):
+            item["released"] = True
+            return item
+        try:
+            with timed(metrics, "fetch", handle=follower["handle"]):
+                item["result"] = fetcher_fn(follower["handle"], follower.get("profile_url", ""))
+        except FetchBudgetExhausted as e:
+            if not budget_spent:
+                print(f"[STOP] {follower['handle']}: {e}", file=sys.stderr)
+            budget_spent.append(e)
+            item["released"] = True
+            return item
+        except Exception as e:
+            item["error"] = e
+            if breaker is not None:
+                breaker.record("error")
+            return item
+        if breaker is not None and not isinstance(item["result"], str):
+            report(item)
+        return item
+
+    def parse(item):
+        if "released" in item:
+            return item
+        if "error" not in item and isinstance(item["result"], str):
+            try:
+                with timed(metrics, "parse", handle=item["follower"]["handle"]):
+                    item["result"] = parse_profile_page(item["result"])
+            except Exception as e:
+                item["error"] = e
+            else:
+                if breaker is not None:
+                    report(item)
+        return item
+
+    def enrich(item):
+        if "released" in item:
+            return item
+        if "error" not in item:
+            try:
+                item["update"] = build_update(item["follower"], item["result"],
+                                              metrics=metrics)
+            except Exception as e:
+                item["error"] = e
+        if "error" in item:
+            e = item["error"]
+            print(f"[ERROR] {item['follower']['handle']}: {type(e).__name__}: {e}",
+                  file=sys.stderr)
+            item["update"] = error_update(e)
+        return item
+
+    def write_items(items):
+        updates = []
+        completed = errors = 0
+        for item in items:
+            handle = item["follower"]["handle"]
+            if "released" in item:
+                updates.append((handle, {"status": "pending"}))
+                continue
+            data = item["update"]
+            if data["status"] == "error":
+                with lock:
+                    attempts[handle] = attempts.get(handle, 0) + 1
+                    retry = attempts[handle] < config.MAX_RETRIES
+                if retry:
+                    data = {"status": "pending", "error_message": None}
+                else:
+                    errors += 1
+                    if "error" in item and item["follower"].get("refresh_of") is not None:
+                        data = refresh_failed_update(item["follower"])
+            else:
+                completed += 1
+            updates.append((handle, data))
+        with timed(metrics, "write", rows=len(updates)):
+            update_followers(db_path, updates)
+        with lock:
+            counters["completed"] += completed
+            counters["errors"] += errors
+            counters["in_flight"] -= len(items)
+
+    def writer():
+        finished = False
+        while not finished:
+            depth = write_q.qsize()
+            item = write_q.get()
+            if item is _DONE:
+                break
+            items = [item]
+            while len(items) < write_batch_size:
+                try:
+                    nxt = write_q.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is _DONE:
+                    finished = True
+                    break
+                items.append(nxt)
+            if write_error:
+                continue  # discard, so upstream workers are never blocked
+            started = time.monotonic()
+            try:
+                write_items(items)
+            except Exception as e:
+                write_error.append(e)
+                continue
+            stats["write"].record(len(items), time.monotonic() - started, depth)
+
+    claim_error = []
+
+    def claimer():
+        # Claims a new batch whenever fetch_q has room: put() blocks while
+        # the bounded queues are full, which is the only backpressure on
+        # claiming. Retried rows are written back as 'pending', so an empty
+        # claim only ends the run once nothing is in flight; otherwise it
+        # polls until those rows come back.
+        try:
+            while True:
+                if write_error:
+                    break
+                if breaker is not None and breaker.state != CLOSED:
+                    if breaker.exhausted:
+                        counters["stopped"] = "circuit_open"
+                        break
+                    breaker.wait(should_stop=should_stop)
+                    if breaker.state == HALF_OPEN:
+                        # Claim the probe batch only once earlier work has drained.
+                        with lock:
+                            busy = counters["in_flight"] > 0
+                        if busy:
+                            time.sleep(poll_interval)
+                            continue
+                if should_stop is not None and should_stop():
+                    counters["stopped"] = "drained"
+                    break
+                if budget_spent:
+                    counters["stopped"] = "budget_exhausted"
+                    break
+                with lock:
+                    exhausted = counters["errors"] > 0
+                if exhausted:
+                    counters["stopped"] = "batch_exhausted"
+                    break
+                with timed(metrics, "claim"):
+                    batch = create_batch(db_path, run_id=run_id)
+                if batch:
+                    counters["batches_run"] += 1
+                    with lock:
+                        counters["in_flight"] += len(batch)
+                    for follower in batch:
+                        fetch_q.put({"follower": follower})
+                    continue
+                with lock:
+                    idle = counters["in_flight"] == 0
+                if idle:
+                    break
+                time.sleep(poll_interval)
+        except Exception as e:
+            claim_error.append(e)
+        finally:
+            for _ in range(fetch_workers):
+                fetch_q.put(_DONE)
+
+    started_at = time.monotonic()
+    threads = [threading.Thread(target=claimer, name="claim-0", daemon=True)]
+    fetch_threads, fetch_worker = _run_stage(
+        stats["fetch"], fetch_q, parse_q, parse_workers, unless_failed(fetch), inline=True)
+    threads += fetch_threads
+    threads += _run_stage(stats["parse"], parse_q, enrich_q, enrich_workers,
+                          unless_failed(parse))[0]
+    threads += _run_stage(stats["enrich"], enrich_q, write_q, 1, unless_failed(enrich))[0]
+    threads.append(threading.Thread(target=writer, name="write-0", daemon=True))
+    for t in [threads[0], threads[-1]]:
+        t.start()
+
+    fetch_worker()
+    for t in threads:
+        t.join()
+    if write_error:
+        raise write_error[0]
+    if claim_error:
+        raise claim_error[0]
+    if counters["stopped"] is None and counters["errors"]:
+        # The last rows ran out of attempts after the final claim.
+        counters["stopped"] = "batch_exhausted"
+
+    elapsed = time.monotonic() - started_at
+    return {
+        "batches_run": counters["batches_run"],
+        "total_completed": counters["completed"],
+        "total_errors": counters["errors"],
+        "stopped": counters["stopped"] is not None,
+        "reason": counters["stopped"] or "all_complete",
+        "elapsed_seconds": round(elapsed, 3),
+        "stages": {name: s.summary(elapsed) for name, s in stats.items()},
+    }
+
+
+def format_stage_report(stages):
+    """Render the ``stages`` dict from run_staged as aligned text lines."""
+    lines = [f"{'stage':<8}{'workers':>8}{'items':>8}{'items/s':>10}{'util':>7}{'max q':>7}"]
+    for name, s in stages.items():
+        lines.append(
+            f"{name:<8}{s['workers']:>8}{s['items']:>8}{s['items_per_second']:>10.2f}"
+            f"{s['utilization']:>7.0%}{s['max_queue_depth']:>7}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,16 @@
+"""Shared test helpers."""
+
+
+class FakeClock:
+    """Manually advanced clock: call it for the time; sleep() advances it."""
+
+    def __init__(self, start=0.0):
+        self.now = start
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
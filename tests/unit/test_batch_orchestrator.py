@@ -4,6 +4,10 @@ import datetime
 import pytest
 from src.database import init_db, insert_followers, update_follower, get_status_counts, get_pending
 from src.batch_orchestrator import create_batch, process_batch, run_with_retries, run_all
+from src.circuit_breaker import CircuitBreaker
+from src.fetchers import FetchBudgetExhausted
+from src.metrics import RunMetrics
+from tests.conftest import FakeClock
 
 
 def _setup_db(tmp_path, count=5):
@@ -38,6 +42,16 @@ def _failing_fetcher(handle, profile_url):
     raise Exception(f"Failed to fetch {handle}")
 
 
+def _budget_fetcher(budget):
+    """Fetch *budget* profiles, then raise FetchBudgetExhausted."""
+    def fetcher(handle, profile_url):
+        if not budget:
+            raise FetchBudgetExhausted("no budget left")
+        budget.pop()
+        return _mock_fetcher(handle, profile_url)
+    return fetcher
+
+
 # ── 6.1 create_batch ──────────────────────────────────────────────
 class TestCreateBatch:
     def test_claims_pending_records(self, tmp_path):
@@ -95,6 +109,23 @@ class TestCreateBatch:
         # No pending records, recent processing should NOT be reset
         assert batch == []
 
+    def test_claims_highest_priority_estimate_first(self, tmp_path):
+        db = _setup_db(tmp_path, count=3)
+        insert_followers(db, [
+            {"handle": "aloha_pet_grooming", "display_name": "Aloha Pet Grooming Honolulu",
+             "profile_url": "https://instagram.com/aloha_pet_grooming/"},
+        ])
+        os.environ["BATCH_SIZE"] = "1"
+        try:
+            import src.config
+            import importlib
+            importlib.reload(src.config)
+            batch = create_batch(db)
+            assert batch[0]["handle"] == "aloha_pet_grooming"
+        finally:
+            del os.environ["BATCH_SIZE"]
+            importlib.reload(src.config)
+
     def test_batch_returns_dicts(self, tmp_path):
         db = _setup_db(tmp_path, count=2)
         batch = create_batch(db)
@@ -256,6 +287,80 @@ class TestProcessBatch:
         assert row_dict["status"] == "error"
         assert row_dict["error_message"] == "login_required"
 
+    def test_private_account_skips_classification(self, tmp_path):
+        db = _setup_db(tmp_path, count=1)
+        batch = create_batch(db)
+        metrics = RunMetrics()
+
+        def private_fetcher(handle, url):
+            return {**_mock_fetcher(handle, url), "is_private": True}
+
+        process_batch(db, batch, private_fetcher, metrics=metrics)
+        from src.database import _connect
+        conn = _connect(db)
+        row = dict(conn.execute("SELECT * FROM followers WHERE handle='user_0'").fetchone())
+        conn.close()
+        assert row["follower_count"] == 1000
+        assert row["category"] is None
+        assert row["priority_score"] is None
+        summary = metrics.summary()
+        assert "classify" not in summary
+        assert "score" not in summary
+
+    def test_terminal_rows_written_in_one_bulk_update(self, tmp_path, monkeypatch):
+        import src.batch_orchestrator as orchestrator
+
+        db = _setup_db(tmp_path, count=4)
+        batch = create_batch(db)
+        bulk_calls = []
+        single_calls = []
+        real_bulk = orchestrator.update_followers
+        real_single = orchestrator.update_follower
+        monkeypatch.setattr(orchestrator, "update_followers",
+                            lambda path, updates: (bulk_calls.append(len(updates)),
+                                                   real_bulk(path, updates)))
+        monkeypatch.setattr(orchestrator, "update_follower",
+                            lambda path, handle, data: (single_calls.append(handle),
+                                                        real_single(path, handle, data)))
+        outcomes = {
+            "user_0": {"is_private": True},
+            "user_1": {"page_state": "not_found"},
+            "user_2": {},
+        }
+
+        def fetcher(handle, url):
+            if handle == "user_3":
+                raise Exception("boom")
+            return {**_mock_fetcher(handle, url), **outcomes[handle]}
+
+        result = process_batch(db, batch, fetcher)
+        assert result == {"completed": 2, "errors": 2, "released": 0, "budget_exhausted": False}
+        assert single_calls == ["user_2"]
+        assert bulk_calls == [3]
+        assert get_status_counts(db) == {"completed": 1, "private": 1, "error": 2}
+
+    def test_budget_exhausted_releases_rest_of_batch(self, tmp_path):
+        db = _setup_db(tmp_path, count=5)
+        batch = create_batch(db)
+        result = process_batch(db, batch, _budget_fetcher([1, 1]))
+        assert result == {"completed": 2, "errors": 0, "released": 3, "budget_exhausted": True}
+        assert get_status_counts(db) == {"completed": 2, "pending": 3}
+
+    def test_prefetch_hints_next_follower(self, tmp_path):
+        db = _setup_db(tmp_path, count=3)
+        batch = create_batch(db)
+        calls = []
+
+        def fetcher(handle, url):
+            calls.append(("fetch", handle))
+            return _mock_fetcher(handle, url)
+
+        fetcher.prefetch = lambda handle, url: calls.append(("prefetch", handle))
+        process_batch(db, batch, fetcher)
+        assert calls == [("prefetch", "user_1"), ("fetch", "user_0"),
+                         ("prefetch", "user_2"), ("fetch", "user_1"),
+                         ("fetch", "user_2")]
+
 
 # ── 6.3 run_with_retries ──────────────────────────────────────────
 class TestRunWithRetries:
@@ -331,6 +436,14 @@ class TestRunAll:
         assert result["stopped"] == True
         assert result["reason"] == "batch_exhausted"
 
+    def test_stops_when_fetch_budget_exhausted(self, tmp_path):
+        db = _setup_db(tmp_path, count=5)
+        result = run_all(db, _budget_fetcher([1, 1]))
+        assert result["stopped"] is True
+        assert result["reason"] == "budget_exhausted"
+        assert result["total_errors"] == 0
+        assert get_status_counts(db) == {"completed": 2, "pending": 3}
+
     def test_no_pending_returns_zero_batches(self, tmp_path):
         db = _setup_db(tmp_path, count=0)
         result = run_all(db, _mock_fetcher)
@@ -360,3 +473,162 @@ class TestRunAll:
         assert result["total_completed"] == 2
         counts = get_status_counts(db)
         assert counts.get("completed") == 5
+
+
+# ── Circuit breaker ───────────────────────────────────────────────
+def _breaker(threshold=2, **kwargs):
+    clock = FakeClock()
+    return CircuitBreaker(threshold=threshold, cooldown_seconds=60,
+                          clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def _login_fetcher(handle, url):
+    return {**_mock_fetcher(handle, url), "page_state": "login_required"}
+
+
+class TestCircuitBreakerIntegration:
+    def test_open_breaker_releases_rows_to_pending(self, tmp_path):
+        db = _setup_db(tmp_path, count=5)
+        batch = create_batch(db)
+        calls = []
+
+        def fetcher(handle, url):
+            calls.append(handle)
+            return _login_fetcher(handle, url)
+
+        result = process_batch(db, batch, fetcher, breaker=_breaker(threshold=2))
+        # First row errors, second trips the breaker, rest are never fetched.
+        assert len(calls) == 2
+        assert result["errors"] == 1
+        assert result["released"] == 4
+        counts = get_status_counts(db)
+        assert counts == {"error": 1, "pending": 4}
+
+    def test_retries_stop_and_trip_errors_released(self, tmp_path):
+        db = _setup_db(tmp_path, count=3)
+        batch = create_batch(db)
+        calls = [0]
+
+        def fetcher(handle, url):
+            calls[0] += 1
+            return _login_fetcher(handle, url)
+
+        result = run_with_retries(db, batch, fetcher, breaker=_breaker(threshold=2))
+        assert calls[0] == 2
+        assert result["exhausted"] is False
+        assert get_status_counts(db) == {"pending": 3}
+
+    def test_run_all_resumes_after_probe(self, tmp_path):
+        db = _setup_db(tmp_path, count=4)
+        breaker = _breaker(threshold=1)
+        logged_in = [False]
+
+        def fetcher(handle, url):
+            if not logged_in[0]:
+                logged_in[0] = True  # session recovers during the cooldown
+                return _login_fetcher(handle, url)
+            return _mock_fetcher(handle, url)
+
+        result = run_all(db, fetcher, breaker=breaker)
+        assert result["reason"] == "all_complete"
+        assert result["total_completed"] == 4
+        assert breaker.trips == 1
+        assert get_status_counts(db) == {"completed": 4}
+
+    def test_run_all_stops_when_breaker_exhausted(self, tmp_path):
+        db = _setup_db(tmp_path, count=4)
+        breaker = _breaker(threshold=1, max_trips=2)
+        calls = [0]
+
+        def fetcher(handle, url):
+            calls[0] += 1
+            return _login_fetcher(handle, url)
+
+        result = run_all(db, fetcher, breaker=breaker)
+        assert result["stopped"] is True
+        assert result["reason"] == "circuit_open"
+        assert calls[0] == 2  # initial trip + one failed probe
+        assert get_status_counts(db) == {"pending": 4}
+
+    def test_drain_interrupts_breaker_wait(self, tmp_path):
+        db = _setup_db(tmp_path, count=4)
+        clock = FakeClock()
+        breaker = CircuitBreaker(threshold=1, cooldown_seconds=600,
+                                 clock=clock, sleep=clock.sleep)
+        result = run_all(db, _login_fetcher, breaker=breaker,
+                         should_stop=lambda: clock.now >= 3)
+        assert result["reason"] == "drained"
+        assert clock.now < 600
+        assert get_status_counts(db) == {"pending": 4}
+
+    def test_breaker_ignored_when_absent(self, tmp_path):
+        db = _setup_db(tmp_path, count=2)
+        batch = create_batch(db)
+        result = process_batch(db, batch, _login_fetcher)
+        assert result["errors"] == 2
+        assert result["released"] == 0
+
+
+# ── Stage metrics ─────────────────────────────────────────────────
+class TestStageMetrics:
+    def test_run_all_records_every_stage(self, tmp_path):
+        db = _setup_db(tmp_path, count=3)
+        metrics = RunMetrics()
+        run_all(db, _mock_fetcher, metrics=metrics)
+        summary = metrics.summary()
+        assert list(summary) == ["claim", "fetch", "location", "classify", "score", "write"]
+        assert summary["fetch"]["count"] == 3
+        assert summary["claim"]["count"] == 2  # one batch + the empty claim
+
+    def test_raw_text_results_are_parsed_and_timed(self, tmp_path):
+        db = _setup_db(tmp_path, count=1)
+        metrics = RunMetrics()
+        batch = create_batch(db)
+
+        def raw_fetcher(handle, url):
+            return "10 posts 2.5K followers 30 following\nBio\nPosts\n"
+
+        result = process_batch(db, batch, raw_fetcher, metrics=metrics)
+        assert result["completed"] == 1
+        assert metrics.summary()["parse"]["count"] == 1
+
+
+# ── Drain and resume ──────────────────────────────────────────────
+class TestDrain:
+    def test_create_batch_leases_rows_to_run(self, tmp_path):
+        from src.database import release_leases
+
+        db = _setup_db(tmp_path, count=3)
+        create_batch(db, run_id="run-a")
+        assert release_leases(db, "run-b") == 0
+        assert release_leases(db, "run-a") == 3
+        assert get_status_counts(db) == {"pending": 3}
+
+    def test_should_stop_drains_after_current_batch(self, tmp_path):
+        db = _setup_db(tmp_path, count=12)
+        os.environ["BATCH_SIZE"] = "5"
+        try:
+            import src.config
+            import importlib
+            importlib.reload(src.config)
+            calls = [0]
+
+            def fetcher(handle, url):
+                calls[0] += 1
+                return _mock_fetcher(handle, url)
+
+            result = run_all(db, fetcher, should_stop=lambda: calls[0] >= 3)
+            assert result["stopped"] is True
+            assert result["reason"] == "drained"
+            assert result["total_completed"] == 5  # in-flight batch finished
+            assert get_status_counts(db) == {"completed": 5, "pending": 7}
+        finally:
+            del os.environ["BATCH_SIZE"]
+            importlib.reload(src.config)
+
+    def test_checkpoint_called_per_batch(self, tmp_path):
+        db = _setup_db(tmp_path, count=3)
+        checkpoints = []
+        run_all(db, _mock_fetcher, run_id="run-a", checkpoint=checkpoints.append)
+        assert len(checkpoints) == 1
+        assert checkpoints[0]["total_completed"] == 3
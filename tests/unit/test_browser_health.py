@@ -0,0 +1,85 @@
+"""Tests for src/browser_health.py — heap/responsiveness tab recycling."""
+from src.browser_health import HealthMonitor
+from src.metrics import RunMetrics
+from src.page_pool import PagePool
+
+MB = 1_048_576
+
+
+class FakePage:
+    def __init__(self, heap_mb=50, response_ms=20):
+        self.heap_mb = heap_mb
+        self.response_ms = response_ms
+
+
+def _probe(page):
+    return {"heap_bytes": page.heap_mb * MB, "response_ms": page.response_ms}
+
+
+class TestHealthMonitor:
+    def test_samples_every_nth_check(self):
+        probed = []
+        monitor = HealthMonitor(lambda p: probed.append(p) or _probe(p), sample_every=3)
+        page = FakePage()
+        assert all(monitor.check(page) for _ in range(7))
+        assert len(probed) == 2
+
+    def test_heap_over_limit_recycles(self):
+        monitor = HealthMonitor(_probe, max_heap_mb=100, sample_every=1)
+        assert monitor.check(FakePage(heap_mb=80))
+        assert not monitor.check(FakePage(heap_mb=120))
+        assert monitor.stats()["recycled"] == {"heap": 1}
+        assert monitor.stats()["peak_heap_mb"] == 120
+
+    def test_slow_needs_consecutive_samples(self):
+        monitor = HealthMonitor(_probe, max_response_ms=500, sample_every=1, slow_samples=2)
+        page = FakePage(response_ms=900)
+        assert monitor.check(page)
+        page.response_ms = 10
+        assert monitor.check(page)
+        page.response_ms = 900
+        assert monitor.check(page)
+        assert not monitor.check(page)
+        assert monitor.stats()["recycled"] == {"slow": 1}
+
+    def test_on_recycle_sees_only_failed_tabs(self):
+        recycled = []
+        monitor = HealthMonitor(_probe, max_heap_mb=100, sample_every=1,
+                                on_recycle=recycled.append)
+        healthy, bloated = FakePage(heap_mb=80), FakePage(heap_mb=120)
+        monitor.check(healthy)
+        monitor.check(bloated)
+        assert recycled == [bloated]
+
+    def test_on_recycle_errors_are_ignored(self):
+        def failing(page):
+            raise RuntimeError("Target closed")
+
+        monitor = HealthMonitor(_probe, max_heap_mb=100, sample_every=1, on_recycle=failing)
+        assert not monitor.check(FakePage(heap_mb=120))
+
+    def test_unknown_heap_is_not_judged(self):
+        monitor = HealthMonitor(lambda p: {"heap_bytes": None, "response_ms": 5},
+                                sample_every=1)
+        assert monitor.check(FakePage())
+
+    def test_samples_are_observed(self):
+        metrics = RunMetrics()
+        monitor = HealthMonitor(_probe, sample_every=1, metrics=metrics)
+        monitor.check(FakePage(response_ms=250))
+        assert metrics.summary()["health"]["count"] == 1
+
+    def test_pool_replaces_only_the_bloated_page(self):
+        pages = [FakePage(), FakePage()]
+        made = iter(pages + [FakePage()])
+        monitor = HealthMonitor(_probe, max_heap_mb=100, sample_every=1)
+        pool = PagePool(lambda: next(made), size=2, health_check=monitor.check,
+                        dispose=monitor.forget)
+        a, b = pool.checkout(), pool.checkout()
+        pool.checkin(a)
+        pool.checkin(b)
+        b.heap_mb = 500
+        first, second = pool.checkout(), pool.checkout()
+        assert a in (first, second)
+        assert b not in (first, second)
+        assert pool.stats()["recycled"] == 1
@@ -0,0 +1,114 @@
+"""Tests for src/circuit_breaker.py — run-wide breaker for session failures."""
+from src.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+from tests.conftest import FakeClock
+
+
+def _breaker(**kwargs):
+    clock = FakeClock()
+    kwargs.setdefault("threshold", 3)
+    kwargs.setdefault("cooldown_seconds", 60)
+    return CircuitBreaker(clock=clock, sleep=clock.sleep, **kwargs), clock
+
+
+class TestCircuitBreaker:
+    def test_starts_closed(self):
+        breaker, _ = _breaker()
+        assert breaker.state == CLOSED
+        assert breaker.allow()
+
+    def test_opens_after_consecutive_trips(self):
+        breaker, _ = _breaker()
+        breaker.record("login_required")
+        breaker.record("rate_limited")
+        assert breaker.state == CLOSED
+        breaker.record("login_required")
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+        assert breaker.trips == 1
+
+    def test_success_resets_streak(self):
+        breaker, _ = _breaker()
+        breaker.record("rate_limited")
+        breaker.record("rate_limited")
+        breaker.record("normal")
+        breaker.record("rate_limited")
+        assert breaker.state == CLOSED
+
+    def test_errors_do_not_reset_streak(self):
+        breaker, _ = _breaker(threshold=2)
+        breaker.record("rate_limited")
+        breaker.record("error")
+        breaker.record("rate_limited")
+        assert breaker.state == OPEN
+
+    def test_half_open_after_cooldown(self):
+        breaker, clock = _breaker(threshold=1)
+        breaker.record("login_required")
+        clock.now += 59
+        assert breaker.state == OPEN
+        clock.now += 1
+        assert breaker.state == HALF_OPEN
+
+    def test_half_open_allows_single_probe(self):
+        breaker, clock = _breaker(threshold=1)
+        breaker.record("login_required")
+        clock.now += 60
+        assert breaker.allow()
+        assert not breaker.allow()
+
+    def test_successful_probe_closes(self):
+        breaker, clock = _breaker(threshold=1)
+        breaker.record("login_required")
+        clock.now += 60
+        breaker.allow()
+        breaker.record("normal")
+        assert breaker.state == CLOSED
+        assert breaker.allow()
+
+    def test_failed_probe_reopens(self):
+        breaker, clock = _breaker(threshold=3)
+        for _ in range(3):
+            breaker.record("rate_limited")
+        clock.now += 60
+        breaker.allow()
+        breaker.record("rate_limited")
+        assert breaker.state == OPEN
+        assert breaker.trips == 2
+
+    def test_errored_probe_frees_slot(self):
+        breaker, clock = _breaker(threshold=1)
+        breaker.record("login_required")
+        clock.now += 60
+        breaker.allow()
+        breaker.record("error")
+        assert breaker.allow()
+
+    def test_wait_sleeps_until_probe(self):
+        breaker, clock = _breaker(threshold=1, cooldown_seconds=30)
+        breaker.record("login_required")
+        clock.now += 10
+        assert breaker.wait() == 20
+        assert breaker.state == HALF_OPEN
+        assert breaker.wait() == 0
+
+    def test_wait_returns_early_on_stop(self):
+        breaker, clock = _breaker(threshold=1, cooldown_seconds=300)
+        breaker.record("login_required")
+        assert breaker.wait(should_stop=lambda: clock.now >= 5, poll_seconds=1) == 5
+        assert breaker.state == OPEN
+        assert breaker.wait(should_stop=lambda: False, poll_seconds=60) == 295
+
+    def test_exhausted_after_max_trips(self):
+        breaker, clock = _breaker(threshold=1, max_trips=2)
+        breaker.record("login_required")
+        assert not breaker.exhausted
+        clock.now += 60
+        breaker.allow()
+        breaker.record("login_required")
+        assert breaker.exhausted
+
+    def test_describe(self):
+        breaker, _ = _breaker(threshold=1)
+        assert breaker.describe() == "circuit closed"
+        breaker.record("login_required")
+        assert breaker.describe() == "circuit open (login_required)"
@@ -49,3 +49,41 @@ def test_env_override_max_retries():
         assert config.MAX_RETRIES == 5
     finally:
         del os.environ["MAX_RETRIES"]
+
+
+def test_default_rate_limit():
+    import src.config as config
+    importlib.reload(config)
+    assert config.RATE_LIMIT_RATE == 0.25
+    assert config.RATE_LIMIT_BURST == 3
+
+
+def test_env_override_rate_limit():
+    os.environ["RATE_LIMIT_RATE"] = "0.5"
+    os.environ["RATE_LIMIT_BURST"] = "1"
+    try:
+        import src.config as config
+        importlib.reload(config)
+        assert config.RATE_LIMIT_RATE == 0.5
+        assert config.RATE_LIMIT_BURST == 1
+    finally:
+        del os.environ["RATE_LIMIT_RATE"]
+        del os.environ["RATE_LIMIT_BURST"]
+        importlib.reload(config)
+
+
+def test_default_refresh_budget():
+    import src.config as config
+    importlib.reload(config)
+    assert config.REFRESH_DAILY_BUDGET == 100
+
+
+def test_env_override_refresh_budget():
+    os.environ["REFRESH_DAILY_BUDGET"] = "25"
+    try:
+        import src.config as config
+        importlib.reload(config)
+        assert config.REFRESH_DAILY_BUDGET == 25
+    finally:
+        del os.environ["REFRESH_DAILY_BUDGET"]
+        importlib.reload(config)
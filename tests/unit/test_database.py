@@ -26,8 +26,12 @@ EXPECTED_COLUMNS = {
     "confidence": "REAL",
     "priority_score": "INTEGER",
     "priority_reason": "TEXT",
+    "priority_estimate": "INTEGER",
     "status": "TEXT",
     "error_message": "TEXT",
+    "lease_owner": "TEXT",
+    "refresh_of": "TEXT",
+    "refresh_processed_at": "DATETIME",
     "processed_at": "DATETIME",
     "created_at": "DATETIME",
 }
@@ -61,7 +65,7 @@ def test_init_db_has_all_22_columns(tmp_path):
     columns = {row[1]: row[2] for row in cursor.fetchall()}
     conn.close()
 
-    assert len(columns) == 23
+    assert len(columns) == 27
     for col_name, col_type in EXPECTED_COLUMNS.items():
         assert col_name in columns, f"Missing column: {col_name}"
         assert columns[col_name] == col_type, (
@@ -275,6 +279,38 @@ def test_get_pending_returns_pending_only(tmp_path):
     assert len(pending) == 2
 
 
+def test_get_all_followers(tmp_path):
+    """get_all_followers returns every row as a dict, whatever its status."""
+    from src.database import init_db, insert_followers, get_all_followers, update_follower
+
+    db_path = str(tmp_path / "test.db")
+    init_db(db_path)
+    insert_followers(db_path, SAMPLE_FOLLOWERS)
+    update_follower(db_path, "alice_dog", {"status": "completed"})
+
+    rows = get_all_followers(db_path)
+    assert [row["handle"] for row in rows] == [f["handle"] for f in SAMPLE_FOLLOWERS]
+    assert isinstance(rows[0], dict)
+
+
+def test_enqueue_refreshes_skips_rows_not_refreshable(tmp_path):
+    """Only completed/private rows are re-queued and logged against the budget."""
+    from src.database import (init_db, insert_followers, update_follower, enqueue_refreshes,
+                              count_refreshes_since, get_status_counts)
+
+    db_path = str(tmp_path / "test.db")
+    init_db(db_path)
+    insert_followers(db_path, SAMPLE_FOLLOWERS[:3])
+    done, busy, broken = (f["handle"] for f in SAMPLE_FOLLOWERS[:3])
+    update_follower(db_path, done, {"status": "completed"})
+    update_follower(db_path, busy, {"status": "processing"})
+    update_follower(db_path, broken, {"status": "error"})
+
+    assert enqueue_refreshes(db_path, [done, busy, broken], "2026-06-01T12:00:00") == [done]
+    assert count_refreshes_since(db_path, "2026-06-01T00:00:00") == 1
+    assert get_status_counts(db_path) == {"pending": 1, "processing": 1, "error": 1}
+
+
 def test_get_pending_respects_limit(tmp_path):
     """get_pending returns at most `limit` rows."""
     from src.database import init_db, insert_followers, get_pending
@@ -429,6 +465,106 @@ def test_update_follower_empty_dict_is_noop(tmp_path):
     assert row["status"] == "pending"
 
 
+def test_update_followers_applies_all_updates(tmp_path):
+    """update_followers writes every (handle, data) pair."""
+    from src.database import init_db, insert_followers, update_followers, get_status_counts
+
+    db_path = str(tmp_path / "test.db")
+    init_db(db_path)
+    insert_followers(db_path, SAMPLE_FOLLOWERS)
+
+    update_followers(db_path, [
+        ("alice_dog", {"status": "completed", "priority_score": 70}),
+        ("bob_pup", {"status": "error", "error_message": "not_found"}),
+    ])
+
+    counts = get_status_counts(db_path)
+    assert counts == {"pending": 1, "completed": 1, "error": 1}
+
+
+def test_update_followers_rejects_invalid_column_atomically(tmp_path):
+    """update_followers writes nothing when any update has a bad column."""
+    import pytest
+    from src.database import init_db, insert_followers, update_followers, get_status_counts
+
+    db_path = str(tmp_path / "test.db")
+    init_db(db_path)
+    insert_followers(db_path, SAMPLE_FOLLOWERS)
+
+    with pytest.raises(ValueError, match="Invalid column"):
+        update_followers(db_path, [
+            ("alice_dog", {"status": "completed"}),
+            ("bob_pup", {"hacked": "yes"}),
+        ])
+
+    assert get_status_counts(db_path) == {"pending": 3}
+
+
+def test_init_db_migrates_old_schema(tmp_path):
+    """init_db adds priority_estimate to an older DB and backfills it."""
+    from src.database import init_db
+
+    db_path = str(tmp_path / "test.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE followers (id INTEGER PRIMARY KEY, handle TEXT UNIQUE, "
+        "display_name TEXT, profile_url TEXT, status TEXT)"
+    )
+    conn.execute(
+        "INSERT INTO followers (handle, display_name, status) "
+        "VALUES ('honolulu_bank', 'Bank of Honolulu', 'pending')"
+    )
+    conn.commit()
+    conn.close()
+
+    init_db(db_path)
+
+    conn = sqlite3.connect(db_path)
+    estimate = conn.execute("SELECT priority_estimate FROM followers").fetchone()[0]
+    indexes = {row[1] for row in conn.execute("PRAGMA index_list(followers)")}
+    conn.close()
+    assert estimate > 0
+    assert "idx_followers_claim" in indexes
+
+
+def test_insert_followers_sets_priority_estimate(tmp_path):
+    """insert_followers stores a pre-enrichment estimate per row."""
+    from src.database import init_db, insert_followers
+
+    db_path = str(tmp_path / "test.db")
+    init_db(db_path)
+    insert_followers(db_path, [
+        {"handle": "random_person", "display_name": "Random Person",
+         "profile_url": "https://instagram.com/random_person/"},
+        {"handle": "kailua_dog_training", "display_name": "Kailua Dog Training",
+         "profile_url": "https://instagram.com/kailua_dog_training/"},
+    ])
+
+    conn = sqlite3.connect(db_path)
+    rows = dict(conn.execute("SELECT handle, priority_estimate FROM followers").fetchall())
+    conn.close()
+    assert rows["kailua_dog_training"] > rows["random_person"]
+
+
+def test_get_pending_orders_by_priority_estimate(tmp_path):
+    """get_pending returns the highest estimates first."""
+    from src.database import init_db, insert_followers, get_pending
+
+    db_path = str(tmp_path / "test.db")
+    init_db(db_path)
+    insert_followers(db_path, [
+        {"handle": "random_person", "display_name": "Random Person",
+         "profile_url": "https://instagram.com/random_person/"},
+        {"handle": "maui_humane_society", "display_name": "Maui Humane Society",
+         "profile_url": "https://instagram.com/maui_humane_society/"},
+        {"handle": "honolulu_rotary", "display_name": "Rotary Club of Honolulu",
+         "profile_url": "https://instagram.com/honolulu_rotary/"},
+    ])
+
+    pending = get_pending(db_path, 1)
+    assert pending[0]["handle"] == "honolulu_rotary"
+
+
 def test_get_status_counts(tmp_path):
     """get_status_counts returns dict of status -> count."""
     from src.database import init_db, insert_followers, update_follower, get_status_counts
@@ -458,3 +594,54 @@ def test_get_status_counts_empty(tmp_path):
 
     counts = get_status_counts(db_path)
     assert counts == {}
+
+
+def test_save_and_load_run(tmp_path):
+    """save_run upserts a run record that load_run returns decoded."""
+    from src.database import init_db, save_run, load_run
+
+    db_path = str(tmp_path / "test.db")
+    init_db(db_path)
+
+    save_run(db_path, "run-1", "running", counters={"total_completed": 3})
+    save_run(db_path, "run-1", "drained", counters={"total_completed": 7},
+             pacing={"rate": 0.3})
+
+    record = load_run(db_path, "run-1")
+    assert record["status"] == "drained"
+    assert record["counters"] == {"total_completed": 7}
+    assert record["pacing"] == {"rate": 0.3}
+    assert record["started_at"] <= record["updated_at"]
+
+
+def test_load_run_latest_unfinished(tmp_path):
+    """load_run without an id returns the newest drained/interrupted/stopped run."""
+    from src.database import init_db, save_run, load_run
+
+    db_path = str(tmp_path / "test.db")
+    init_db(db_path)
+    save_run(db_path, "old", "drained")
+    save_run(db_path, "newer", "drained")
+    save_run(db_path, "done", "completed")
+
+    assert load_run(db_path)["run_id"] == "newer"
+    save_run(db_path, "live", "running")
+    save_run(db_path, "cooling", "paused")
+    assert load_run(db_path)["run_id"] == "newer"
+    assert load_run(db_path, "live")["status"] == "running"
+    assert load_run(db_path, "missing") is None
+
+
+def test_release_leases_only_touches_own_rows(tmp_path):
+    """release_leases resets only processing rows leased to the given run."""
+    from src.database import (init_db, insert_followers, update_follower,
+                              release_leases, get_status_counts)
+
+    db_path = str(tmp_path / "test.db")
+    init_db(db_path)
+    insert_followers(db_path, SAMPLE_FOLLOWERS)
+    update_follower(db_path, "alice_dog", {"status": "processing", "lease_owner": "mine"})
+    update_follower(db_path, "bob_pup", {"status": "processing", "lease_owner": "theirs"})
+
+    assert release_leases(db_path, "mine") == 1
+    assert get_status_counts(db_path) == {"pending": 2, "processing": 1}
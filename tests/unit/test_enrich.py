@@ -0,0 +1,339 @@
+"""Tests for scripts/enrich.py — browser path driven with stub Playwright objects."""
+import json
+import re
+import shutil
+import signal
+import subprocess
+
+import pytest
+
+from src.fetchers import with_base_url
+from src.mock_server import render_profile_html
+
+pytest.importorskip("playwright.sync_api")
+
+_handlers = {sig: signal.getsignal(sig) for sig in (signal.SIGINT, signal.SIGTERM)}
+from scripts import enrich  # noqa: E402  (installs drain signal handlers)
+
+for _sig, _handler in _handlers.items():
+    signal.signal(_sig, _handler)
+
+
+class FakePage:
+    """Stands in for a Playwright page; records evaluate() scripts."""
+
+    def __init__(self, payloads=None, navigate_error=None):
+        self.url = "about:blank"
+        self.payloads = payloads or {}
+        self.navigate_error = navigate_error
+        self.evaluated = []
+        self.gotos = []
+        self.closed = False
+
+    def set_default_navigation_timeout(self, ms):
+        pass
+
+    def route(self, pattern, handler):
+        pass
+
+    def is_closed(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+    def goto(self, url):
+        self.gotos.append(url)
+        self.url = url
+
+    def wait_for_load_state(self, state):
+        pass
+
+    def wait_for_url(self, url, wait_until=None):
+        pass
+
+    def wait_for_function(self, script, arg=None, timeout=None, polling=None):
+        return True
+
+    def evaluate(self, script, arg=None):
+        self.evaluated.append(script)
+        if script == enrich.PROFILE_EXTRACT_JS:
+            return dict(self.payloads[self.url.rstrip("/").rsplit("/", 1)[-1]])
+        if "window.location.href" in script:
+            # make_fetcher's prefetch navigation
+            if self.navigate_error is not None:
+                raise self.navigate_error
+            self.url = arg
+        return None
+
+
+class FakeContext:
+    def __init__(self, payloads):
+        self.payloads = payloads
+        self.navigate_error = None
+        self.pages = []
+
+    def set_default_timeout(self, ms):
+        pass
+
+    def new_page(self):
+        page = FakePage(self.payloads, navigate_error=self.navigate_error)
+        self.pages.append(page)
+        return page
+
+
+class FakeBrowser:
+    def __init__(self, payloads):
+        self.contexts = [FakeContext(payloads)]
+
+    def close(self):
+        pass
+
+
+class FakePlaywright:
+    def __init__(self, payloads=None):
+        self.browser = FakeBrowser(payloads or {})
+        self.chromium = self
+
+    def connect_over_cdp(self, url):
+        return self.browser
+
+
+def _manager(payloads=None, **kwargs):
+    pw = FakePlaywright(payloads)
+    manager = enrich.BrowserConnectionManager(pw, "http://localhost:9222", **kwargs)
+    manager.connect()
+    return manager, pw.browser.contexts[0]
+
+
+class Limiter:
+    def __init__(self):
+        self.calls = 0
+
+    def acquire(self):
+        self.calls += 1
+
+
+PAYLOAD = {"follower_count": 1234, "following_count": 56, "post_count": 78,
+           "bio": "Honolulu bakery", "is_business": True, "source": "json",
+           "text": "aloha_bakery\n78 posts\n1234 followers\n56 following\nHonolulu bakery"}
+
+
+class TestMakeFetcher:
+    def test_fetches_on_a_pooled_tab(self):
+        manager, context = _manager({"aloha_bakery": PAYLOAD})
+        limiter = Limiter()
+        fetch = enrich.make_fetcher(manager, limiter, prefetch=False)
+        result = fetch("aloha_bakery", "https://www.instagram.com/aloha_bakery/")
+        assert result["page_state"] == "normal"
+        assert result["follower_count"] == 1234
+        assert result["is_business"] is True
+        assert limiter.calls == 1
+        assert manager.operations_count == 1
+        [page] = context.pages
+        assert page.url == "https://www.instagram.com/aloha_bakery/"
+        assert manager.pool.stats()["idle"] == 1
+
+    def test_base_url_sends_fetches_to_mock_server(self):
+        manager, context = _manager({"aloha_bakery": PAYLOAD})
+        fetch = with_base_url(enrich.make_fetcher(manager, None, prefetch=False),
+                              "http://127.0.0.1:8765")
+        result = fetch("aloha_bakery", "https://www.instagram.com/aloha_bakery/")
+        assert result["follower_count"] == 1234
+        assert context.pages[0].url == "http://127.0.0.1:8765/aloha_bakery/"
+
+
+def _url(handle):
+    return f"https://www.instagram.com/{handle}/"
+
+
+LOGIN_WALL = {"text": "Log in to Instagram to see photos and videos."}
+
+
+class TestPrefetch:
+    def _fetch(self, payloads=None, tabs=2):
+        payloads = payloads or {h: PAYLOAD for h in ("a", "b", "c")}
+        manager, context = _manager(payloads, tabs=tabs)
+        limiter = Limiter()
+        return enrich.make_fetcher(manager, limiter), manager, context, limiter
+
+    def test_hinted_profile_served_from_second_tab(self):
+        fetch, manager, context, limiter = self._fetch()
+        fetch.prefetch("b", _url("b"))
+        fetch("a", _url("a"))
+        assert limiter.calls == 2
+        assert fetch("b", _url("b"))["follower_count"] == 1234
+        assert limiter.calls == 2
+        first, second = context.pages
+        assert first.gotos == [_url("a")]
+        assert second.gotos == []
+        assert second.url == _url("b")
+
+    def test_mismatched_hint_is_checked_in_and_fetch_navigates(self):
+        fetch, manager, context, limiter = self._fetch()
+        fetch.prefetch("b", _url("b"))
+        fetch("a", _url("a"))
+        fetch("c", _url("c"))
+        assert limiter.calls == 3
+        assert [url for page in context.pages for url in page.gotos] == [_url("a"), _url("c")]
+        assert manager.pool.stats()["idle"] == 2
+
+    def test_hint_for_current_profile_is_ignored(self):
+        fetch, manager, context, limiter = self._fetch()
+        fetch.prefetch("a", _url("a"))
+        fetch("a", _url("a"))
+        assert limiter.calls == 1
+        assert len(context.pages) == 1
+
+    def test_single_tab_ignores_hints(self):
+        fetch, manager, context, limiter = self._fetch(tabs=1)
+        fetch.prefetch("b", _url("b"))
+        fetch("a", _url("a"))
+        fetch("b", _url("b"))
+        assert limiter.calls == 2
+        [page] = context.pages
+        assert page.gotos == [_url("a"), _url("b")]
+
+    def test_navigation_error_checks_tab_in_unhealthy(self):
+        fetch, manager, context, limiter = self._fetch()
+        context.navigate_error = RuntimeError("Target closed")
+        fetch.prefetch("b", _url("b"))
+        fetch("a", _url("a"))
+        first, second = context.pages
+        assert second.closed
+        assert manager.pool.stats()["recycled"] == 1
+        fetch("b", _url("b"))
+        assert first.gotos == [_url("a"), _url("b")]
+
+    def test_trip_page_drops_hint(self):
+        fetch, manager, context, limiter = self._fetch({"a": LOGIN_WALL, "b": PAYLOAD})
+        fetch.prefetch("b", _url("b"))
+        assert fetch("a", _url("a"))["page_state"] == "login_required"
+        assert limiter.calls == 1
+        assert len(context.pages) == 1
+        fetch("b", _url("b"))
+        assert context.pages[0].gotos == [_url("a"), _url("b")]
+
+
+class TestStorageClearing:
+    def test_clears_storage_every_n_fetches(self):
+        manager, context = _manager(max_operations=1000)
+
+        def cleared():
+            return sum(p.evaluated.count(enrich.CLEAR_STORAGE_JS) for p in context.pages)
+
+        for _ in range(enrich.STORAGE_CLEAR_EVERY * 2):
+            pool, page = manager.checkout()
+            pool.checkin(page)
+            manager.increment_operations()
+        assert cleared() == 1
+        pool, page = manager.checkout()
+        pool.checkin(page)
+        assert cleared() == 2
+
+    def test_clears_once_per_threshold(self):
+        manager, _ = _manager(tabs=2)
+        manager.operations_count = enrich.STORAGE_CLEAR_EVERY
+        _, first = manager.checkout()
+        _, second = manager.checkout()
+        scripts = first.evaluated + second.evaluated
+        assert scripts.count(enrich.CLEAR_STORAGE_JS) == 1
+
+    def test_health_recycle_clears_storage_before_close(self):
+        closed_with = []
+        monitor = enrich.HealthMonitor(lambda page: {"heap_bytes": 10**10, "response_ms": 1},
+                                       sample_every=1, on_recycle=enrich.clear_storage)
+        manager, context = _manager(health_monitor=monitor)
+        pool, page = manager.checkout()
+        page.close = lambda: closed_with.append(list(page.evaluated))
+        pool.checkin(page)
+        pool, replacement = manager.checkout()
+        assert replacement is not page
+        assert closed_with == [[enrich.CLEAR_STORAGE_JS]]
+
+    def test_storage_errors_are_ignored(self):
+        page = FakePage()
+
+        def failing(script, arg=None):
+            raise RuntimeError("SecurityError")
+
+        page.evaluate = failing
+        enrich.clear_storage(page)
+
+
+_NODE_HARNESS = """
+const [script, scripts, handle, markers, dom] = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+const main = dom.main === null ? null : {innerText: dom.main};
+const header = dom.header === null ? null : {
+    innerText: dom.header,
+    querySelector: () => null,
+    closest: (selector) => (selector === 'main' ? main : null),
+};
+globalThis.document = {
+    querySelectorAll: () => scripts.map(textContent => ({textContent})),
+    querySelector: (selector) => (selector === 'header' ? header : null),
+    body: {innerText: dom.body},
+};
+console.log(JSON.stringify(eval(script)([handle, markers])));
+"""
+
+
+def _run_extract_js(scripts, handle, header=None, main=None, body=""):
+    """Run PROFILE_EXTRACT_JS under node against a stub document."""
+    node = shutil.which("node")
+    if node is None:
+        pytest.skip("node not installed")
+    markers = [list(substrings) for _, substrings in enrich.PAGE_STATE_MARKERS]
+    dom = {"header": header, "main": main, "body": body}
+    proc = subprocess.run([node, "-e", _NODE_HARNESS], capture_output=True, text=True, check=True,
+                          input=json.dumps([enrich.PROFILE_EXTRACT_JS, scripts, handle, markers, dom]))
+    return json.loads(proc.stdout)
+
+
+class TestProfileExtractScript:
+    DECOY = ('{"suggested":[{"username":"rival_bakery","biography":"Not us",'
+             '"is_verified":true,"edge_followed_by":{"count":999999}}],'
+             '"user":{"username":"aloha_bakery","biography":"Ours \\u2022 \\"quoted\\"",'
+             '"is_verified":false,"edge_followed_by":{"count":1234}}}')
+
+    def test_reads_the_users_own_object(self):
+        out = _run_extract_js([self.DECOY], "aloha_bakery")
+        assert out["follower_count"] == 1234
+        assert out["bio"] == 'Ours • "quoted"'
+        assert out["is_verified"] is False
+        assert out["source"] == "json"
+
+    def test_undecodable_object_takes_nearest_match(self):
+        text = ('{"username":"rival_bakery","biography":"Not us"}, '
+                '{"username":"aloha_bakery","biography":"Ours","joined":new Date(0)}')
+        assert _run_extract_js([text], "aloha_bakery")["bio"] == "Ours"
+
+    def test_reads_mock_server_markup(self):
+        fields = {"follower_count": 1234, "following_count": 56, "post_count": 78,
+                  "bio": "Honolulu </script> bakery", "website": "https://alohabakery.com",
+                  "is_verified": True, "is_private": False, "is_business": True}
+        html = render_profile_html("aloha_bakery", "aloha_bakery", fields)
+        script = re.search(r'<script type="application/json">(.*?)</script>', html).group(1)
+        out = _run_extract_js([script], "aloha_bakery")
+        assert {k: out[k] for k in fields} == fields
+
+    HEADER = "aloha_bakery\n78 posts\n1,234 followers\n56 following\nHonolulu bakery"
+
+    def test_login_banner_outside_main_is_ignored(self):
+        main = self.HEADER + "\nPosts\nReels"
+        body = main + "\nLog in to see photos and videos from your friends.\nSign up"
+        out = _run_extract_js([], "aloha_bakery", header=self.HEADER, main=main, body=body)
+        assert out["text"] == self.HEADER
+        assert out["is_private"] is False
+        assert enrich.parse_profile_data(out)["page_state"] == "normal"
+
+    def test_markers_inside_main_are_kept(self):
+        main = self.HEADER + "\nThis account is private\nLog in to see their photos"
+        out = _run_extract_js([], "aloha_bakery", header=self.HEADER, main=main, body=main)
+        assert out["is_private"] is True
+        assert enrich.parse_profile_data(out)["page_state"] == "login_required"
+
+    def test_no_json_falls_back_to_body_text(self):
+        out = _run_extract_js([], "aloha_bakery")
+        assert "source" not in out
+        assert out["text"] == ""
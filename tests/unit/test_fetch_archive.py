@@ -0,0 +1,117 @@
+"""Tests for src/fetch_archive.py — recording and replaying fetch sessions."""
+import gzip
+import json
+
+import pytest
+
+from src.batch_orchestrator import run_all
+from src.database import init_db, insert_followers, get_status_counts
+from src.fetch_archive import FetchRecorder, ReplayFetcher, read_archive
+from src.metrics import RunMetrics
+from src.simulator import simulate
+
+PAGE = "aloha_bakery\n78 posts\n1,234 followers\n56 following\nHonolulu bakery\n"
+PAYLOAD = json.dumps({"follower_count": 1234, "following_count": 56, "post_count": 78,
+                      "bio": "Honolulu bakery", "text": PAGE})
+
+
+def _record(path):
+    with FetchRecorder(path) as recorder:
+        recorder.record("aloha_bakery", "https://www.instagram.com/aloha_bakery/",
+                        raw=PAYLOAD, page_state="normal", timings={"fetch": 2.0})
+        recorder.record("gone", "https://www.instagram.com/gone/",
+                        raw="Sorry, this page isn't available.", page_state="not_found",
+                        timings={"fetch": 1.0})
+        recorder.record("quiet", "https://www.instagram.com/quiet/",
+                        data={"follower_count": 5, "is_private": True, "page_state": "normal"})
+    return recorder
+
+
+class TestRecorder:
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "run.jsonl.gz")
+        assert _record(path).recorded == 3
+        entries = list(read_archive(path))
+        assert [e["handle"] for e in entries] == ["aloha_bakery", "gone", "quiet"]
+        assert entries[0]["raw"] == PAYLOAD
+        assert entries[0]["timings"] == {"fetch": 2.0}
+
+    def test_needs_raw_or_data(self, tmp_path):
+        with FetchRecorder(str(tmp_path / "a.gz")) as recorder:
+            with pytest.raises(ValueError):
+                recorder.record("a", "u")
+
+    def test_wrap_records_results_not_misses(self, tmp_path):
+        path = str(tmp_path / "run.jsonl.gz")
+        with FetchRecorder(path) as recorder:
+            fetch = recorder.wrap(lambda h, u: None if h == "miss" else PAGE)
+            assert fetch("aloha_bakery", "u1") == PAGE
+            assert fetch("miss", "u2") is None
+        assert [e["handle"] for e in read_archive(path)] == ["aloha_bakery"]
+
+    def test_truncated_archive_keeps_complete_entries(self, tmp_path):
+        path = str(tmp_path / "run.jsonl.gz")
+        _record(path)
+        with open(path, "rb") as f:
+            data = f.read()
+        with open(path, "wb") as f:
+            f.write(data[:-12])
+        assert len(list(read_archive(path))) >= 1
+
+    def test_rejects_other_files(self, tmp_path):
+        path = str(tmp_path / "other.gz")
+        with gzip.open(path, "wt") as f:
+            f.write('{"hello": 1}\n')
+        with pytest.raises(ValueError):
+            list(read_archive(path))
+
+
+class TestReplayFetcher:
+    def test_replays_parsed_results(self, tmp_path):
+        path = str(tmp_path / "run.jsonl.gz")
+        _record(path)
+        metrics = RunMetrics()
+        replay = ReplayFetcher(path, metrics=metrics)
+        assert replay.handles == ["aloha_bakery", "gone", "quiet"]
+        assert replay("aloha_bakery", "x")["follower_count"] == 1234
+        assert replay("gone", "x")["page_state"] == "not_found"
+        assert replay("quiet", "x")["is_private"] is True
+        assert replay("unknown", "x") is None
+        assert replay.outcomes == {"normal": 1, "not_found": 1, "private": 1}
+        assert metrics.summary()["parse"]["count"] == 2
+
+    def test_repeated_handle_replays_in_order(self, tmp_path):
+        path = str(tmp_path / "run.jsonl.gz")
+        with FetchRecorder(path) as recorder:
+            recorder.record("a", "u", raw="Please wait a few minutes before you try again.")
+            recorder.record("a", "u", raw=PAYLOAD)
+        replay = ReplayFetcher(path)
+        states = [replay("a", "u")["page_state"] for _ in range(3)]
+        assert states == ["rate_limited", "normal", "normal"]
+
+    def test_recorded_pace(self, tmp_path):
+        path = str(tmp_path / "run.jsonl.gz")
+        _record(path)
+        slept = []
+        replay = ReplayFetcher(path, time_scale=0.5, sleep=slept.append)
+        replay("aloha_bakery", "x")
+        replay("gone", "x")
+        assert slept == [1.0, 0.5]
+
+    def test_run_all_from_archive(self, tmp_path):
+        path = str(tmp_path / "run.jsonl.gz")
+        _record(path)
+        db = str(tmp_path / "test.db")
+        init_db(db)
+        insert_followers(db, [{"handle": h, "display_name": h, "profile_url": f"u/{h}"}
+                              for h in ("aloha_bakery", "quiet")])
+        run_all(db, ReplayFetcher(path))
+        assert get_status_counts(db) == {"completed": 1, "private": 1}
+
+    def test_simulate_with_replay(self, tmp_path):
+        path = str(tmp_path / "run.jsonl.gz")
+        _record(path)
+        replay = ReplayFetcher(path)
+        report = simulate(fetcher=replay, handles=replay.handles)
+        assert report["profiles"] == 3
+        assert report["status_counts"] == {"completed": 1, "private": 1, "error": 1}
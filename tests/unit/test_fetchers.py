@@ -0,0 +1,170 @@
+"""Tests for src/fetchers.py — fetcher registry and fallback chains."""
+import threading
+import time
+
+import pytest
+
+from src.batch_orchestrator import run_all
+from src.database import init_db, insert_followers, get_status_counts
+from src.fetchers import FetcherRegistry, rebase_url, with_base_url
+
+
+def _profile(handle, url):
+    return {"follower_count": 10, "bio": f"Bio for {handle}", "is_private": False}
+
+
+class TestFetcherRegistry:
+    def test_names_sorted_by_cost(self):
+        registry = FetcherRegistry()
+        registry.register("browser", _profile, cost=10)
+        registry.register("cached", _profile, cost=0)
+        registry.register("replay", _profile, cost=1)
+        assert registry.names() == ["cached", "replay", "browser"]
+
+    def test_unknown_backend(self):
+        registry = FetcherRegistry()
+        with pytest.raises(KeyError, match="Unknown fetcher backend"):
+            registry.get("browser")
+
+    def test_empty_chain_rejected(self):
+        with pytest.raises(ValueError):
+            FetcherRegistry().chain()
+
+    def test_invalid_concurrency(self):
+        with pytest.raises(ValueError):
+            FetcherRegistry().register("browser", _profile, concurrency=0)
+
+
+class TestFallbackFetcher:
+    def test_cheapest_backend_answers_first(self):
+        calls = []
+        registry = FetcherRegistry()
+        registry.register("browser", lambda h, u: calls.append("browser") or _profile(h, u),
+                          cost=10)
+        registry.register("cached", lambda h, u: calls.append("cached") or "page text",
+                          cost=0)
+        assert registry.chain()("someone", "url") == "page text"
+        assert calls == ["cached"]
+
+    def test_miss_falls_back(self):
+        registry = FetcherRegistry()
+        registry.register("cached", lambda h, u: None, cost=0)
+        registry.register("browser", _profile, cost=10)
+        assert registry.chain()("someone", "url")["bio"] == "Bio for someone"
+        stats = registry.stats()
+        assert stats["cached"]["misses"] == 1
+        assert stats["browser"]["served"] == 1
+
+    def test_error_in_cheap_backend_falls_back(self):
+        def broken(handle, url):
+            raise OSError("corrupt cache")
+
+        registry = FetcherRegistry()
+        registry.register("cached", broken, cost=0)
+        registry.register("browser", _profile, cost=10)
+        assert registry.chain()("someone", "url") is not None
+        assert registry.stats()["cached"]["errors"] == 1
+
+    def test_error_in_last_backend_propagates(self):
+        def broken(handle, url):
+            raise RuntimeError("browser gone")
+
+        registry = FetcherRegistry()
+        registry.register("browser", broken)
+        with pytest.raises(RuntimeError, match="browser gone"):
+            registry.chain()("someone", "url")
+
+    def test_all_miss_raises_lookup_error(self):
+        registry = FetcherRegistry()
+        registry.register("cached", lambda h, u: None)
+        with pytest.raises(LookupError):
+            registry.chain()("someone", "url")
+
+    def test_chain_subset(self):
+        registry = FetcherRegistry()
+        registry.register("cached", lambda h, u: None, cost=0)
+        registry.register("browser", _profile, cost=10)
+        assert registry.chain("browser").describe() == "browser"
+
+    def test_concurrency_limit(self):
+        active = [0]
+        peak = [0]
+        lock = threading.Lock()
+
+        def slow(handle, url):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            return _profile(handle, url)
+
+        registry = FetcherRegistry()
+        registry.register("browser", slow, concurrency=2)
+        chain = registry.chain()
+        threads = [threading.Thread(target=chain, args=(f"u{i}", "url")) for i in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert peak[0] == 2
+
+    def test_works_as_orchestrator_fetcher(self, tmp_path):
+        db = str(tmp_path / "test.db")
+        init_db(db)
+        insert_followers(db, [
+            {"handle": f"user_{i}", "display_name": f"User {i}",
+             "profile_url": f"https://instagram.com/user_{i}/"}
+            for i in range(4)
+        ])
+        registry = FetcherRegistry()
+        registry.register("cached", lambda h, u: _profile(h, u) if h == "user_0" else None,
+                          cost=0)
+        registry.register("browser", _profile, cost=10)
+        result = run_all(db, registry.chain())
+        assert result["total_completed"] == 4
+        assert get_status_counts(db) == {"completed": 4}
+        assert registry.stats()["browser"]["served"] == 3
+
+
+class TestBaseUrl:
+    def test_rebase_url(self):
+        assert (rebase_url("https://www.instagram.com/a_b/?hl=en", "http://127.0.0.1:8765")
+                == "http://127.0.0.1:8765/a_b/?hl=en")
+        assert rebase_url("https://instagram.com/x/", "http://mock/ig/") == "http://mock/ig/x/"
+
+    def test_with_base_url(self):
+        seen = []
+        fetch = with_base_url(lambda h, u: seen.append(u) or {"ok": True}, "http://localhost:9")
+        assert fetch("a", "https://www.instagram.com/a/") == {"ok": True}
+        assert seen == ["http://localhost:9/a/"]
+
+
+class TestPrefetchHints:
+    def _prefetching(self, hints, name):
+        def fetch(handle, url):
+            return {"follower_count": 1}
+        fetch.prefetch = lambda handle, url: hints.append((name, handle, url))
+        return fetch
+
+    def test_chain_forwards_hint_to_cheapest_backend(self):
+        hints = []
+        registry = FetcherRegistry()
+        registry.register("browser", self._prefetching(hints, "browser"), cost=10)
+        registry.register("http", self._prefetching(hints, "http"), cost=1)
+        registry.chain().prefetch("a", "https://www.instagram.com/a/")
+        assert hints == [("http", "a", "https://www.instagram.com/a/")]
+
+    def test_no_hint_when_cheapest_cannot_prefetch(self):
+        hints = []
+        registry = FetcherRegistry()
+        registry.register("cached", lambda h, u: None, cost=0)
+        registry.register("browser", self._prefetching(hints, "browser"), cost=10)
+        assert not hasattr(registry.chain(), "prefetch")
+
+    def test_base_url_rewrites_hints(self):
+        hints = []
+        fetch = with_base_url(self._prefetching(hints, "browser"), "http://127.0.0.1:8765")
+        fetch.prefetch("a", "https://www.instagram.com/a/")
+        assert hints == [("browser", "a", "http://127.0.0.1:8765/a/")]
@@ -0,0 +1,197 @@
+"""Tests for src/http_fetcher.py — pooled HTTP fetch backend (local stub server)."""
+import gzip
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.fetchers import FetcherRegistry
+from src.http_fetcher import HttpFetcher, extract_profile_payload, html_to_text
+
+PUBLIC_HTML = """<!DOCTYPE html><html><head>
+<meta property="og:description" content="1,234 Followers, 56 Following, 78 Posts - See Instagram photos and videos from Aloha Bakery (@aloha_bakery)">
+<script type="application/json">{"user":{"biography":"Honolulu bakery \\u2022 est. 1999",
+"external_url":"https://alohabakery.com","is_verified":false,"is_private":false,
+"is_business_account":true,"edge_followed_by":{"count":1234},"edge_follow":{"count":56},
+"edge_owner_to_timeline_media":{"count":78},"username":"aloha_bakery"}}</script>
+</head><body><div>Log in to see photos and videos from friends.</div></body></html>"""
+
+OG_ONLY_HTML = """<html><head>
+<meta property="og:description" content="2.5K Followers, 10 Following, 3 Posts - See Instagram photos">
+</head><body></body></html>"""
+
+# A suggested account's object precedes the profile's own, whose fields
+# follow its username.
+DECOY_JSON = ('{"suggested":[{"username":"rival_bakery","biography":"Not us",'
+              '"is_verified":true,"edge_followed_by":{"count":999999}}],'
+              '"user":{"username":"aloha_bakery","biography":"Ours",'
+              '"is_verified":false,"edge_followed_by":{"count":1234}}}')
+DECOY_HTML = f'<html><head><script type="application/json">{DECOY_JSON}</script></head></html>'
+
+LOGIN_HTML = "<html><body><h2>Log in to see photos and videos from friends.</h2></body></html>"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, self.client_address[1], self.headers.get("Cookie")))
+        if self.path == "/aloha_bakery/":
+            body = gzip.compress(PUBLIC_HTML.encode())
+            self._send(200, body, {"Content-Type": "text/html; charset=utf-8",
+                                   "Content-Encoding": "gzip",
+                                   "Set-Cookie": "csrftoken=abc; Path=/"})
+        elif self.path == "/og_only/":
+            self._send(200, OG_ONLY_HTML.encode(), {"Content-Type": "text/html"})
+        elif self.path == "/moved/":
+            self._send(302, headers={"Location": "/og_only/"})
+        elif self.path == "/walled/":
+            self._send(302, headers={"Location": "/accounts/login/?next=/walled/"})
+        elif self.path == "/soft_wall/":
+            self._send(200, LOGIN_HTML.encode(), {"Content-Type": "text/html"})
+        elif self.path == "/slow_down/":
+            self._send(429)
+        elif self.path == "/hang/":
+            time.sleep(0.5)
+            self._send(200, OG_ONLY_HTML.encode(), {"Content-Type": "text/html"})
+        elif self.path == "/broken/":
+            self._send(500)
+        else:
+            self._send(404, b"<html><body>Not found</body></html>")
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.01},
+                              daemon=True)
+    thread.start()
+    httpd.base = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class TestExtractProfilePayload:
+    def test_embedded_json(self):
+        payload = extract_profile_payload(PUBLIC_HTML, "aloha_bakery")
+        assert payload["follower_count"] == 1234
+        assert payload["bio"] == "Honolulu bakery • est. 1999"
+        assert payload["is_business"] is True
+        assert "Log in" not in payload["text"]
+
+    def test_ignores_other_users_fields(self):
+        payload = extract_profile_payload(DECOY_HTML, "aloha_bakery")
+        assert payload["follower_count"] == 1234
+        assert payload["bio"] == "Ours"
+        assert payload["is_verified"] is False
+
+    def test_object_in_script_assignment(self):
+        html = f"<html><head><script>window._sharedData = {DECOY_JSON};</script></head></html>"
+        payload = extract_profile_payload(html, "aloha_bakery")
+        assert payload["follower_count"] == 1234
+        assert payload["bio"] == "Ours"
+
+    def test_undecodable_object_takes_nearest_match(self):
+        html = ('<script>{"username":"rival_bakery","biography":"Not us"}, '
+                '{"username":"aloha_bakery","biography":"Ours","joined":new Date(0)}</script>')
+        assert extract_profile_payload(html, "aloha_bakery")["bio"] == "Ours"
+
+    def test_og_description_counts(self):
+        payload = extract_profile_payload(OG_ONLY_HTML, "someone")
+        assert payload["follower_count"] == "2.5K"
+        assert payload["post_count"] == "3"
+
+    def test_html_to_text_skips_scripts(self):
+        assert html_to_text("<div>Hi</div><script>var x;</script><p>there</p>") == "Hi\nthere"
+
+
+class TestHttpFetcher:
+    def test_public_profile(self, server):
+        fetch = HttpFetcher()
+        result = fetch("aloha_bakery", server.base + "/aloha_bakery/")
+        assert result["page_state"] == "normal"
+        assert result["follower_count"] == 1234
+        assert result["following_count"] == 56
+        assert result["website"] == "https://alohabakery.com"
+
+    def test_reuses_connection_and_cookies(self, server):
+        fetch = HttpFetcher()
+        fetch("aloha_bakery", server.base + "/aloha_bakery/")
+        fetch("og_only", server.base + "/og_only/")
+        fetch("og_only", server.base + "/og_only/")
+        ports = {port for _, port, _ in server.requests}
+        assert len(ports) == 1
+        assert fetch.pool.opened == 1
+        assert server.requests[1][2] == "csrftoken=abc"
+
+    def test_follows_redirects(self, server):
+        result = HttpFetcher()("moved", server.base + "/moved/")
+        assert result["follower_count"] == 2500
+
+    def test_login_redirect_is_a_miss(self, server):
+        fetch = HttpFetcher()
+        assert fetch("walled", server.base + "/walled/") is None
+        assert fetch.login_walls == 1
+
+    def test_login_page_is_a_miss(self, server):
+        assert HttpFetcher()("soft_wall", server.base + "/soft_wall/") is None
+
+    def test_not_found(self, server):
+        result = HttpFetcher()("gone", server.base + "/gone/")
+        assert result["page_state"] == "not_found"
+
+    def test_rate_limited(self, server):
+        result = HttpFetcher()("slow_down", server.base + "/slow_down/")
+        assert result["page_state"] == "rate_limited"
+
+    def test_server_error_raises(self, server):
+        with pytest.raises(RuntimeError, match="HTTP 500"):
+            HttpFetcher()("broken", server.base + "/broken/")
+
+    def test_timeout_discards_connection(self, server):
+        fetch = HttpFetcher(timeout=0.1)
+        fetch("og_only", server.base + "/og_only/")
+        [conn] = fetch.pool._idle[("http", server.base.split("//")[1])]
+        with pytest.raises(TimeoutError):
+            fetch("hang", server.base + "/hang/")
+        assert conn.sock is None
+        assert not any(fetch.pool._idle.values())
+        assert fetch("og_only", server.base + "/og_only/")["follower_count"] == 2500
+        assert fetch.pool.opened == 2
+
+    def test_takes_rate_limit_token_per_request(self, server):
+        class Limiter:
+            calls = 0
+
+            def acquire(self):
+                Limiter.calls += 1
+
+        HttpFetcher(rate_limiter=Limiter())("moved", server.base + "/moved/")
+        assert Limiter.calls == 2
+
+    def test_falls_back_to_browser_on_login_wall(self, server):
+        browser_calls = []
+        registry = FetcherRegistry()
+        registry.register("http", HttpFetcher(), concurrency=4, cost=1)
+        registry.register("browser",
+                          lambda h, u: browser_calls.append(h) or {"follower_count": 1},
+                          cost=10)
+        chain = registry.chain()
+        assert chain("aloha_bakery", server.base + "/aloha_bakery/")["follower_count"] == 1234
+        assert chain("walled", server.base + "/walled/") == {"follower_count": 1}
+        assert browser_calls == ["walled"]
@@ -0,0 +1,81 @@
+"""Tests for src/metrics.py — per-stage timing histograms."""
+import json
+
+from src.metrics import Histogram, RunMetrics, timed, format_metrics_summary
+
+
+class TestHistogram:
+    def test_counts_into_buckets(self):
+        hist = Histogram(buckets=(0.1, 1.0))
+        hist.observe(0.05)
+        hist.observe(0.5)
+        hist.observe(0.7)
+        hist.observe(5.0)
+        assert hist.counts == [1, 2, 1]
+        assert hist.count == 4
+
+    def test_boundary_goes_to_lower_bucket(self):
+        hist = Histogram(buckets=(0.1, 1.0))
+        hist.observe(0.1)
+        assert hist.counts == [1, 0, 0]
+
+    def test_summary_stats(self):
+        hist = Histogram(buckets=(0.1, 1.0))
+        for v in (0.05, 0.5, 0.5, 0.5):
+            hist.observe(v)
+        s = hist.summary()
+        assert s["count"] == 4
+        assert s["min"] == 0.05
+        assert s["max"] == 0.5
+        assert s["mean"] == 0.3875
+        assert s["p50"] == 1.0
+        assert s["buckets"] == {"<=0.1": 1, "<=1.0": 3, ">1.0": 0}
+
+    def test_overflow_percentile_uses_max(self):
+        hist = Histogram(buckets=(0.1,))
+        hist.observe(7.0)
+        assert hist.percentile(95) == 7.0
+
+    def test_empty(self):
+        hist = Histogram()
+        assert hist.percentile(50) is None
+        assert hist.summary()["mean"] is None
+
+
+class TestRunMetrics:
+    def test_time_context_records_stage(self):
+        ticks = iter([1.0, 1.25])
+        metrics = RunMetrics(clock=lambda: next(ticks))
+        with metrics.time("fetch"):
+            pass
+        s = metrics.summary()
+        assert s["fetch"]["count"] == 1
+        assert s["fetch"]["total"] == 0.25
+
+    def test_summary_orders_pipeline_stages(self):
+        metrics = RunMetrics()
+        for stage in ("write", "custom", "claim", "fetch"):
+            metrics.observe(stage, 0.01)
+        assert list(metrics.summary()) == ["claim", "fetch", "write", "custom"]
+
+    def test_jsonl_file(self, tmp_path):
+        path = tmp_path / "metrics.jsonl"
+        metrics = RunMetrics(path=str(path))
+        metrics.observe("fetch", 1.5, handle="someone")
+        metrics.close()
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert lines[0]["stage"] == "fetch"
+        assert lines[0]["seconds"] == 1.5
+        assert lines[0]["handle"] == "someone"
+        assert lines[-1]["summary"]["fetch"]["count"] == 1
+
+    def test_timed_without_metrics_is_noop(self):
+        with timed(None, "fetch"):
+            pass
+
+    def test_format_summary(self):
+        metrics = RunMetrics()
+        metrics.observe("fetch", 0.5)
+        text = format_metrics_summary(metrics.summary())
+        assert "fetch" in text
+        assert "500.0" in text
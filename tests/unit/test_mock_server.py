@@ -0,0 +1,91 @@
+"""Tests for src/mock_server.py — local synthetic Instagram server."""
+import os
+import threading
+
+import pytest
+
+from src.batch_orchestrator import run_all
+from src.database import init_db, insert_followers, get_status_counts
+from src.fetchers import FetcherRegistry, with_base_url
+from src.http_fetcher import HttpFetcher, html_to_text
+from src.mock_server import MockInstagramServer, load_profiles, render_profile_html
+from src.profile_parser import parse_profile_page
+from src.simulator import SyntheticFetcher
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "..", "fixtures", "mock_profiles.json")
+
+
+@pytest.fixture
+def profiles():
+    profiles = load_profiles(FIXTURES)
+    profiles["gone_user"] = {"page_state": "not_found"}
+    profiles["busy_user"] = {"page_state": "rate_limited"}
+    profiles["walled_user"] = {"page_state": "login_required"}
+    profiles["quiet_user"] = {"follower_count": 90, "following_count": 10, "post_count": 1,
+                              "bio": "", "is_private": True}
+    return profiles
+
+
+@pytest.fixture
+def server(profiles):
+    with MockInstagramServer(profiles, SyntheticFetcher(rates={"private": 0}, time_scale=0,
+                                                        seed=1)) as server:
+        yield server
+
+
+class TestRendering:
+    def test_header_text_parses_like_a_real_page(self):
+        text = "someone\nFollow\n12 posts\n1,234 followers\n56 following\nBaker in Hilo\n"
+        html = render_profile_html("someone", text)
+        assert parse_profile_page(html_to_text(html))["follower_count"] == 1234
+
+
+class TestMockServer:
+    def test_fixture_profile(self, server, profiles):
+        result = HttpFetcher()("aloha_coffee_co", server.base_url + "/aloha_coffee_co/")
+        expected = profiles["aloha_coffee_co"]
+        for field in ("follower_count", "following_count", "post_count", "bio", "website",
+                      "is_business"):
+            assert result[field] == expected[field]
+
+    def test_generated_profile(self, server):
+        result = HttpFetcher()("anyone_else", server.base_url + "/anyone_else/")
+        assert result["page_state"] == "normal"
+        assert isinstance(result["follower_count"], int)
+
+    def test_variants(self, server):
+        fetch = HttpFetcher()
+        assert fetch("gone_user", server.base_url + "/gone_user/")["page_state"] == "not_found"
+        assert fetch("busy_user", server.base_url + "/busy_user/")["page_state"] == "rate_limited"
+        assert fetch("walled_user", server.base_url + "/walled_user/") is None
+        assert fetch.login_walls == 1
+        quiet = fetch("quiet_user", server.base_url + "/quiet_user/")
+        assert quiet["is_private"] is True
+        assert server.stats()["outcomes"] == {"not_found": 1, "rate_limited": 1,
+                                              "login_required": 1, "private": 1}
+
+    def test_latency_is_served_concurrently(self, profiles):
+        fetcher = SyntheticFetcher(latency="fixed", latency_mean=0.2, rates={"private": 0})
+        with MockInstagramServer(profiles, fetcher) as server:
+            threads = [threading.Thread(target=HttpFetcher(), args=(h, f"{server.base_url}/{h}/"))
+                       for h in ("a1", "a2", "a3", "a4")]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            stats = server.stats()
+        assert stats["requests"] == 4
+        assert stats["peak_in_flight"] >= 2
+
+    def test_end_to_end_run(self, server, tmp_path):
+        db = str(tmp_path / "test.db")
+        init_db(db)
+        handles = ["aloha_coffee_co", "jane_travels", "quiet_user", "gone_user", "new_user"]
+        insert_followers(db, [{"handle": h, "display_name": h,
+                               "profile_url": f"https://www.instagram.com/{h}/"}
+                              for h in handles])
+        registry = FetcherRegistry()
+        registry.register("http", HttpFetcher(), concurrency=4, cost=1)
+        result = run_all(db, with_base_url(registry.chain(), server.base_url))
+        assert result["total_completed"] == 4
+        assert get_status_counts(db) == {"completed": 3, "private": 1, "error": 1}
@@ -0,0 +1,88 @@
+"""Tests for src/pacing.py — AIMD pacing controller."""
+import pytest
+
+from src.pacing import AimdPacer
+
+
+class RecordingLimiter:
+    def __init__(self):
+        self.rates = []
+
+    def set_rate(self, rate):
+        self.rates.append(rate)
+
+
+class TestAimdPacer:
+    def test_applies_initial_rate(self):
+        limiter = RecordingLimiter()
+        AimdPacer(limiter, initial_rate=0.3)
+        assert limiter.rates == [0.3]
+
+    def test_additive_increase_on_normal(self):
+        pacer = AimdPacer(initial_rate=0.2, increase=0.05)
+        pacer.record("normal")
+        pacer.record("normal")
+        assert pacer.rate == pytest.approx(0.3)
+        assert pacer.last_action == "increase"
+
+    def test_increase_capped_at_max(self):
+        pacer = AimdPacer(initial_rate=0.9, max_rate=1.0, increase=0.5)
+        pacer.record("normal")
+        assert pacer.rate == 1.0
+
+    def test_multiplicative_decrease_on_rate_limited(self):
+        pacer = AimdPacer(initial_rate=0.8, decrease_factor=0.5)
+        pacer.record("rate_limited")
+        assert pacer.rate == pytest.approx(0.4)
+        assert pacer.backoffs == 1
+        assert pacer.last_action == "backoff"
+
+    def test_decrease_floored_at_min(self):
+        pacer = AimdPacer(initial_rate=0.05, min_rate=0.04, decrease_factor=0.5)
+        pacer.record("rate_limited")
+        assert pacer.rate == 0.04
+
+    def test_slow_page_trims_rate(self):
+        pacer = AimdPacer(initial_rate=0.5, latency_target=5.0, latency_factor=0.9)
+        pacer.record("normal", latency=8.0)
+        assert pacer.rate == pytest.approx(0.45)
+        assert pacer.last_action == "slow"
+
+    def test_fast_page_still_increases(self):
+        pacer = AimdPacer(initial_rate=0.5, increase=0.1, latency_target=5.0)
+        pacer.record("normal", latency=1.0)
+        assert pacer.rate == pytest.approx(0.6)
+
+    def test_dead_profiles_count_as_served(self):
+        pacer = AimdPacer(initial_rate=0.5, increase=0.1)
+        pacer.record("not_found")
+        pacer.record("suspended")
+        assert pacer.rate == pytest.approx(0.7)
+
+    def test_login_required_holds_rate(self):
+        pacer = AimdPacer(initial_rate=0.5)
+        pacer.record("login_required")
+        assert pacer.rate == 0.5
+        assert pacer.last_action == "hold"
+
+    def test_pushes_rate_to_limiter(self):
+        limiter = RecordingLimiter()
+        pacer = AimdPacer(limiter, initial_rate=0.4, decrease_factor=0.5)
+        pacer.record("rate_limited")
+        assert limiter.rates[-1] == pytest.approx(0.2)
+
+    def test_state_round_trip(self):
+        pacer = AimdPacer(initial_rate=0.4)
+        pacer.record("rate_limited")
+        restored = AimdPacer(initial_rate=0.9)
+        restored.restore(pacer.state())
+        assert restored.rate == pytest.approx(pacer.rate)
+        assert restored.backoffs == 1
+
+    def test_describe(self):
+        pacer = AimdPacer(initial_rate=0.25)
+        assert pacer.describe() == "pace 0.25/s (start)"
+
+    def test_rejects_bad_factor(self):
+        with pytest.raises(ValueError):
+            AimdPacer(decrease_factor=1.5)
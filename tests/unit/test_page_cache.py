@@ -0,0 +1,77 @@
+"""Tests for src/page_cache.py — compressed raw page cache."""
+import datetime
+import os
+
+from src.page_cache import PageCache
+
+PAGE = "someone\n12 posts\n1.2K followers\n30 following\nHonolulu dog trainer\n"
+
+
+class TestPageCache:
+    def test_put_and_get(self, tmp_path):
+        cache = PageCache(str(tmp_path))
+        cache.put("someone", PAGE, fetched_at="2026-01-01T00:00:00")
+        assert cache.get("someone") == ("2026-01-01T00:00:00", PAGE)
+        assert cache.get("nobody") is None
+
+    def test_stored_compressed_by_digest(self, tmp_path):
+        cache = PageCache(str(tmp_path))
+        digest = cache.put("someone", PAGE * 50)
+        path = os.path.join(str(tmp_path), "objects", digest[:2], digest + ".z")
+        assert os.path.getsize(path) < len(PAGE * 50) / 5
+
+    def test_identical_pages_share_one_object(self, tmp_path):
+        cache = PageCache(str(tmp_path))
+        cache.put("a", PAGE, fetched_at="2026-01-01")
+        cache.put("a", PAGE, fetched_at="2026-01-02")
+        cache.put("b", PAGE)
+        stats = cache.stats()
+        assert stats["pages"] == 3
+        assert stats["handles"] == 2
+        assert stats["objects"] == 1
+
+    def test_get_returns_newest(self, tmp_path):
+        cache = PageCache(str(tmp_path))
+        cache.put("a", "old", fetched_at="2026-01-01")
+        cache.put("a", "new", fetched_at="2026-02-01")
+        assert cache.get("a")[1] == "new"
+
+    def test_max_age(self, tmp_path):
+        cache = PageCache(str(tmp_path))
+        old = (datetime.datetime.now() - datetime.timedelta(hours=2)).isoformat()
+        cache.put("a", PAGE, fetched_at=old)
+        assert cache.get("a", max_age_seconds=3600) is None
+        assert cache.get("a", max_age_seconds=3 * 3600) is not None
+
+    def test_latest_yields_each_handle_once(self, tmp_path):
+        cache = PageCache(str(tmp_path))
+        cache.put("b", "b1", fetched_at="2026-01-01")
+        cache.put("a", "a1", fetched_at="2026-01-01")
+        cache.put("a", "a2", fetched_at="2026-01-02")
+        assert [(h, t) for h, _, t in cache.latest()] == [("a", "a2"), ("b", "b1")]
+        assert [h for h, _, _ in cache.latest(["b"])] == ["b"]
+
+    def test_evicts_oldest_over_budget(self, tmp_path):
+        import random
+        rng = random.Random(1)
+        cache = PageCache(str(tmp_path), max_bytes=3000)
+        for i in range(5):
+            text = "".join(rng.choice("abcdefghij") for _ in range(2000))
+            cache.put(f"user_{i}", text, fetched_at=f"2026-01-0{i + 1}")
+        stats = cache.stats()
+        assert stats["bytes"] <= 3000
+        assert cache.get("user_4") is not None
+        assert cache.get("user_0") is None
+        remaining = sum(len(files) for _, _, files in os.walk(os.path.join(str(tmp_path), "objects")))
+        assert remaining == stats["objects"]
+
+    def test_fetcher_backend(self, tmp_path):
+        cache = PageCache(str(tmp_path))
+        cache.put("a", PAGE)
+        fetch = cache.fetcher()
+        assert fetch("a", "https://instagram.com/a/") == PAGE
+        assert fetch("b", "https://instagram.com/b/") is None
+
+    def test_reopen_keeps_index(self, tmp_path):
+        PageCache(str(tmp_path)).put("a", PAGE)
+        assert PageCache(str(tmp_path)).get("a")[1] == PAGE
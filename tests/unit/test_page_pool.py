@@ -0,0 +1,145 @@
+"""Tests for src/page_pool.py — checkout/checkin pool with per-page recycling."""
+import threading
+import time
+
+import pytest
+
+from src.page_pool import PagePool
+
+
+class FakePage:
+    def __init__(self, n):
+        self.n = n
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def _pool(**kwargs):
+    made = []
+
+    def factory():
+        page = FakePage(len(made))
+        made.append(page)
+        return page
+
+    kwargs.setdefault("dispose", lambda page: page.close())
+    return PagePool(factory, **kwargs), made
+
+
+class TestPagePool:
+    def test_creates_lazily_and_reuses(self):
+        pool, made = _pool(size=3)
+        page = pool.checkout()
+        pool.checkin(page)
+        assert pool.checkout() is page
+        assert len(made) == 1
+
+    def test_up_to_size_pages_at_once(self):
+        pool, made = _pool(size=2)
+        a = pool.checkout()
+        b = pool.checkout()
+        assert a is not b
+        with pytest.raises(TimeoutError):
+            pool.checkout(timeout=0.01)
+
+    def test_checkout_waits_for_checkin(self):
+        pool, _ = _pool(size=1)
+        page = pool.checkout()
+        threading.Timer(0.02, pool.checkin, args=(page,)).start()
+        assert pool.checkout(timeout=1) is page
+
+    def test_recycles_after_max_uses(self):
+        pool, made = _pool(size=1, max_uses=2)
+        for _ in range(2):
+            page = pool.checkout()
+            pool.checkin(page)
+        assert made[0].closed
+        assert pool.checkout() is made[1]
+        assert pool.stats()["recycled"] == 1
+
+    def test_unhealthy_checkin_replaces_only_that_page(self):
+        pool, made = _pool(size=2)
+        a = pool.checkout()
+        b = pool.checkout()
+        pool.checkin(a, healthy=False)
+        pool.checkin(b)
+        assert a.closed and not b.closed
+        assert pool.stats()["open"] == 1
+
+    def test_health_check_on_checkout(self):
+        pool, made = _pool(size=1, health_check=lambda page: not page.closed)
+        page = pool.checkout()
+        pool.checkin(page)
+        page.closed = True  # e.g. tab crashed while idle
+        fresh = pool.checkout()
+        assert fresh is made[1]
+
+    def test_health_check_error_counts_as_unhealthy(self):
+        def check(page):
+            raise RuntimeError("target closed")
+
+        pool, made = _pool(size=1, health_check=check)
+        pool.checkin(pool.checkout())
+        assert pool.checkout() is made[1]
+
+    def test_context_manager_marks_failed_page(self):
+        pool, made = _pool(size=1)
+        with pytest.raises(ValueError):
+            with pool.page() as page:
+                raise ValueError("navigation failed")
+        assert made[0].closed
+        with pool.page() as page:
+            assert page is made[1]
+
+    def test_factory_error_frees_slot(self):
+        calls = [0]
+
+        def factory():
+            calls[0] += 1
+            if calls[0] == 1:
+                raise RuntimeError("cannot open tab")
+            return FakePage(calls[0])
+
+        pool = PagePool(factory, size=1)
+        with pytest.raises(RuntimeError):
+            pool.checkout()
+        assert pool.checkout(timeout=0.1).n == 2
+
+    def test_close_disposes_idle_and_late_checkins(self):
+        pool, made = _pool(size=2)
+        a = pool.checkout()
+        b = pool.checkout()
+        pool.checkin(a)
+        pool.close()
+        assert a.closed
+        pool.checkin(b)
+        assert b.closed
+        with pytest.raises(RuntimeError):
+            pool.checkout()
+
+    def test_concurrent_workers_never_share_a_page(self):
+        pool, _ = _pool(size=3)
+        in_use = set()
+        lock = threading.Lock()
+        clashes = []
+
+        def worker():
+            for _ in range(20):
+                with pool.page() as page:
+                    with lock:
+                        if id(page) in in_use:
+                            clashes.append(page)
+                        in_use.add(id(page))
+                    time.sleep(0.001)
+                    with lock:
+                        in_use.discard(id(page))
+
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert clashes == []
+        assert pool.stats()["created"] <= 3
@@ -1,8 +1,10 @@
-"""Tests for src/pipeline.py — phase 1 and phase 2 runners."""
+"""Tests for src/pipeline.py — phase 1, phase 2 and re-parse runners."""
 import os
 import pytest
-from src.pipeline import run_phase1, run_phase2
-from src.database import init_db, get_status_counts, insert_followers
+from src.pipeline import run_phase1, run_phase2, reparse_pages, run_reparse
+from src.database import init_db, get_status_counts, insert_followers, _connect
+from src.fetch_archive import FetchRecorder, latest_pages
+from src.page_cache import PageCache
 
 
 FIXTURES = os.path.join(os.path.dirname(__file__), "..", "fixtures")
@@ -75,3 +77,103 @@ class TestRunPhase2:
         assert "total_errors" in result
         assert "stopped" in result
         assert "reason" in result
+
+
+# ── Re-parse from page cache ──────────────────────────────────────
+class TestRunReparse:
+    def _setup(self, tmp_path):
+        db = str(tmp_path / "test.db")
+        init_db(db)
+        insert_followers(db, [
+            {"handle": h, "display_name": h, "profile_url": f"https://instagram.com/{h}/"}
+            for h in ("alpha", "beta", "gamma")
+        ])
+        return db, PageCache(str(tmp_path / "cache"))
+
+    def test_updates_from_cached_text(self, tmp_path):
+        db, cache = self._setup(tmp_path)
+        cache.put("alpha", "5 posts 2.5K followers 10 following\nHonolulu bakery\n",
+                  fetched_at="2026-01-01T00:00:00")
+        cache.put("beta", "Sorry, this page isn't available.")
+        result = run_reparse(db, cache)
+        assert result == {"reparsed": 2, "skipped": 0, "missing": 0}
+        conn = _connect(db)
+        alpha = dict(conn.execute("SELECT * FROM followers WHERE handle='alpha'").fetchone())
+        conn.close()
+        assert alpha["follower_count"] == 2500
+        assert alpha["status"] == "completed"
+        assert alpha["is_hawaii"] == 1
+        assert alpha["processed_at"] == "2026-01-01T00:00:00"
+        assert get_status_counts(db) == {"completed": 1, "error": 1, "pending": 1}
+
+    def test_uses_newest_page(self, tmp_path):
+        db, cache = self._setup(tmp_path)
+        cache.put("alpha", "1 posts 10 followers 1 following", fetched_at="2026-01-01")
+        cache.put("alpha", "1 posts 20 followers 1 following", fetched_at="2026-02-01")
+        run_reparse(db, cache)
+        conn = _connect(db)
+        row = conn.execute("SELECT follower_count FROM followers WHERE handle='alpha'").fetchone()
+        conn.close()
+        assert row[0] == 20
+
+    def test_skips_walls_and_unknown_handles(self, tmp_path):
+        db, cache = self._setup(tmp_path)
+        cache.put("alpha", "Please wait a few minutes before you try again.")
+        cache.put("zeta", "1 posts 10 followers 1 following")
+        result = run_reparse(db, cache)
+        assert result == {"reparsed": 0, "skipped": 1, "missing": 1}
+        assert get_status_counts(db) == {"pending": 3}
+
+    def test_reparses_extraction_payloads(self, tmp_path):
+        import json
+
+        db, cache = self._setup(tmp_path)
+        cache.put("alpha", json.dumps({"follower_count": 77, "text": "alpha\n77 followers"}))
+        run_reparse(db, cache)
+        conn = _connect(db)
+        row = conn.execute("SELECT follower_count FROM followers WHERE handle='alpha'").fetchone()
+        conn.close()
+        assert row[0] == 77
+
+    def test_handle_filter(self, tmp_path):
+        db, cache = self._setup(tmp_path)
+        cache.put("alpha", "1 posts 10 followers 1 following")
+        cache.put("beta", "1 posts 10 followers 1 following")
+        assert run_reparse(db, cache, handles=["beta"])["reparsed"] == 1
+
+    def test_parallel_workers(self, tmp_path):
+        db, cache = self._setup(tmp_path)
+        for i, h in enumerate(("alpha", "beta", "gamma")):
+            cache.put(h, f"1 posts {i + 1}0 followers 1 following")
+        assert run_reparse(db, cache, workers=2)["reparsed"] == 3
+        conn = _connect(db)
+        rows = dict(conn.execute("SELECT handle, follower_count FROM followers").fetchall())
+        conn.close()
+        assert rows == {"alpha": 10, "beta": 20, "gamma": 30}
+
+    def test_unparseable_page_is_skipped(self, tmp_path):
+        db, _ = self._setup(tmp_path)
+        pages = [("alpha", "2026-01-01", 123),
+                 ("beta", "2026-01-01", "1 posts 10 followers 1 following")]
+        assert reparse_pages(db, pages) == {"reparsed": 1, "skipped": 1, "missing": 0}
+
+    def test_from_fetch_archive(self, tmp_path):
+        db, _ = self._setup(tmp_path)
+        archives = tmp_path / "archives"
+        archives.mkdir()
+        with FetchRecorder(str(archives / "a.jsonl.gz")) as recorder:
+            recorder.record("alpha", "u", raw="1 posts 10 followers 1 following")
+            recorder.record("beta", "u", data={"follower_count": 5})
+            recorder.record("zeta", "u", raw="1 posts 10 followers 1 following")
+        with FetchRecorder(str(archives / "b.jsonl.gz")) as recorder:
+            recorder.record("alpha", "u", raw="1 posts 40 followers 1 following")
+        pages = list(latest_pages(str(archives)))
+        assert [(h, raw) for h, _, raw in pages] == [
+            ("alpha", "1 posts 40 followers 1 following"),
+            ("zeta", "1 posts 10 followers 1 following")]
+        result = reparse_pages(db, pages, workers=2)
+        assert result == {"reparsed": 1, "skipped": 0, "missing": 1}
+        conn = _connect(db)
+        row = conn.execute("SELECT follower_count FROM followers WHERE handle='alpha'").fetchone()
+        conn.close()
+        assert row[0] == 40
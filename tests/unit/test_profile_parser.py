@@ -1,5 +1,12 @@
 """Tests for src/profile_parser.py — deterministic Instagram page parsing."""
-from src.profile_parser import parse_count, detect_page_state, parse_profile_page
+import json
+import random
+import time
+
+from src.parser_reference import check_equivalent, synthetic_pages
+from src.profile_parser import (parse_count, detect_page_state, is_page_ready, parse_profile_page,
+                                parse_profile_data, parse_page, parse_profile_pages,
+                                _BIO_SCAN_CHARS, _extract_bio)
 
 
 # ── parse_count ──────────────────────────────────────────────────────
@@ -56,6 +63,9 @@ class TestParseCount:
     def test_k_with_space(self):
         assert parse_count("10 K") == 10000
 
+    def test_none_for_stray_dots(self):
+        assert parse_count(".2.5K") is None
+
 
 # ── detect_page_state ────────────────────────────────────────────────
 
@@ -89,6 +99,24 @@ class TestDetectPageState:
         assert detect_page_state(None) == "not_found"
 
 
+# ── is_page_ready ───────────────────────────────────────────────────
+
+class TestIsPageReady:
+    def test_header_counts_ready(self):
+        assert is_page_ready("someone\n12 posts\n1.2K followers\n30 following")
+
+    def test_state_marker_ready(self):
+        assert is_page_ready("Sorry, this page isn't available.")
+        assert is_page_ready("Log in to see photos and videos")
+
+    def test_shell_not_ready(self):
+        assert not is_page_ready("Instagram\nHome\nSearch\nExplore")
+
+    def test_empty_not_ready(self):
+        assert not is_page_ready("")
+        assert not is_page_ready(None)
+
+
 # ── parse_profile_page ──────────────────────────────────────────────
 
 class TestParseProfilePage:
@@ -167,3 +195,171 @@ class TestParseProfilePage:
         result = parse_profile_page("Please try again later")
         assert result["page_state"] == "rate_limited"
         assert result["follower_count"] is None
+
+
+class TestMatchesLegacyParser:
+    """The precompiled scanner returns exactly what per-field regexes did."""
+
+    def test_synthetic_pages(self):
+        assert check_equivalent(synthetic_pages(300, seed=7)) == []
+
+    def test_random_token_soup(self):
+        rng = random.Random(3)
+        tokens = ["12", "1,234", "2.5K", ".", "3M", " ", "\n", "posts", "post", "followers",
+                  "follower", "following", "Verified", "get verified", "Private account",
+                  "call", "CONTACT", "shop now", "x.com", "https://a.io/b", "Followed by z",
+                  "ſ", "ı", "İ", "\u212a", "Sorry, this page isn't available"]
+        pages = ["".join(rng.choice(tokens) + rng.choice(" \n") for _ in range(rng.randint(0, 40)))
+                 for _ in range(500)]
+        assert check_equivalent(pages) == []
+
+
+# ── Bounded cost on huge and adversarial pages ──────────────────────
+
+def _best_time(fn, arg, repeat=3):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(arg)
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+# Each builds a page of roughly n characters that made a backtracking
+# regex rescan the rest of the text from every position or line.
+ADVERSARIAL = {
+    "bio_lines": lambda n: "x\n1 posts\n1 followers\n1 following\n" + "a\n" * (n // 2),
+    "following_lines": lambda n: "following\n" * (n // 10),
+    "word_run": lambda n: "a" * n,
+    "digit_run": lambda n: "1" * n,
+    "comma_run": lambda n: "1," * (n // 2),
+    "dotted_words": lambda n: "a." * (n // 2),
+    "token_soup": lambda n: "".join(
+        random.Random(n).choice(["following", "\n", "1,", "a.", "post", " "]) for _ in range(n // 4)),
+}
+
+
+class TestBoundedCost:
+    """The bio search is capped, so no page can make parsing stall."""
+
+    def test_bio_ignores_text_past_scan_cap(self):
+        for name, build in ADVERSARIAL.items():
+            page = build(2 * _BIO_SCAN_CHARS)
+            assert _extract_bio(page) == _extract_bio(page[:_BIO_SCAN_CHARS]), name
+
+    def test_bio_unchanged_by_appended_text(self):
+        page = "x\n1 posts\n10 followers\n1 following\nSurf shop\nposts "
+        padding = " " * (_BIO_SCAN_CHARS - len(page))
+        assert parse_profile_page(page + padding)["bio"] == "Surf shop"
+        for name, build in ADVERSARIAL.items():
+            assert parse_profile_page(page + padding + build(100_000))["bio"] == "Surf shop", name
+
+    def test_adversarial_pages_parse_quickly(self):
+        for name, build in ADVERSARIAL.items():
+            # Generous: a linear parse takes milliseconds, a quadratic one minutes.
+            assert _best_time(parse_profile_page, build(200_000), repeat=1) < 2.0, name
+
+    def test_matches_legacy_on_adversarial_soup(self):
+        rng = random.Random(11)
+        tokens = ["following", "FOLLOWİNG", "followıng", "\n", "\n\n", " \n ", "1,", "2.5K ",
+                  ".", "a.", "x.com", "posts", "poſt ", "post", "post\t", "Followed by a",
+                  "http://y.io", " followers"]
+        pages = ["".join(rng.choice(tokens) for _ in range(rng.randint(0, 60)))
+                 for _ in range(2000)]
+        assert check_equivalent(pages) == []
+
+    def test_bio_longer_than_window_is_dropped(self):
+        page = "x\n1 posts\n10 followers\n1 following\n" + "word " * 1000
+        assert parse_profile_page(page)["bio"] == ""
+        assert parse_profile_page(page)["follower_count"] == 10
+
+    def test_bio_search_is_capped(self):
+        page = "filler " * 10_000 + "\n1 posts\n10 followers\n1 following\nSurf shop\n"
+        result = parse_profile_page(page)
+        assert result["bio"] == ""
+        assert result["follower_count"] == 10
+
+
+# ── parse_profile_data / parse_page ─────────────────────────────────
+
+class TestParseProfileData:
+    FULL = {
+        "source": "json",
+        "follower_count": 2500,
+        "following_count": 300,
+        "post_count": 42,
+        "bio": "Honolulu dog trainer",
+        "website": "https://example.com",
+        "is_verified": False,
+        "is_private": False,
+        "is_business": True,
+        "text": "someone\n42 posts\n2,500 followers\n300 following",
+    }
+
+    def test_structured_fields_used(self):
+        result = parse_profile_data(self.FULL)
+        assert result["follower_count"] == 2500
+        assert result["bio"] == "Honolulu dog trainer"
+        assert result["website"] == "https://example.com"
+        assert result["is_business"] is True
+        assert result["page_state"] == "normal"
+
+    def test_display_string_counts(self):
+        result = parse_profile_data({**self.FULL, "follower_count": "1.2K"})
+        assert result["follower_count"] == 1200
+
+    def test_missing_fields_fall_back_to_text(self):
+        data = {"source": "dom", "follower_count": "2,500", "is_verified": False,
+                "text": "someone\n42 posts\n2,500 followers\n300 following\nSurf shop\n"}
+        result = parse_profile_data(data)
+        assert result["follower_count"] == 2500
+        assert result["post_count"] == 42
+        assert result["following_count"] == 300
+        assert result["bio"] == "Surf shop"
+
+    def test_unparseable_count_falls_back(self):
+        result = parse_profile_data({**self.FULL, "post_count": "many"})
+        assert result["post_count"] == 42
+
+    def test_page_state_from_text(self):
+        result = parse_profile_data({**self.FULL, "text": "Log in to see photos"})
+        assert result["page_state"] == "login_required"
+        assert result["follower_count"] is None
+
+    def test_instagram_website_dropped(self):
+        result = parse_profile_data({**self.FULL, "website": "https://instagram.com/x"})
+        assert result["website"] == ""
+
+    def test_keys_match_text_parser(self):
+        assert set(parse_profile_data(self.FULL)) == set(parse_profile_page("x"))
+
+    def test_parse_page_dispatches(self):
+        assert parse_page(json.dumps(self.FULL))["follower_count"] == 2500
+        assert parse_page("10 posts 20 followers 5 following")["follower_count"] == 20
+        assert parse_page("{not json")["page_state"] == "normal"
+
+
+# ── parse_profile_pages ─────────────────────────────────────────────
+
+class TestParseProfilePages:
+    PAGES = ["1 posts 10 followers 1 following", 123,
+             json.dumps({"follower_count": 77, "text": "x"}),
+             "Please wait a few minutes before you try again."]
+
+    def _check(self, results):
+        assert [r[0]["follower_count"] if r[0] else None for r in results] == [10, None, 77, None]
+        assert results[1][1].startswith("AttributeError")
+        assert results[3][0]["page_state"] == "rate_limited"
+        assert [r[1] for r in results if r is not results[1]] == [None, None, None]
+
+    def test_in_process(self):
+        self._check(list(parse_profile_pages(iter(self.PAGES), workers=1)))
+
+    def test_process_pool_keeps_input_order(self):
+        pages = synthetic_pages(120, seed=5)
+        results = list(parse_profile_pages(iter(pages), workers=2, chunk_size=7))
+        assert [r for r, _ in results] == [parse_page(p) for p in pages]
+        self._check(list(parse_profile_pages(self.PAGES, workers=2, chunk_size=1)))
+
+    def test_empty_input(self):
+        assert list(parse_profile_pages([], workers=2)) == []
@@ -0,0 +1,149 @@
+"""Tests for src/rate_limiter.py — token buckets shared across workers."""
+import threading
+
+import pytest
+
+from src.rate_limiter import TokenBucket, SqliteTokenBucket, _BaseBucket
+from tests.conftest import FakeClock
+
+
+# ── TokenBucket ───────────────────────────────────────────────────
+class TestTokenBucket:
+    def test_starts_full(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, burst=3, clock=clock, sleep=clock.sleep)
+        assert bucket.try_acquire()
+        assert bucket.try_acquire()
+        assert bucket.try_acquire()
+        assert not bucket.try_acquire()
+
+    def test_take_reports_wait_without_consuming(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, burst=1, clock=clock, sleep=clock.sleep)
+        assert bucket.take() == 0.0
+        assert bucket.take() == 0.5
+        clock.now += 0.5
+        assert bucket.take() == 0.0
+
+    def test_refills_over_time(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, burst=1, clock=clock, sleep=clock.sleep)
+        assert bucket.try_acquire()
+        assert not bucket.try_acquire()
+        clock.now += 0.5
+        assert bucket.try_acquire()
+
+    def test_refill_capped_at_burst(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, burst=2, clock=clock, sleep=clock.sleep)
+        bucket.try_acquire()
+        bucket.try_acquire()
+        clock.now += 100
+        assert bucket.try_acquire()
+        assert bucket.try_acquire()
+        assert not bucket.try_acquire()
+
+    def test_acquire_sleeps_only_until_next_token(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=0.25, burst=1, clock=clock, sleep=clock.sleep)
+        assert bucket.acquire() == 0.0
+        waited = bucket.acquire()
+        assert waited == pytest.approx(4.0)
+        assert clock.sleeps == [pytest.approx(4.0)]
+
+    def test_acquire_timeout(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=0.1, burst=1, clock=clock, sleep=clock.sleep)
+        bucket.acquire()
+        with pytest.raises(TimeoutError):
+            bucket.acquire(timeout=1)
+
+    def test_acquire_more_than_burst_raises(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, burst=2, clock=clock, sleep=clock.sleep)
+        with pytest.raises(ValueError):
+            bucket.acquire(tokens=3)
+        assert clock.sleeps == []
+
+    def test_set_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1, burst=1, clock=clock, sleep=clock.sleep)
+        bucket.acquire()
+        bucket.set_rate(0.5)
+        assert bucket.acquire() == pytest.approx(2.0)
+
+    def test_rejects_bad_parameters(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0, burst=1)
+        with pytest.raises(ValueError):
+            TokenBucket(rate=1, burst=0)
+
+    def test_threads_share_budget(self):
+        bucket = TokenBucket(rate=0.001, burst=5)
+        taken = []
+
+        def worker():
+            taken.append(bucket.try_acquire())
+
+        threads = [threading.Thread(target=worker) for _ in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert taken.count(True) == 5
+
+    def test_subclass_without_take_cannot_be_created(self):
+        class Incomplete(_BaseBucket):
+            pass
+
+        with pytest.raises(TypeError):
+            Incomplete(rate=1, burst=1)
+
+
+# ── SqliteTokenBucket ─────────────────────────────────────────────
+class TestSqliteTokenBucket:
+    def test_starts_full(self, tmp_path):
+        clock = FakeClock()
+        db = str(tmp_path / "test.db")
+        bucket = SqliteTokenBucket(db, rate=1, burst=2, clock=clock, sleep=clock.sleep)
+        assert bucket.try_acquire()
+        assert bucket.try_acquire()
+        assert not bucket.try_acquire()
+
+    def test_instances_share_budget(self, tmp_path):
+        """Two buckets on the same DB (as in two processes) share tokens."""
+        clock = FakeClock()
+        db = str(tmp_path / "test.db")
+        a = SqliteTokenBucket(db, rate=1, burst=2, clock=clock, sleep=clock.sleep)
+        b = SqliteTokenBucket(db, rate=1, burst=2, clock=clock, sleep=clock.sleep)
+        assert a.try_acquire()
+        assert b.try_acquire()
+        assert not a.try_acquire()
+        assert not b.try_acquire()
+
+    def test_state_survives_reopen(self, tmp_path):
+        clock = FakeClock()
+        db = str(tmp_path / "test.db")
+        SqliteTokenBucket(db, rate=1, burst=1, clock=clock, sleep=clock.sleep).acquire()
+        reopened = SqliteTokenBucket(db, rate=1, burst=1, clock=clock, sleep=clock.sleep)
+        assert not reopened.try_acquire()
+
+    def test_named_buckets_are_independent(self, tmp_path):
+        clock = FakeClock()
+        db = str(tmp_path / "test.db")
+        a = SqliteTokenBucket(db, name="a", rate=1, burst=1, clock=clock, sleep=clock.sleep)
+        b = SqliteTokenBucket(db, name="b", rate=1, burst=1, clock=clock, sleep=clock.sleep)
+        assert a.try_acquire()
+        assert b.try_acquire()
+
+    def test_acquire_waits_for_refill(self, tmp_path):
+        clock = FakeClock()
+        db = str(tmp_path / "test.db")
+        bucket = SqliteTokenBucket(db, rate=0.5, burst=1, clock=clock, sleep=clock.sleep)
+        bucket.acquire()
+        assert bucket.acquire() == pytest.approx(2.0)
+
+    def test_acquire_more_than_burst_raises(self, tmp_path):
+        bucket = SqliteTokenBucket(str(tmp_path / "test.db"), rate=1, burst=1)
+        with pytest.raises(ValueError):
+            bucket.acquire(tokens=2)
@@ -0,0 +1,139 @@
+"""Tests for src/refresh_scheduler.py — TTL-based re-enrichment."""
+import datetime
+
+import pytest
+
+from src.database import (init_db, insert_followers, update_follower, get_status_counts,
+                          get_all_followers)
+from src.batch_orchestrator import create_batch, run_all
+from src.staged_pipeline import run_staged
+from src.refresh_scheduler import find_stale, enqueue_stale, refreshes_used
+
+NOW = datetime.datetime(2026, 6, 1, 12, 0, 0)
+
+
+def _days_ago(days):
+    return (NOW - datetime.timedelta(days=days)).isoformat()
+
+
+def _setup(tmp_path, rows):
+    """rows: (handle, status, priority_score, days_since_processed)."""
+    db = str(tmp_path / "test.db")
+    init_db(db)
+    insert_followers(db, [
+        {"handle": h, "display_name": h, "profile_url": f"https://instagram.com/{h}/"}
+        for h, *_ in rows
+    ])
+    for handle, status, score, age in rows:
+        update_follower(db, handle, {"status": status, "priority_score": score,
+                                     "processed_at": _days_ago(age)})
+    return db
+
+
+class TestFindStale:
+    def test_tier_ttls(self, tmp_path):
+        db = _setup(tmp_path, [
+            ("tier1_old", "completed", 85, 8),     # TTL 7 → stale
+            ("tier1_new", "completed", 85, 3),
+            ("tier3_mid", "completed", 45, 20),    # TTL 30 → fresh
+            ("tier4_old", "completed", 10, 100),   # TTL 90 → stale
+            ("private_old", "private", None, 61),  # TTL 60 → stale
+        ])
+        stale = find_stale(db, now=NOW)
+        assert [r["handle"] for r in stale] == ["tier1_old", "tier4_old", "private_old"]
+        assert stale[0]["overdue_days"] == 1.0
+
+    def test_ignores_pending_and_errors(self, tmp_path):
+        db = _setup(tmp_path, [("a", "error", None, 400), ("b", "pending", None, 400)])
+        assert find_stale(db, now=NOW) == []
+
+    def test_ttl_override(self, tmp_path):
+        db = _setup(tmp_path, [("a", "completed", 65, 5)])
+        assert find_stale(db, now=NOW) == []
+        assert len(find_stale(db, now=NOW, ttl_days={"Tier 2 - Medium Priority": 4})) == 1
+
+    def test_oldest_first_within_tier(self, tmp_path):
+        db = _setup(tmp_path, [("a", "completed", 90, 10), ("b", "completed", 90, 20)])
+        assert [r["handle"] for r in find_stale(db, now=NOW)] == ["b", "a"]
+
+
+class TestEnqueueStale:
+    def test_resets_to_pending_for_normal_claim(self, tmp_path):
+        db = _setup(tmp_path, [("a", "completed", 90, 10), ("b", "completed", 90, 1)])
+        result = enqueue_stale(db, daily_budget=10, now=NOW)
+        assert result["enqueued"] == 1
+        assert result["by_tier"] == {"Tier 1 - High Priority": 1}
+        assert get_status_counts(db) == {"completed": 1, "pending": 1}
+        assert [r["handle"] for r in create_batch(db)] == ["a"]
+
+    def test_daily_budget_is_rolling(self, tmp_path):
+        db = _setup(tmp_path, [(f"u{i}", "completed", 90, 30) for i in range(5)])
+        first = enqueue_stale(db, daily_budget=2, now=NOW)
+        assert first["enqueued"] == 2
+        assert first["budget_left"] == 0
+        again = enqueue_stale(db, daily_budget=2, now=NOW + datetime.timedelta(hours=12))
+        assert again["enqueued"] == 0
+        assert refreshes_used(db, now=NOW + datetime.timedelta(hours=12)) == 2
+        later = enqueue_stale(db, daily_budget=2, now=NOW + datetime.timedelta(hours=25))
+        assert later["enqueued"] == 2
+
+    def test_row_claimed_since_scan_is_not_counted(self, tmp_path, monkeypatch):
+        db = _setup(tmp_path, [("a", "completed", 90, 10), ("b", "completed", 90, 20)])
+        scan = find_stale(db, now=NOW)
+        update_follower(db, "b", {"status": "processing"})
+        monkeypatch.setattr("src.refresh_scheduler.find_stale", lambda *a, **k: scan)
+        result = enqueue_stale(db, daily_budget=5, now=NOW)
+        assert result["enqueued"] == 1
+        assert result["budget_left"] == 4
+        assert refreshes_used(db, now=NOW) == 1
+
+    def test_dry_run_writes_nothing(self, tmp_path):
+        db = _setup(tmp_path, [("a", "completed", 90, 10)])
+        result = enqueue_stale(db, daily_budget=5, now=NOW, dry_run=True)
+        assert result["enqueued"] == 1
+        assert get_status_counts(db) == {"completed": 1}
+        assert refreshes_used(db, now=NOW) == 0
+
+
+def _failing_fetcher(handle, profile_url):
+    raise ConnectionError("net::ERR_CONNECTION_RESET")
+
+
+def _profile_fetcher(handle, profile_url):
+    return {"follower_count": 500, "following_count": 10, "post_count": 5,
+            "bio": "Fresh bio", "is_private": False}
+
+
+def _row(db, handle):
+    return next(r for r in get_all_followers(db) if r["handle"] == handle)
+
+
+@pytest.mark.parametrize("run", [run_all, run_staged])
+class TestRefreshOutcome:
+    def test_failed_refresh_restores_previous_data(self, tmp_path, run):
+        db = _setup(tmp_path, [("a", "completed", 90, 10)])
+        enqueue_stale(db, daily_budget=5, now=NOW)
+        result = run(db, _failing_fetcher)
+        assert result["total_errors"] == 1
+        row = _row(db, "a")
+        assert row["status"] == "completed"
+        assert row["priority_score"] == 90
+        assert row["processed_at"] == _days_ago(10)
+        assert row["refresh_of"] is None
+        assert [r["handle"] for r in find_stale(db, now=NOW)] == ["a"]
+
+    def test_successful_refresh_clears_marker(self, tmp_path, run):
+        db = _setup(tmp_path, [("a", "completed", 90, 10)])
+        enqueue_stale(db, daily_budget=5, now=NOW)
+        run(db, _profile_fetcher)
+        row = _row(db, "a")
+        assert row["status"] == "completed"
+        assert row["bio"] == "Fresh bio"
+        assert row["refresh_of"] is None
+
+    def test_gone_profile_is_not_restored(self, tmp_path, run):
+        db = _setup(tmp_path, [("a", "completed", 90, 10)])
+        enqueue_stale(db, daily_budget=5, now=NOW)
+        run(db, lambda handle, url: {"page_state": "not_found"})
+        row = _row(db, "a")
+        assert (row["status"], row["error_message"]) == ("error", "not_found")
@@ -0,0 +1,53 @@
+"""Tests for src/request_filter.py — resource blocking policy."""
+from src.request_filter import RequestFilter, ESTIMATED_BYTES
+
+PROFILE = "https://www.instagram.com/someone/"
+IMAGE = "https://scontent-lax3-1.cdninstagram.com/v/t51/abc.jpg"
+
+
+class TestRequestFilter:
+    def test_allows_document_and_scripts(self):
+        f = RequestFilter()
+        assert f.should_block(PROFILE, "document") is None
+        assert f.should_block("https://static.cdninstagram.com/rsrc.js", "script") is None
+
+    def test_blocks_heavy_resource_types(self):
+        f = RequestFilter()
+        assert f.should_block(IMAGE, "image") == "image"
+        assert f.should_block("https://video.fbcdn.net/v.mp4", "media") == "media"
+        assert f.should_block("https://static.cdninstagram.com/f.woff2", "font") == "font"
+
+    def test_blocks_trackers(self):
+        f = RequestFilter()
+        assert f.should_block("https://www.google-analytics.com/collect", "xhr") == "tracker"
+
+    def test_blocks_third_party(self):
+        f = RequestFilter()
+        assert f.should_block("https://cdn.example.net/lib.js", "script") == "tracker"
+        f = RequestFilter(block_third_party=False)
+        assert f.should_block("https://cdn.example.net/lib.js", "script") is None
+
+    def test_allow_types(self):
+        f = RequestFilter(allow_types={"image"})
+        assert f.should_block(IMAGE, "image") is None
+
+    def test_allow_hosts_override(self):
+        f = RequestFilter(allow_hosts=("google-analytics.com", "cdninstagram.com"))
+        assert f.should_block("https://www.google-analytics.com/collect", "xhr") is None
+        assert f.should_block(IMAGE, "image") is None
+
+    def test_subdomain_matching_is_exact(self):
+        f = RequestFilter()
+        assert f.should_block("https://notinstagram.com/x.js", "script") == "tracker"
+
+    def test_counters(self):
+        f = RequestFilter()
+        f.should_block(PROFILE, "document")
+        f.should_block(IMAGE, "image")
+        f.should_block(IMAGE, "image")
+        f.should_block("https://doubleclick.net/ad", "script")
+        stats = f.stats()
+        assert stats["allowed"] == 1
+        assert stats["blocked"] == {"image": 2, "tracker": 1}
+        assert stats["bytes_saved_estimate"] == 2 * ESTIMATED_BYTES["image"] + ESTIMATED_BYTES["tracker"]
+        assert "blocked 3 requests" in f.describe()
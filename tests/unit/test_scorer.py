@@ -1,6 +1,6 @@
 """Tests for src/scorer.py — priority scoring and tier assignment."""
 import pytest
-from src.scorer import score, get_tier
+from src.scorer import score, get_tier, estimate_priority
 
 
 # ── Helper ─────────────────────────────────────────────────────────
@@ -428,3 +428,20 @@ class TestDogCommunityBioExpansion:
         """Bio mentioning 'pup parent' should get dogs_pets_bio bonus."""
         r = score(_profile(bio="Pup parent | Hawaii life"))
         assert "dogs_pets_bio(+10)" in r["priority_reason"]
+
+
+class TestEstimatePriority:
+    def test_hawaii_business_beats_unknown(self):
+        assert estimate_priority("honolulu_bakery", "Honolulu Bakery") > \
+            estimate_priority("jdoe1987", "J Doe")
+
+    def test_hawaii_org_ranks_high(self):
+        assert estimate_priority("honolulu_rotary", "Rotary Club of Honolulu") >= 40
+
+    def test_returns_int_in_range(self):
+        value = estimate_priority("someone", "")
+        assert isinstance(value, int)
+        assert 0 <= value <= 100
+
+    def test_handles_missing_display_name(self):
+        assert estimate_priority("maui_vet_clinic", None) > 0
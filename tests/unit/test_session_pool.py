@@ -0,0 +1,112 @@
+"""Tests for src/session_pool.py — routing fetches across sessions."""
+import pytest
+
+from src.rate_limiter import TokenBucket
+from src.fetchers import FetchBudgetExhausted
+from src.session_pool import Session, SessionPool, HEALTHY, COOLING, EXHAUSTED
+from tests.conftest import FakeClock
+
+
+def _ok(handle, url):
+    return {"follower_count": 1, "page_state": "normal"}
+
+
+def _session(clock, name, fetcher=_ok, rate=1.0, burst=1, **kwargs):
+    calls = []
+
+    def fetch(handle, url):
+        calls.append(handle)
+        return fetcher(handle, url)
+
+    bucket = TokenBucket(rate=rate, burst=burst, clock=clock, sleep=clock.sleep)
+    session = Session(name, fetch, bucket, **kwargs)
+    session.calls = calls
+    return session
+
+
+class TestSessionPool:
+    def test_spreads_load_across_sessions(self):
+        clock = FakeClock()
+        a, b = _session(clock, "a"), _session(clock, "b")
+        pool = SessionPool([a, b], clock=clock, sleep=clock.sleep)
+        for i in range(4):
+            pool(f"u{i}", "url")
+        assert len(a.calls) == 2 and len(b.calls) == 2
+        # Two sessions at 1/s each: 4 fetches need only ~1s of waiting.
+        assert clock.now <= 1.0
+
+    def test_waits_for_soonest_token(self):
+        clock = FakeClock()
+        pool = SessionPool([_session(clock, "a", rate=0.5)], clock=clock, sleep=clock.sleep)
+        pool("u0", "url")
+        pool("u1", "url")
+        assert clock.sleeps == [2.0]
+
+    def test_trip_cools_session_and_retries_elsewhere(self):
+        clock = FakeClock()
+        walled = _session(clock, "a", fetcher=lambda h, u: {"page_state": "login_required"},
+                          cooldown_seconds=60)
+        good = _session(clock, "b")
+        pool = SessionPool([walled, good], clock=clock, sleep=clock.sleep)
+        assert pool("u0", "url")["page_state"] == "normal"
+        assert walled.state(clock.now) == COOLING
+        assert pool.stats()["a"]["last_reason"] == "login_required"
+
+    def test_all_sessions_tripped_returns_trip_result(self):
+        clock = FakeClock()
+        limited = lambda h, u: {"page_state": "rate_limited"}  # noqa: E731
+        pool = SessionPool([_session(clock, "a", fetcher=limited),
+                            _session(clock, "b", fetcher=limited)],
+                           clock=clock, sleep=clock.sleep)
+        assert pool("u0", "url")["page_state"] == "rate_limited"
+        assert clock.now == 0.0
+
+    def test_raw_text_results_are_inspected(self):
+        clock = FakeClock()
+        walled = _session(clock, "a", fetcher=lambda h, u: "Log in to see photos")
+        good = _session(clock, "b", fetcher=lambda h, u: "10 posts 5 followers 1 following")
+        pool = SessionPool([walled, good], clock=clock, sleep=clock.sleep)
+        assert "followers" in pool("u0", "url")
+
+    def test_cooldown_doubles_and_resets(self):
+        clock = FakeClock()
+        session = _session(clock, "a", cooldown_seconds=10)
+        session.cool_down("rate_limited", 0)
+        assert session.cooling_until == 10
+        session.cool_down("rate_limited", 10)
+        assert session.cooling_until == 30
+
+    def test_sleeps_until_cooldown_when_all_cooling(self):
+        clock = FakeClock()
+        a = _session(clock, "a", cooldown_seconds=30)
+        a.cool_down("login_required", 0)
+        pool = SessionPool([a], clock=clock, sleep=clock.sleep)
+        pool("u0", "url")
+        assert clock.now == pytest.approx(30)
+        assert a.state(clock.now) == HEALTHY
+
+    def test_max_requests_exhausts_session(self):
+        clock = FakeClock()
+        a = _session(clock, "a", burst=5, max_requests=2)
+        pool = SessionPool([a], clock=clock, sleep=clock.sleep)
+        pool("u0", "url")
+        pool("u1", "url")
+        assert a.state(clock.now) == EXHAUSTED
+        with pytest.raises(FetchBudgetExhausted, match="request budget"):
+            pool("u2", "url")
+
+    def test_errors_propagate_and_count(self):
+        clock = FakeClock()
+
+        def boom(handle, url):
+            raise OSError("cdp gone")
+
+        a = _session(clock, "a", fetcher=boom)
+        pool = SessionPool([a], clock=clock, sleep=clock.sleep)
+        with pytest.raises(OSError):
+            pool("u0", "url")
+        assert pool.stats()["a"]["errors"] == 1
+
+    def test_requires_sessions(self):
+        with pytest.raises(ValueError):
+            SessionPool([])
@@ -0,0 +1,89 @@
+"""Tests for src/simulator.py — offline synthetic fetcher and throughput report."""
+import json
+import random
+
+import pytest
+
+from src.profile_parser import parse_profile_page
+from src.simulator import SyntheticFetcher, render_profile_page, simulate
+
+
+class TestRenderProfilePage:
+    def test_parses_as_normal_profile(self):
+        text = render_profile_page(random.Random(1), "aloha_dogs")
+        result = parse_profile_page(text)
+        assert result["page_state"] == "normal"
+        assert result["follower_count"] is not None
+        assert result["following_count"] is not None
+        assert result["post_count"] is not None
+        assert result["bio"]
+
+    def test_private_page(self):
+        text = render_profile_page(random.Random(1), "aloha_dogs", private=True)
+        assert parse_profile_page(text)["is_private"] is True
+
+
+class TestSyntheticFetcher:
+    def test_outcome_rates(self):
+        fetcher = SyntheticFetcher(rates={"not_found": 0.5, "private": 0.0},
+                                   time_scale=0, seed=7)
+        states = [parse_profile_page(fetcher(f"u{i}", ""))["page_state"] for i in range(400)]
+        share = states.count("not_found") / len(states)
+        assert 0.4 < share < 0.6
+        assert fetcher.outcomes["not_found"] == states.count("not_found")
+
+    @pytest.mark.parametrize("outcome", ["rate_limited", "login_required", "suspended"])
+    def test_injected_states_detected(self, outcome):
+        fetcher = SyntheticFetcher(rates={outcome: 1.0, "not_found": 0.0, "private": 0.0},
+                                   time_scale=0)
+        assert parse_profile_page(fetcher("u", ""))["page_state"] == outcome
+
+    def test_sleeps_scaled_latency(self):
+        slept = []
+        fetcher = SyntheticFetcher(latency="fixed", latency_mean=2.0, time_scale=0.5,
+                                   sleep=slept.append)
+        fetcher("u", "")
+        assert slept == [1.0]
+        assert fetcher.simulated_seconds == 2.0
+
+    @pytest.mark.parametrize("latency", ["uniform", "exponential", "lognormal"])
+    def test_latency_distributions_non_negative(self, latency):
+        slept = []
+        fetcher = SyntheticFetcher(latency=latency, latency_mean=1.0, seed=3,
+                                   sleep=slept.append)
+        for _ in range(50):
+            fetcher("u", "")
+        assert all(s >= 0 for s in slept)
+
+    def test_seed_is_reproducible(self):
+        a = SyntheticFetcher(time_scale=0, seed=42)
+        b = SyntheticFetcher(time_scale=0, seed=42)
+        assert [a(f"u{i}", "") for i in range(5)] == [b(f"u{i}", "") for i in range(5)]
+
+    def test_rejects_bad_config(self):
+        with pytest.raises(ValueError):
+            SyntheticFetcher(latency="gaussian")
+        with pytest.raises(ValueError):
+            SyntheticFetcher(rates={"timeout": 0.1})
+        with pytest.raises(ValueError):
+            SyntheticFetcher(rates={"private": 0.8, "not_found": 0.5})
+
+
+class TestSimulate:
+    def test_run_all_report(self, tmp_path):
+        report_path = tmp_path / "report.json"
+        fetcher = SyntheticFetcher(time_scale=0, seed=1)
+        report = simulate(30, fetcher=fetcher, report_path=str(report_path))
+        assert report["runner"] == "run_all"
+        assert report["fetches"] >= 30
+        assert report["result"]["total_completed"] + report["result"]["total_errors"] == 30
+        assert report["profiles_per_hour"] > 0
+        assert "fetch" in report["stages"]
+        assert json.loads(report_path.read_text())["profiles"] == 30
+
+    def test_staged_report(self):
+        fetcher = SyntheticFetcher(time_scale=0, seed=1)
+        report = simulate(20, fetcher=fetcher, staged=True, fetch_workers=2)
+        assert report["runner"] == "staged"
+        assert report["result"]["stages"]["fetch"]["workers"] == 2
+        assert sum(report["status_counts"].values()) == 20
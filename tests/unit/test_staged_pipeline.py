@@ -0,0 +1,262 @@
+"""Tests for src/staged_pipeline.py — staged fetch/parse/enrich/write pipeline."""
+import os
+import importlib
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from src.fetchers import FetchBudgetExhausted
+from src.database import init_db, insert_followers, get_status_counts, _connect
+from src.staged_pipeline import run_staged, format_stage_report
+
+
+def _setup_db(tmp_path, count=5):
+    db = str(tmp_path / "test.db")
+    init_db(db)
+    insert_followers(db, [
+        {"handle": f"user_{i}", "display_name": f"User {i}",
+         "profile_url": f"https://instagram.com/user_{i}/"}
+        for i in range(count)
+    ])
+    return db
+
+
+def _mock_fetcher(handle, profile_url):
+    return {
+        "follower_count": 1000,
+        "following_count": 200,
+        "post_count": 60,
+        "bio": f"Bio for {handle}",
+        "website": None,
+        "is_verified": False,
+        "is_private": False,
+        "is_business": False,
+    }
+
+
+class TestRunStaged:
+    def test_processes_all_pending(self, tmp_path):
+        db = _setup_db(tmp_path, count=12)
+        result = run_staged(db, _mock_fetcher, fetch_workers=3)
+        assert result["total_completed"] == 12
+        assert result["total_errors"] == 0
+        assert result["reason"] == "all_complete"
+        assert get_status_counts(db) == {"completed": 12}
+
+    def test_sets_classification_fields(self, tmp_path):
+        db = _setup_db(tmp_path, count=1)
+        run_staged(db, _mock_fetcher)
+        conn = _connect(db)
+        row = dict(conn.execute("SELECT * FROM followers WHERE handle='user_0'").fetchone())
+        conn.close()
+        assert row["category"] is not None
+        assert row["priority_score"] is not None
+        assert row["status"] == "completed"
+
+    def test_parses_raw_text_results(self, tmp_path):
+        db = _setup_db(tmp_path, count=2)
+
+        def raw_fetcher(handle, url):
+            return "10 posts 2.5K followers 30 following\nHonolulu dog trainer\nPosts\n"
+
+        result = run_staged(db, raw_fetcher)
+        assert result["total_completed"] == 2
+        conn = _connect(db)
+        row = dict(conn.execute("SELECT * FROM followers WHERE handle='user_0'").fetchone())
+        conn.close()
+        assert row["follower_count"] == 2500
+        assert row["is_hawaii"] == 1
+
+    def test_failures_retry_then_error(self, tmp_path):
+        db = _setup_db(tmp_path, count=2)
+        calls = {}
+
+        def failing(handle, url):
+            calls[handle] = calls.get(handle, 0) + 1
+            raise Exception("boom")
+
+        result = run_staged(db, failing)
+        assert result["total_errors"] == 2
+        assert result["stopped"] is True
+        assert result["reason"] == "batch_exhausted"
+        assert calls == {"user_0": 3, "user_1": 3}
+        assert get_status_counts(db) == {"error": 2}
+
+    def test_exhausted_rate_limits_stop_claiming(self, tmp_path):
+        db = _setup_db(tmp_path, count=6)
+        os.environ["BATCH_SIZE"] = "2"
+        try:
+            import src.config
+            importlib.reload(src.config)
+
+            def fetcher(handle, url):
+                return {**_mock_fetcher(handle, url), "page_state": "rate_limited"}
+
+            result = run_staged(db, fetcher)
+        finally:
+            del os.environ["BATCH_SIZE"]
+            importlib.reload(src.config)
+        assert result["reason"] == "batch_exhausted"
+        # Batches claimed before the first row ran out of attempts finish
+        # too, so how many rows end as errors depends on timing.
+        counts = get_status_counts(db)
+        assert set(counts) <= {"error", "pending"}
+        assert counts["error"] >= 2
+        assert sum(counts.values()) == 6
+
+    def test_budget_exhausted_leaves_rows_pending(self, tmp_path):
+        db = _setup_db(tmp_path, count=30)
+        fetched = []
+
+        def fetcher(handle, url):
+            if len(fetched) == 5:
+                raise FetchBudgetExhausted("no budget left")
+            fetched.append(handle)
+            return _mock_fetcher(handle, url)
+
+        result = run_staged(db, fetcher)
+        assert result["stopped"] is True
+        assert result["reason"] == "budget_exhausted"
+        assert result["total_errors"] == 0
+        assert get_status_counts(db) == {"completed": 5, "pending": 25}
+
+    def test_write_failure_is_raised(self, tmp_path, monkeypatch):
+        db = _setup_db(tmp_path, count=30)
+
+        def locked(db_path, updates):
+            raise sqlite3.OperationalError("database is locked")
+
+        monkeypatch.setattr("src.staged_pipeline.update_followers", locked)
+        fetched = []
+
+        def fetcher(handle, url):
+            fetched.append(handle)
+            return _mock_fetcher(handle, url)
+
+        outcome = []
+
+        def run():
+            try:
+                run_staged(db, fetcher, queue_size=2, write_batch_size=1)
+            except Exception as e:
+                outcome.append(e)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(timeout=5)
+        assert not thread.is_alive()
+        assert isinstance(outcome[0], sqlite3.OperationalError)
+        assert len(fetched) < 30
+
+    def test_transient_failure_recovers(self, tmp_path):
+        db = _setup_db(tmp_path, count=3)
+        seen = set()
+
+        def flaky(handle, url):
+            if handle not in seen:
+                seen.add(handle)
+                raise Exception("transient")
+            return _mock_fetcher(handle, url)
+
+        result = run_staged(db, flaky)
+        assert result["total_completed"] == 3
+        assert result["total_errors"] == 0
+
+    def test_rate_limited_pages_are_retried(self, tmp_path):
+        db = _setup_db(tmp_path, count=1)
+        states = iter(["rate_limited", "normal"])
+
+        def fetcher(handle, url):
+            return {**_mock_fetcher(handle, url), "page_state": next(states)}
+
+        result = run_staged(db, fetcher)
+        assert result["total_completed"] == 1
+
+    def test_fetchers_run_concurrently(self, tmp_path):
+        db = _setup_db(tmp_path, count=6)
+        active = [0]
+        peak = [0]
+        lock = threading.Lock()
+
+        def slow(handle, url):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            return _mock_fetcher(handle, url)
+
+        run_staged(db, slow, fetch_workers=3)
+        assert peak[0] > 1
+
+    def test_reports_stage_stats(self, tmp_path):
+        db = _setup_db(tmp_path, count=4)
+        result = run_staged(db, _mock_fetcher, fetch_workers=2)
+        stages = result["stages"]
+        assert set(stages) == {"fetch", "parse", "enrich", "write"}
+        assert stages["fetch"]["items"] == 4
+        assert stages["fetch"]["workers"] == 2
+        assert stages["write"]["items"] == 4
+        assert "max_queue_depth" in stages["enrich"]
+        report = format_stage_report(stages)
+        assert "fetch" in report and "write" in report
+
+    def test_records_stage_metrics(self, tmp_path):
+        from src.metrics import RunMetrics
+
+        db = _setup_db(tmp_path, count=3)
+        metrics = RunMetrics()
+        run_staged(db, _mock_fetcher, metrics=metrics)
+        summary = metrics.summary()
+        assert summary["fetch"]["count"] == 3
+        assert summary["score"]["count"] == 3
+        assert summary["write"]["count"] >= 1
+
+    def test_should_stop_drains(self, tmp_path):
+        db = _setup_db(tmp_path, count=20)
+        result = run_staged(db, _mock_fetcher, should_stop=lambda: True)
+        assert result["reason"] == "drained"
+        assert result["batches_run"] == 0
+        assert get_status_counts(db) == {"pending": 20}
+
+    def test_respects_batch_size(self, tmp_path):
+        db = _setup_db(tmp_path, count=7)
+        os.environ["BATCH_SIZE"] = "3"
+        try:
+            import src.config
+            importlib.reload(src.config)
+            result = run_staged(db, _mock_fetcher)
+            assert result["batches_run"] == 3
+            assert result["total_completed"] == 7
+        finally:
+            del os.environ["BATCH_SIZE"]
+            importlib.reload(src.config)
+
+    def test_no_pending(self, tmp_path):
+        db = _setup_db(tmp_path, count=0)
+        result = run_staged(db, _mock_fetcher)
+        assert result["batches_run"] == 0
+        assert result["total_completed"] == 0
+
+
+class TestRunStagedCircuitBreaker:
+    def test_open_breaker_stops_claiming_and_releases_rows(self, tmp_path):
+        from src.circuit_breaker import CircuitBreaker
+
+        db = _setup_db(tmp_path, count=6)
+        breaker = CircuitBreaker(threshold=1, cooldown_seconds=3600, max_trips=1)
+        calls = [0]
+
+        def fetcher(handle, url):
+            calls[0] += 1
+            return {**_mock_fetcher(handle, url), "page_state": "login_required"}
+
+        result = run_staged(db, fetcher, breaker=breaker)
+        assert result["stopped"] is True
+        assert result["reason"] == "circuit_open"
+        assert calls[0] == 1
+        assert result["total_errors"] == 0
+        assert get_status_counts(db) == {"pending": 6}